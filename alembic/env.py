@@ -9,7 +9,8 @@ from app.db.models import Base
 
 config = context.config
 
-if config.config_file_name is not None:
+# Leave logging alone when invoked programmatically by the pipeline
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 target_metadata = Base.metadata
@@ -0,0 +1,35 @@
+"""add pipeline checkpoints
+
+Revision ID: 3f9c2d7a1b84
+Revises: cbf0fcb513be
+Create Date: 2026-10-19 12:05:11.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7a1b84'
+down_revision: Union[str, None] = 'cbf0fcb513be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('pipeline_checkpoints',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('leagueId', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('stage', sa.String(length=50), nullable=False),
+    sa.Column('contentHash', sa.String(length=64), nullable=False),
+    sa.Column('completedAt', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('leagueId', 'year', 'stage', name='uix_checkpoint_unit')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pipeline_checkpoints')
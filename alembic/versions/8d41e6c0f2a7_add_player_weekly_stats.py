@@ -0,0 +1,41 @@
+"""add player weekly stats
+
+Revision ID: 8d41e6c0f2a7
+Revises: 3f9c2d7a1b84
+Create Date: 2026-10-19 13:02:47.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6c0f2a7'
+down_revision: Union[str, None] = '3f9c2d7a1b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('player_weekly_stats',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('week', sa.Integer(), nullable=False),
+    sa.Column('points', sa.Float(), nullable=False),
+    sa.Column('projectedPoints', sa.Float(), nullable=False),
+    sa.Column('lineupSlot', sa.String(length=20), nullable=True),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('player_id', 'year', 'week', name='uix_player_week')
+    )
+    op.create_index('idx_player_week_team', 'player_weekly_stats', ['team_id', 'year', 'week'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_player_week_team', table_name='player_weekly_stats')
+    op.drop_table('player_weekly_stats')
@@ -0,0 +1,178 @@
+"""add owners and team owners
+
+Revision ID: a4c7e1f9d305
+Revises: f3b8d2e6a491
+Create Date: 2026-10-19 17:31:48.612093
+
+Owners are keyed by ESPN member id and linked to teams through team_owners.
+The career materialized views are rebuilt on the bridge table instead of
+splitting teams.owners, so they are keyed by owner id and no longer merge
+different people with the same name. Both tables are filled by the next
+pipeline run: the owners and team_owners stages have no checkpoints yet, so
+even a --resume run loads them. teams.owners is kept for display and
+widened so co-owned teams are not cut off.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e1f9d305'
+down_revision: Union[str, None] = 'f3b8d2e6a491'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OWNER_TEAMS = """
+    SELECT tow.owner_id, t.id AS team_id, t.year, t.wins, t.losses, t.ties,
+           t."pointsFor", t."pointsAgainst", t."finalStanding"
+    FROM team_owners tow
+    JOIN teams t ON t.id = tow.team_id
+"""
+
+OWNER_NAME = """coalesce(nullif(trim(concat_ws(' ', o."firstName", o."lastName")), ''), o."displayName")"""
+
+OWNER_CAREER_RECORDS = f"""
+    CREATE MATERIALIZED VIEW owner_career_records AS
+    SELECT ot.owner_id,
+           {OWNER_NAME} AS owner,
+           count(DISTINCT ot.year) AS seasons,
+           sum(ot.wins) AS wins,
+           sum(ot.losses) AS losses,
+           sum(ot.ties) AS ties,
+           sum(ot."pointsFor") AS "pointsFor",
+           sum(ot."pointsAgainst") AS "pointsAgainst",
+           count(*) FILTER (WHERE ot."finalStanding" = 1) AS championships
+    FROM ({OWNER_TEAMS}) ot
+    JOIN owners o ON o.id = ot.owner_id
+    GROUP BY ot.owner_id, o."firstName", o."lastName", o."displayName"
+    WITH DATA
+"""
+
+HEAD_TO_HEAD_RECORDS = """
+    CREATE MATERIALIZED VIEW head_to_head_records AS
+    WITH games AS (
+        SELECT home_team_id AS team_id, away_team_id AS opponent_id,
+               "homeScore" AS points_for, "awayScore" AS points_against
+        FROM matchups
+        WHERE home_team_id IS NOT NULL AND away_team_id IS NOT NULL
+          AND NOT ("homeScore" = 0 AND "awayScore" = 0)
+        UNION ALL
+        SELECT away_team_id, home_team_id, "awayScore", "homeScore"
+        FROM matchups
+        WHERE home_team_id IS NOT NULL AND away_team_id IS NOT NULL
+          AND NOT ("homeScore" = 0 AND "awayScore" = 0)
+    )
+    SELECT o.owner_id,
+           p.owner_id AS opponent_id,
+           count(*) AS games,
+           count(*) FILTER (WHERE g.points_for > g.points_against) AS wins,
+           count(*) FILTER (WHERE g.points_for < g.points_against) AS losses,
+           count(*) FILTER (WHERE g.points_for = g.points_against) AS ties,
+           sum(g.points_for) AS "pointsFor",
+           sum(g.points_against) AS "pointsAgainst"
+    FROM games g
+    JOIN team_owners o ON o.team_id = g.team_id
+    JOIN team_owners p ON p.team_id = g.opponent_id
+    WHERE o.owner_id <> p.owner_id
+    GROUP BY o.owner_id, p.owner_id
+    WITH DATA
+"""
+
+# The name-based views of revision f3b8d2e6a491, restored on downgrade
+LEGACY_OWNER_TEAMS = """
+    SELECT t.id AS team_id, t.year, trim(owner) AS owner, t.wins, t.losses, t.ties,
+           t."pointsFor", t."pointsAgainst", t."finalStanding"
+    FROM teams t
+    CROSS JOIN LATERAL regexp_split_to_table(t.owners, ',') AS owner
+    WHERE trim(owner) <> ''
+"""
+
+LEGACY_OWNER_CAREER_RECORDS = f"""
+    CREATE MATERIALIZED VIEW owner_career_records AS
+    SELECT owner, count(DISTINCT year) AS seasons, sum(wins) AS wins, sum(losses) AS losses,
+           sum(ties) AS ties, sum("pointsFor") AS "pointsFor", sum("pointsAgainst") AS "pointsAgainst",
+           count(*) FILTER (WHERE "finalStanding" = 1) AS championships
+    FROM ({LEGACY_OWNER_TEAMS}) owner_teams
+    GROUP BY owner
+    WITH DATA
+"""
+
+LEGACY_HEAD_TO_HEAD_RECORDS = f"""
+    CREATE MATERIALIZED VIEW head_to_head_records AS
+    WITH owner_teams AS ({LEGACY_OWNER_TEAMS}),
+    games AS (
+        SELECT home_team_id AS team_id, away_team_id AS opponent_id,
+               "homeScore" AS points_for, "awayScore" AS points_against
+        FROM matchups
+        WHERE home_team_id IS NOT NULL AND away_team_id IS NOT NULL
+          AND NOT ("homeScore" = 0 AND "awayScore" = 0)
+        UNION ALL
+        SELECT away_team_id, home_team_id, "awayScore", "homeScore"
+        FROM matchups
+        WHERE home_team_id IS NOT NULL AND away_team_id IS NOT NULL
+          AND NOT ("homeScore" = 0 AND "awayScore" = 0)
+    )
+    SELECT o.owner, p.owner AS opponent, count(*) AS games,
+           count(*) FILTER (WHERE g.points_for > g.points_against) AS wins,
+           count(*) FILTER (WHERE g.points_for < g.points_against) AS losses,
+           count(*) FILTER (WHERE g.points_for = g.points_against) AS ties,
+           sum(g.points_for) AS "pointsFor", sum(g.points_against) AS "pointsAgainst"
+    FROM games g
+    JOIN owner_teams o ON o.team_id = g.team_id
+    JOIN owner_teams p ON p.team_id = g.opponent_id
+    WHERE o.owner <> p.owner
+    GROUP BY o.owner, p.owner
+    WITH DATA
+"""
+
+
+def upgrade() -> None:
+    op.create_table('owners',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('espnId', sa.String(length=50), nullable=False),
+    sa.Column('displayName', sa.String(length=255), nullable=True),
+    sa.Column('firstName', sa.String(length=255), nullable=True),
+    sa.Column('lastName', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('espnId')
+    )
+    op.create_index('idx_owner_name', 'owners', ['lastName', 'firstName'], unique=False)
+    op.create_table('team_owners',
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['owners.id'], ),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('team_id', 'owner_id')
+    )
+    op.create_index('idx_team_owner_owner', 'team_owners', ['owner_id', 'team_id'], unique=False)
+    op.alter_column('teams', 'owners',
+               existing_type=sa.String(length=50),
+               type_=sa.String(length=255),
+               existing_nullable=True)
+
+    op.execute('DROP MATERIALIZED VIEW head_to_head_records')
+    op.execute('DROP MATERIALIZED VIEW owner_career_records')
+    op.execute(OWNER_CAREER_RECORDS)
+    op.execute('CREATE UNIQUE INDEX uix_owner_career_records ON owner_career_records (owner_id)')
+    op.execute(HEAD_TO_HEAD_RECORDS)
+    op.execute('CREATE UNIQUE INDEX uix_head_to_head_records ON head_to_head_records (owner_id, opponent_id)')
+
+
+def downgrade() -> None:
+    op.execute('DROP MATERIALIZED VIEW head_to_head_records')
+    op.execute('DROP MATERIALIZED VIEW owner_career_records')
+    op.execute(LEGACY_OWNER_CAREER_RECORDS)
+    op.execute('CREATE UNIQUE INDEX uix_owner_career_records ON owner_career_records (owner)')
+    op.execute(LEGACY_HEAD_TO_HEAD_RECORDS)
+    op.execute('CREATE UNIQUE INDEX uix_head_to_head_records ON head_to_head_records (owner, opponent)')
+
+    op.alter_column('teams', 'owners',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=50),
+               existing_nullable=True)
+    op.drop_index('idx_team_owner_owner', table_name='team_owners')
+    op.drop_table('team_owners')
+    op.drop_index('idx_owner_name', table_name='owners')
+    op.drop_table('owners')
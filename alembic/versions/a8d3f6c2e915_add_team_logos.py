@@ -0,0 +1,38 @@
+"""add team logos
+
+Revision ID: a8d3f6c2e915
+Revises: e7f1a3b9c528
+Create Date: 2026-10-19 21:07:43.518264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d3f6c2e915'
+down_revision: Union[str, None] = 'e7f1a3b9c528'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('team_logos',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('url', sa.String(length=255), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('contentType', sa.String(length=100), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('etag', sa.String(length=255), nullable=True),
+    sa.Column('lastModified', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.Integer(), nullable=True),
+    sa.Column('checkedAt', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('team_logos')
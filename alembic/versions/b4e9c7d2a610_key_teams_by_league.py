@@ -0,0 +1,29 @@
+"""key teams by league
+
+Revision ID: b4e9c7d2a610
+Revises: a8d3f6c2e915
+Create Date: 2026-10-19 23:42:10.611894
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e9c7d2a610'
+down_revision: Union[str, None] = 'a8d3f6c2e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Two leagues can each have a team 1 in the same season
+    op.drop_constraint('uix_team_year', 'teams', type_='unique')
+    op.create_unique_constraint('uix_team_league', 'teams', ['league_id', 'teamId'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uix_team_league', 'teams', type_='unique')
+    op.create_unique_constraint('uix_team_year', 'teams', ['teamId', 'year'])
@@ -0,0 +1,46 @@
+"""add roster snapshots
+
+Revision ID: b7e2a9d4c615
+Revises: 8d41e6c0f2a7
+Create Date: 2026-10-19 14:21:09.530662
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2a9d4c615'
+down_revision: Union[str, None] = '8d41e6c0f2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('lineup_slots',
+    sa.Column('id', sa.SmallInteger(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    # Season partitions (roster_snapshots_<year>) are created by the loader
+    op.create_table('roster_snapshots',
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.SmallInteger(), nullable=False),
+    sa.Column('weekFrom', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('weekTo', sa.SmallInteger(), nullable=False),
+    sa.Column('slot_id', sa.SmallInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.ForeignKeyConstraint(['slot_id'], ['lineup_slots.id'], ),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('team_id', 'player_id', 'year', 'weekFrom'),
+    postgresql_partition_by='LIST (year)'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('roster_snapshots')
+    op.drop_table('lineup_slots')
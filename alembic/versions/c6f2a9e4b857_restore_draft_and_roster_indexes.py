@@ -0,0 +1,39 @@
+"""restore draft and roster indexes
+
+Revision ID: c6f2a9e4b857
+Revises: b4e9c7d2a610
+Create Date: 2026-10-19 23:58:27.304519
+
+Revision d2e8b5c1f047 dropped these as prefixes of the draft and roster
+unique keys. Timing the conflict-update path without them gave mixed
+results, slower in several runs, so they are kept until that path is
+measured on Postgres.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a9e4b857'
+down_revision: Union[str, None] = 'b4e9c7d2a610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index -> (table, columns)
+RESTORED_INDEXES = {
+    'idx_draft_team_player_year': ('drafts', ['team_id', 'player_id']),
+    'idx_roster_team_player': ('rosters', ['team_id', 'player_id']),
+    'idx_roster_team': ('rosters', ['team_id']),
+}
+
+
+def upgrade() -> None:
+    for index, (table, columns) in RESTORED_INDEXES.items():
+        op.create_index(index, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for index, (table, _) in RESTORED_INDEXES.items():
+        op.drop_index(index, table_name=table)
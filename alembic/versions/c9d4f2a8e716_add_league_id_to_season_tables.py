@@ -0,0 +1,77 @@
+"""add league id to season tables
+
+Revision ID: c9d4f2a8e716
+Revises: a4c7e1f9d305
+Create Date: 2026-10-19 18:14:05.337810
+
+drafts, matchups and rosters get the league season (leagues.id) their
+teams belong to, so reads and deletes of one league's season need no join
+through teams. Existing rows are filled from their team in id-ranged
+batches; a matchup takes its home team's league, or its away team's on a bye.
+
+idx_matchup_week indexed week numbers shared by every season and is
+replaced by (league_id, week).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d4f2a8e716'
+down_revision: Union[str, None] = 'a4c7e1f9d305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_ROWS = 50000
+
+# Table -> the team a row takes its league from
+TEAM_COLUMN = {
+    'drafts': 'src.team_id',
+    'matchups': 'COALESCE(src.home_team_id, src.away_team_id)',
+    'rosters': 'src.team_id',
+}
+
+INDEXES = {
+    'drafts': ('idx_draft_league_pick', ['league_id', 'overallPick']),
+    'matchups': ('idx_matchup_league_week', ['league_id', 'week']),
+    'rosters': ('idx_roster_league_team', ['league_id', 'team_id']),
+}
+
+
+def _backfill(bind, table, team_sql):
+    """Set league_id from the teams in id ranges of BACKFILL_BATCH_ROWS."""
+    low, high = bind.execute(sa.text(f'SELECT min(id), max(id) FROM "{table}"')).first()
+    if low is None:
+        return
+    update = sa.text(
+        f'UPDATE "{table}" src SET league_id = t.league_id FROM teams t '
+        f'WHERE t.id = {team_sql} AND src.id >= :start AND src.id < :end'
+    )
+    for start in range(low, high + 1, BACKFILL_BATCH_ROWS):
+        bind.execute(update, {'start': start, 'end': start + BACKFILL_BATCH_ROWS})
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    for table, team_sql in TEAM_COLUMN.items():
+        op.add_column(table, sa.Column('league_id', sa.Integer(), nullable=True))
+        _backfill(bind, table, team_sql)
+        op.alter_column(table, 'league_id', existing_type=sa.Integer(), nullable=False)
+        op.create_foreign_key(f'{table}_league_id_fkey', table, 'leagues', ['league_id'], ['id'])
+        index, columns = INDEXES[table]
+        op.create_index(index, table, columns, unique=False)
+
+    op.drop_index('idx_matchup_week', table_name='matchups')
+
+
+def downgrade() -> None:
+    op.create_index('idx_matchup_week', 'matchups', ['week'], unique=False)
+
+    for table in TEAM_COLUMN:
+        index, _ = INDEXES[table]
+        op.drop_index(index, table_name=table)
+        op.drop_constraint(f'{table}_league_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'league_id')
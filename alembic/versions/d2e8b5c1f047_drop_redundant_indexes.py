@@ -0,0 +1,43 @@
+"""drop redundant indexes
+
+Revision ID: d2e8b5c1f047
+Revises: c9d4f2a8e716
+Create Date: 2026-10-19 18:56:30.118442
+
+Each of these indexes is a leading prefix of a unique constraint (or of
+another index) on the same table, which serves the same lookups, so they
+only added write cost to every upsert. Found with `espn_archive.py
+--audit-indexes`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2e8b5c1f047'
+down_revision: Union[str, None] = 'c9d4f2a8e716'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index -> (table, columns); the covering key is noted for each
+REDUNDANT_INDEXES = {
+    'idx_league_composite': ('leagues', ['leagueId', 'year']),           # uix_league_year
+    'idx_settings_league': ('settings', ['league_id']),                 # settings_league_id_key
+    'idx_team_year': ('teams', ['teamId', 'year']),                     # uix_team_year
+    'idx_draft_team_player_year': ('drafts', ['team_id', 'player_id']),  # uix_draft_pick
+    'idx_roster_team_player': ('rosters', ['team_id', 'player_id']),     # uix_roster_team_player
+    'idx_roster_team': ('rosters', ['team_id']),                        # uix_roster_team_player
+    'idx_activity_team': ('activities', ['team_id']),                   # idx_activity_team_player
+}
+
+
+def upgrade() -> None:
+    for index, (table, _) in REDUNDANT_INDEXES.items():
+        op.drop_index(index, table_name=table)
+
+
+def downgrade() -> None:
+    for index, (table, columns) in REDUNDANT_INDEXES.items():
+        op.create_index(index, table, columns, unique=False)
@@ -0,0 +1,210 @@
+"""partition high volume tables by year
+
+Revision ID: e5a1c8f03b92
+Revises: b7e2a9d4c615
+Create Date: 2026-10-19 15:40:26.771904
+
+Rebuilds drafts, matchups, rosters and activities as tables partitioned by
+season (PARTITION BY LIST (year)) with one partition per season in teams.
+Each table gains a year column, taken from the team the row belongs to.
+Existing rows are copied over in id-ranged batches, keeping their ids. The
+id sequence is kept too.
+
+Postgres requires the partition key in every unique key, so the primary
+keys become (id, year). The unique constraints and indexes are created on
+the parent and so exist per partition: reloading or purging one season only
+touches that season's index pages.
+
+Rows whose season cannot be determined are not copied: activities with no
+team, and matchups with neither a home nor an away team.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c8f03b92'
+down_revision: Union[str, None] = 'b7e2a9d4c615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_ROWS = 50000
+
+TABLES = {
+    'drafts': {
+        'columns': lambda: [
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.Column('player_id', sa.Integer(), nullable=False),
+            sa.Column('overallPick', sa.Integer(), nullable=False),
+            sa.Column('roundNum', sa.Integer(), nullable=False),
+            sa.Column('roundPick', sa.Integer(), nullable=False),
+            sa.Column('keeperStatus', sa.Boolean(), nullable=False),
+            sa.Column('bidAmount', sa.Integer(), nullable=False),
+            sa.Column('nominating_team_id', sa.Integer(), nullable=True),
+        ],
+        'year_from': 'JOIN teams t ON t.id = src.team_id',
+        'year': 't.year',
+        'foreign_keys': [('team_id', 'teams'), ('player_id', 'players'), ('nominating_team_id', 'teams')],
+        'unique': ('uix_draft_pick', ['team_id', 'player_id']),
+        'indexes': [('idx_draft_team_player_year', ['team_id', 'player_id'])],
+    },
+    'matchups': {
+        'columns': lambda: [
+            sa.Column('week', sa.Integer(), nullable=False),
+            sa.Column('home_team_id', sa.Integer(), nullable=True),
+            sa.Column('away_team_id', sa.Integer(), nullable=True),
+            sa.Column('homeScore', sa.Float(), nullable=False),
+            sa.Column('awayScore', sa.Float(), nullable=False),
+            sa.Column('isPlayoff', sa.Boolean(), nullable=False),
+            sa.Column('matchupType', sa.String(length=50), nullable=False),
+        ],
+        'year_from': 'LEFT JOIN teams h ON h.id = src.home_team_id LEFT JOIN teams a ON a.id = src.away_team_id',
+        'year': 'COALESCE(h.year, a.year)',
+        'foreign_keys': [('home_team_id', 'teams'), ('away_team_id', 'teams')],
+        'unique': ('uix_matchup', ['week', 'home_team_id', 'away_team_id']),
+        'indexes': [
+            ('idx_matchup_team_week', ['home_team_id', 'away_team_id', 'week']),
+            ('idx_matchup_week', ['week']),
+        ],
+    },
+    'rosters': {
+        'columns': lambda: [
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.Column('player_id', sa.Integer(), nullable=False),
+            sa.Column('rosterSlot', sa.String(length=50), nullable=True),
+        ],
+        'year_from': 'JOIN teams t ON t.id = src.team_id',
+        'year': 't.year',
+        'foreign_keys': [('team_id', 'teams'), ('player_id', 'players')],
+        'unique': ('uix_roster_team_player', ['team_id', 'player_id']),
+        'indexes': [
+            ('idx_roster_team_player', ['team_id', 'player_id']),
+            ('idx_roster_team', ['team_id']),
+        ],
+    },
+    'activities': {
+        'columns': lambda: [
+            sa.Column('date', sa.BigInteger(), nullable=True),
+            sa.Column('team_id', sa.Integer(), nullable=True),
+            sa.Column('player_id', sa.Integer(), nullable=False),
+            sa.Column('bidAmount', sa.Float(), nullable=True),
+            sa.Column('action', sa.String(length=50), nullable=True),
+        ],
+        'year_from': 'JOIN teams t ON t.id = src.team_id',
+        'year': 't.year',
+        'foreign_keys': [('team_id', 'teams'), ('player_id', 'players')],
+        'unique': None,
+        'indexes': [
+            ('idx_activity_team_player', ['team_id', 'player_id']),
+            ('idx_activity_team', ['team_id']),
+        ],
+    },
+}
+
+
+def _column_list(names):
+    return ", ".join(f'"{name}"' for name in names)
+
+
+def _backfill(bind, source, target, names, select_sql, join_sql='', condition='true'):
+    """Copy rows from source to target in id ranges of BACKFILL_BATCH_ROWS."""
+    low, high = bind.execute(sa.text(f'SELECT min(id), max(id) FROM "{source}"')).first()
+    if low is None:
+        return
+    insert = sa.text(
+        f'INSERT INTO "{target}" ({_column_list(names)}) '
+        f'SELECT {select_sql} FROM "{source}" src {join_sql} '
+        f'WHERE {condition} AND src.id >= :start AND src.id < :end'
+    )
+    for start in range(low, high + 1, BACKFILL_BATCH_ROWS):
+        bind.execute(insert, {'start': start, 'end': start + BACKFILL_BATCH_ROWS})
+
+
+def _add_keys(table, spec, primary_key):
+    op.create_primary_key(f'{table}_pkey', table, primary_key)
+    for column, referred in spec['foreign_keys']:
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referred, [column], ['id'])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    years = [row[0] for row in bind.execute(sa.text('SELECT DISTINCT year FROM teams ORDER BY year'))]
+
+    for table, spec in TABLES.items():
+        legacy = f'{table}_unpartitioned'
+        names = [column.name for column in spec['columns']()]
+
+        # Keep the id sequence alive when the old table is dropped
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+        op.rename_table(table, legacy)
+        op.execute(f'ALTER INDEX {table}_pkey RENAME TO {legacy}_pkey')
+        if spec['unique']:
+            op.drop_constraint(spec['unique'][0], legacy, type_='unique')
+        for index, _ in spec['indexes']:
+            op.drop_index(index, table_name=legacy)
+        for column, _ in spec['foreign_keys']:
+            op.drop_constraint(f'{table}_{column}_fkey', legacy, type_='foreignkey')
+
+        op.create_table(table,
+            sa.Column('id', sa.Integer(), server_default=sa.text(f"nextval('{table}_id_seq'::regclass)"), nullable=False),
+            sa.Column('year', sa.Integer(), nullable=False),
+            *spec['columns'](),
+            postgresql_partition_by='LIST (year)'
+        )
+        for year in years:
+            op.execute(f'CREATE TABLE {table}_{year} PARTITION OF {table} FOR VALUES IN ({year})')
+
+        _backfill(
+            bind, legacy, table, ['id', 'year'] + names,
+            f"src.id, {spec['year']}, " + ", ".join(f'src."{name}"' for name in names),
+            join_sql=spec['year_from'], condition=f"{spec['year']} IS NOT NULL",
+        )
+        op.drop_table(legacy)
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+        # Keys and indexes are built once, after the backfill, on every partition
+        _add_keys(table, spec, ['id', 'year'])
+        if spec['unique']:
+            name, columns = spec['unique']
+            op.create_unique_constraint(name, table, columns + ['year'])
+        for index, columns in spec['indexes']:
+            op.create_index(index, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    for table, spec in TABLES.items():
+        partitioned = f'{table}_partitioned'
+        names = [column.name for column in spec['columns']()]
+
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+        op.rename_table(table, partitioned)
+        op.execute(f'ALTER INDEX {table}_pkey RENAME TO {partitioned}_pkey')
+        if spec['unique']:
+            op.drop_constraint(spec['unique'][0], partitioned, type_='unique')
+        for index, _ in spec['indexes']:
+            op.drop_index(index, table_name=partitioned)
+        for column, _ in spec['foreign_keys']:
+            op.drop_constraint(f'{table}_{column}_fkey', partitioned, type_='foreignkey')
+
+        op.create_table(table,
+            sa.Column('id', sa.Integer(), server_default=sa.text(f"nextval('{table}_id_seq'::regclass)"), nullable=False),
+            *spec['columns']()
+        )
+        _backfill(
+            bind, partitioned, table, ['id'] + names,
+            "src.id, " + ", ".join(f'src."{name}"' for name in names),
+        )
+        # Dropping the parent drops every season partition
+        op.drop_table(partitioned)
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+        _add_keys(table, spec, ['id'])
+        if spec['unique']:
+            name, columns = spec['unique']
+            op.create_unique_constraint(name, table, columns)
+        for index, columns in spec['indexes']:
+            op.create_index(index, table, columns, unique=False)
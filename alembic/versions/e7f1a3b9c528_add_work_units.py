@@ -0,0 +1,44 @@
+"""add work units
+
+Revision ID: e7f1a3b9c528
+Revises: d2e8b5c1f047
+Create Date: 2026-10-19 19:42:17.905126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7f1a3b9c528'
+down_revision: Union[str, None] = 'd2e8b5c1f047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('work_units',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('leagueId', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('stage', sa.String(length=50), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('workerId', sa.String(length=255), nullable=True),
+    sa.Column('leaseExpiresAt', sa.DateTime(), nullable=True),
+    sa.Column('heartbeatAt', sa.DateTime(), nullable=True),
+    sa.Column('enqueuedAt', sa.DateTime(), nullable=False),
+    sa.Column('finishedAt', sa.DateTime(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('leagueId', 'year', 'stage', name='uix_work_unit')
+    )
+    op.create_index('idx_work_unit_claim', 'work_units', ['status', 'leaseExpiresAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_work_unit_claim', table_name='work_units')
+    op.drop_table('work_units')
@@ -0,0 +1,105 @@
+"""add standings and career summaries
+
+Revision ID: f3b8d2e6a491
+Revises: e5a1c8f03b92
+Create Date: 2026-10-19 16:52:13.204518
+
+season_standings is a plain table filled per season by the pipeline.
+owner_career_records and head_to_head_records are materialized views; each
+has a unique index so it can be refreshed CONCURRENTLY.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d2e6a491'
+down_revision: Union[str, None] = 'e5a1c8f03b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# One row per owner per team-season; co-owned teams count for every owner
+OWNER_TEAMS = """
+    SELECT t.id AS team_id, t.year, trim(owner) AS owner, t.wins, t.losses, t.ties,
+           t."pointsFor", t."pointsAgainst", t."finalStanding"
+    FROM teams t
+    CROSS JOIN LATERAL regexp_split_to_table(t.owners, ',') AS owner
+    WHERE trim(owner) <> ''
+"""
+
+OWNER_CAREER_RECORDS = f"""
+    CREATE MATERIALIZED VIEW owner_career_records AS
+    SELECT owner,
+           count(DISTINCT year) AS seasons,
+           sum(wins) AS wins,
+           sum(losses) AS losses,
+           sum(ties) AS ties,
+           sum("pointsFor") AS "pointsFor",
+           sum("pointsAgainst") AS "pointsAgainst",
+           count(*) FILTER (WHERE "finalStanding" = 1) AS championships
+    FROM ({OWNER_TEAMS}) owner_teams
+    GROUP BY owner
+    WITH DATA
+"""
+
+# Every played game from both sides, playoffs included
+HEAD_TO_HEAD_RECORDS = f"""
+    CREATE MATERIALIZED VIEW head_to_head_records AS
+    WITH owner_teams AS ({OWNER_TEAMS}),
+    games AS (
+        SELECT home_team_id AS team_id, away_team_id AS opponent_id,
+               "homeScore" AS points_for, "awayScore" AS points_against
+        FROM matchups
+        WHERE home_team_id IS NOT NULL AND away_team_id IS NOT NULL
+          AND NOT ("homeScore" = 0 AND "awayScore" = 0)
+        UNION ALL
+        SELECT away_team_id, home_team_id, "awayScore", "homeScore"
+        FROM matchups
+        WHERE home_team_id IS NOT NULL AND away_team_id IS NOT NULL
+          AND NOT ("homeScore" = 0 AND "awayScore" = 0)
+    )
+    SELECT o.owner,
+           p.owner AS opponent,
+           count(*) AS games,
+           count(*) FILTER (WHERE g.points_for > g.points_against) AS wins,
+           count(*) FILTER (WHERE g.points_for < g.points_against) AS losses,
+           count(*) FILTER (WHERE g.points_for = g.points_against) AS ties,
+           sum(g.points_for) AS "pointsFor",
+           sum(g.points_against) AS "pointsAgainst"
+    FROM games g
+    JOIN owner_teams o ON o.team_id = g.team_id
+    JOIN owner_teams p ON p.team_id = g.opponent_id
+    WHERE o.owner <> p.owner
+    GROUP BY o.owner, p.owner
+    WITH DATA
+"""
+
+
+def upgrade() -> None:
+    op.create_table('season_standings',
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('week', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('losses', sa.Integer(), nullable=False),
+    sa.Column('ties', sa.Integer(), nullable=False),
+    sa.Column('pointsFor', sa.Float(), nullable=False),
+    sa.Column('pointsAgainst', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('year', 'week', 'team_id')
+    )
+    op.create_index('idx_season_standings_team', 'season_standings', ['team_id'], unique=False)
+
+    op.execute(OWNER_CAREER_RECORDS)
+    op.execute('CREATE UNIQUE INDEX uix_owner_career_records ON owner_career_records (owner)')
+    op.execute(HEAD_TO_HEAD_RECORDS)
+    op.execute('CREATE UNIQUE INDEX uix_head_to_head_records ON head_to_head_records (owner, opponent)')
+
+
+def downgrade() -> None:
+    op.execute('DROP MATERIALIZED VIEW head_to_head_records')
+    op.execute('DROP MATERIALIZED VIEW owner_career_records')
+    op.drop_index('idx_season_standings_team', table_name='season_standings')
+    op.drop_table('season_standings')
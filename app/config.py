@@ -0,0 +1,16 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load variables from the .env file once, on first use."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def get_env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read an environment variable, loading the .env file first if needed."""
+    load_env()
+    return os.getenv(name, default)
@@ -0,0 +1,129 @@
+"""
+Find indexes that cost write time without serving reads.
+
+Every upsert maintains every index on the table it writes, so an index that
+duplicates another pays that cost for nothing. Two kinds are reported:
+
+    duplicate   a non-unique index whose columns are a leading prefix of
+                another index, unique constraint or primary key on the same
+                table, which can serve the same lookups
+    unused      a non-unique index Postgres has never scanned since its
+                statistics were last reset (pg_stat_user_indexes)
+
+On Postgres both come from the live catalog, so indexes created outside the
+models are audited too; partition indexes are summed up to the index on the
+partitioned table. Other targets have no usage statistics and are only
+checked for duplicates, through the SQLAlchemy inspector.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+
+from app.db.session import get_engine
+
+
+@dataclass(frozen=True)
+class IndexFinding:
+    table: str
+    index: str
+    kind: str                       # 'duplicate' or 'unused'
+    detail: str
+    size_bytes: Optional[int] = None
+
+
+_PG_DUPLICATES = text("""
+    SELECT DISTINCT ON (t.relname, i.relname)
+           t.relname, i.relname, o.relname,
+           (SELECT sum(pg_relation_size(relid)) FROM pg_partition_tree(x.indexrelid))
+    FROM pg_index x
+    JOIN pg_index y ON y.indrelid = x.indrelid AND y.indexrelid <> x.indexrelid
+    JOIN pg_class t ON t.oid = x.indrelid
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_class o ON o.oid = y.indexrelid
+    WHERE t.relnamespace = current_schema()::regnamespace
+      AND NOT t.relispartition
+      AND NOT x.indisunique
+      AND x.indexprs IS NULL AND x.indpred IS NULL
+      AND y.indexprs IS NULL AND y.indpred IS NULL
+      -- indkey is the space-separated column numbers, e.g. '2 3'
+      AND y.indkey::text || ' ' LIKE x.indkey::text || ' %'
+      -- Of two identical non-unique indexes only the newer one is reported
+      AND (y.indisunique OR y.indnatts > x.indnatts OR y.indexrelid < x.indexrelid)
+    ORDER BY t.relname, i.relname, y.indisunique DESC
+""")
+
+# Partition indexes are attached to their parent index through pg_inherits
+_PG_UNUSED = text("""
+    SELECT coalesce(pt.relname, s.relname), coalesce(pi.relname, s.indexrelname),
+           sum(pg_relation_size(s.indexrelid))
+    FROM pg_stat_user_indexes s
+    JOIN pg_index x ON x.indexrelid = s.indexrelid
+    LEFT JOIN pg_inherits h ON h.inhrelid = s.indexrelid
+    LEFT JOIN pg_class pi ON pi.oid = h.inhparent
+    LEFT JOIN pg_index px ON px.indexrelid = h.inhparent
+    LEFT JOIN pg_class pt ON pt.oid = px.indrelid
+    WHERE s.schemaname = current_schema() AND NOT x.indisunique AND NOT x.indisprimary
+    GROUP BY 1, 2
+    HAVING sum(s.idx_scan) = 0
+    ORDER BY 1, 2
+""")
+
+_PG_STATS_RESET = text("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+
+
+def _prefix_duplicates(table_name, indexes, unique_keys) -> List[IndexFinding]:
+    """
+    Non-unique indexes covered by another key of the same table.
+
+    indexes is [(name, columns, unique)], unique_keys [(name, columns)] for the
+    primary key and unique constraints.
+    """
+    # Unique keys first, so a unique constraint is named as the cover when there is one
+    keys = [(name, columns, True) for name, columns in unique_keys] + list(indexes)
+    findings = []
+    for name, columns, unique in sorted(indexes):
+        if unique:
+            continue
+        for other_name, other, other_unique in keys:
+            if other_name == name or other[:len(columns)] != columns:
+                continue
+            # Of two identical non-unique indexes only one is reported
+            if other_unique or len(other) > len(columns) or other_name < name:
+                findings.append(IndexFinding(table_name, name, "duplicate",
+                                             f"({', '.join(columns)}) is a prefix of {other_name}"))
+                break
+    return findings
+
+
+def inspected_duplicate_indexes(engine) -> List[IndexFinding]:
+    """Duplicate indexes of any database, read through the SQLAlchemy inspector."""
+    inspector = inspect(engine)
+    findings = []
+    for table_name in inspector.get_table_names():
+        indexes = [(index["name"], index["column_names"], bool(index["unique"]))
+                   for index in inspector.get_indexes(table_name)]
+        unique_keys = [(constraint["name"] or f"{table_name} unique", constraint["column_names"])
+                       for constraint in inspector.get_unique_constraints(table_name)]
+        primary_key = inspector.get_pk_constraint(table_name)
+        if primary_key["constrained_columns"]:
+            unique_keys.append((primary_key["name"] or f"{table_name} primary key", primary_key["constrained_columns"]))
+        findings.extend(_prefix_duplicates(table_name, indexes, unique_keys))
+    return findings
+
+
+def audit_indexes(engine=None) -> List[IndexFinding]:
+    """Return duplicate and unused indexes of the archive database."""
+    engine = engine or get_engine()
+    if engine.dialect.name != "postgresql":
+        return inspected_duplicate_indexes(engine)
+
+    findings = []
+    with engine.connect() as conn:
+        for table, index, covered_by, size in conn.execute(_PG_DUPLICATES):
+            findings.append(IndexFinding(table, index, "duplicate", f"prefix of {covered_by}", size))
+        reset = conn.execute(_PG_STATS_RESET).scalar()
+        since = f"since {reset:%Y-%m-%d}" if reset else "since statistics collection began"
+        for table, index, size in conn.execute(_PG_UNUSED):
+            findings.append(IndexFinding(table, index, "unused", f"never scanned {since}", size))
+    return findings
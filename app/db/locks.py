@@ -0,0 +1,77 @@
+"""
+Advisory locks that keep overlapping pipeline runs off the same seasons.
+
+A run locks every (league, season) it is about to fetch and load with a
+session-level Postgres advisory lock, held on a dedicated connection until
+the run ends. What happens when another run already holds a season depends
+on the lock mode:
+
+    wait    block until the other run releases it, then load it
+    skip    leave that season out of this run
+    exit    end this run without loading anything
+
+Locks are taken in sorted order, so two waiting runs cannot deadlock on
+each other. Postgres releases them by itself if the run's connection drops.
+Targets without advisory locks (SQLite serializes writers on its file lock)
+treat every season as locked.
+"""
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import text
+
+from app.db.session import get_engine
+from app.db.targets import target_for
+
+LOCK_MODES = ("wait", "skip", "exit")
+
+_LOCK = text("SELECT pg_advisory_lock(:league_id, :year)")
+_TRY_LOCK = text("SELECT pg_try_advisory_lock(:league_id, :year)")
+_UNLOCK = text("SELECT pg_advisory_unlock(:league_id, :year)")
+
+
+@contextmanager
+def season_locks(league_id, years: Iterable[int], mode: str = "wait") -> Iterator[List[int]]:
+    """
+    Lock a league's seasons for the duration of the block and yield the seasons locked.
+
+    In skip mode the seasons held by another run are left out; in exit mode
+    nothing is locked (an empty list) if any season is held. ESPN league ids
+    fit Postgres' int4 lock keys, so (league id, season) is used as the key
+    pair directly.
+    """
+    if mode not in LOCK_MODES:
+        raise ValueError(f"Unknown lock mode '{mode}', expected one of: {', '.join(LOCK_MODES)}")
+    years = sorted(set(years))
+    engine = get_engine()
+    if not target_for(engine).supports_advisory_locks:
+        yield years
+        return
+
+    locked = []
+    with engine.connect() as conn:
+        try:
+            for year in years:
+                params = {'league_id': int(league_id), 'year': year}
+                if mode == "wait":
+                    conn.execute(_LOCK, params)
+                    locked.append(year)
+                elif conn.execute(_TRY_LOCK, params).scalar():
+                    locked.append(year)
+                elif mode == "exit":
+                    # Another run holds a season, give back what was taken
+                    _unlock(conn, league_id, locked)
+                    locked = []
+                    break
+            # End the autobegun transaction so the connection does not sit idle
+            # in a transaction while the run works; session locks outlive it
+            conn.commit()
+            yield locked
+        finally:
+            _unlock(conn, league_id, locked)
+
+
+def _unlock(conn, league_id, years: List[int]) -> None:
+    for year in years:
+        conn.execute(_UNLOCK, {'league_id': int(league_id), 'year': year})
+    conn.commit()
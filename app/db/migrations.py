@@ -0,0 +1,103 @@
+"""
+Fast migration gate.
+
+Compares the revision stored in ``alembic_version`` with the head of the
+script directory so routine runs can skip ``command.upgrade`` entirely.
+The script heads are cached on disk keyed by a fingerprint of the versions
+directory, so Alembic only loads the migration scripts when they change.
+"""
+import configparser
+import json
+import os
+import time
+from typing import Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+MIGRATION_CACHE_FILE = os.path.join("./shelf_cache", "alembic_heads.json")
+
+
+def _versions_dir(alembic_cfg_path: str) -> str:
+    """Resolve the versions directory from alembic.ini without importing Alembic."""
+    parser = configparser.ConfigParser()
+    parser.read(alembic_cfg_path)
+    script_location = parser.get("alembic", "script_location", fallback="alembic")
+    base_dir = os.path.dirname(os.path.abspath(alembic_cfg_path))
+    return os.path.join(base_dir, script_location, "versions")
+
+
+def _versions_fingerprint(versions_dir: str) -> str:
+    """Fingerprint the migration scripts by name, size and modification time."""
+    entries = []
+    for name in sorted(os.listdir(versions_dir)):
+        if name.endswith(".py"):
+            stat = os.stat(os.path.join(versions_dir, name))
+            entries.append(f"{name}:{stat.st_size}:{int(stat.st_mtime)}")
+    return "|".join(entries)
+
+
+def _read_cache() -> dict:
+    try:
+        with open(MIGRATION_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(data: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(MIGRATION_CACHE_FILE), exist_ok=True)
+        with open(MIGRATION_CACHE_FILE, "w") as f:
+            json.dump(data, f)
+    except OSError:
+        # The cache is only an optimization, a read-only volume should not fail the run
+        pass
+
+
+def get_script_heads(alembic_cfg_path: str = "alembic.ini") -> Tuple[str, ...]:
+    """
+    Return the head revision(s) of the migration script directory.
+
+    Uses the cached heads when the versions directory is unchanged, otherwise
+    loads the scripts through Alembic and refreshes the cache.
+    """
+    fingerprint = _versions_fingerprint(_versions_dir(alembic_cfg_path))
+    cache = _read_cache()
+    if cache.get("fingerprint") == fingerprint and cache.get("heads"):
+        return tuple(cache["heads"])
+
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    heads = tuple(sorted(ScriptDirectory.from_config(Config(alembic_cfg_path)).get_heads()))
+    cache.update({"fingerprint": fingerprint, "heads": list(heads)})
+    _write_cache(cache)
+    return heads
+
+
+def get_database_revisions(engine) -> Set[str]:
+    """Return the revisions recorded in alembic_version, empty if the table does not exist."""
+    try:
+        with engine.connect() as conn:
+            return {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+    except SQLAlchemyError:
+        return set()
+
+
+def is_at_head(engine, alembic_cfg_path: str = "alembic.ini") -> bool:
+    """Check whether the database is already at the script directory's head."""
+    revisions = get_database_revisions(engine)
+    return bool(revisions) and revisions == set(get_script_heads(alembic_cfg_path))
+
+
+def record_upgrade_duration(seconds: float) -> None:
+    """Remember how long the last real upgrade took, to report time saved when skipping."""
+    cache = _read_cache()
+    cache["last_upgrade_seconds"] = round(seconds, 3)
+    _write_cache(cache)
+
+
+def last_upgrade_duration() -> Optional[float]:
+    """Duration of the last real upgrade in seconds, if one has been recorded."""
+    return _read_cache().get("last_upgrade_seconds")
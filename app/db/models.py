@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Float, JSON, Boolean, UniqueConstraint, Index, BigInteger
+from sqlalchemy import Column, Integer, SmallInteger, String, ForeignKey, Text, Float, JSON, Boolean, UniqueConstraint, Index, BigInteger, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# Tables declared with postgresql_partition_by are partitioned by season in
+# Postgres, one partition per year (see app/db/partitions.py). Postgres needs
+# the partition key in every unique key, so there the primary key of drafts,
+# matchups, rosters and activities is (id, year); ids stay unique through the
+# table's sequence. Other databases store these tables unpartitioned.
+
 class FFleague(Base):
     __tablename__ = 'leagues'
     id = Column(Integer, primary_key=True)
@@ -19,7 +25,6 @@ class FFleague(Base):
     
     __table_args__ = (
         UniqueConstraint('leagueId', 'year', name='uix_league_year'),
-        Index('idx_league_composite', 'leagueId', 'year')
     )
 
 class Settings(Base):
@@ -43,7 +48,6 @@ class Settings(Base):
     league = relationship("FFleague", back_populates="settings")
     
     __table_args__ = (
-        Index('idx_settings_league', 'league_id'),
     )
 
 class Team(Base):
@@ -54,7 +58,7 @@ class Team(Base):
     year = Column(Integer, nullable=False)
     teamAbbrv = Column(String(10), nullable=False)
     teamName = Column(String(255), nullable=False)
-    owners = Column(String(50))
+    owners = Column(String(255))  # Display names, comma-joined; see team_owners for owner queries
     divisionId = Column(String(255))
     divisionName = Column(String(255))
     wins = Column(Integer, default=0)
@@ -83,11 +87,43 @@ class Team(Base):
     activities = relationship("Activity", back_populates="team")
     draft_picks = relationship("Draft", back_populates="team", foreign_keys="[Draft.team_id]")
     draft_nominations = relationship("Draft", back_populates="nominating_team", foreign_keys="[Draft.nominating_team_id]")
+    weekly_stats = relationship("PlayerWeeklyStat", back_populates="team")
+    roster_snapshots = relationship("RosterSnapshot", back_populates="team")
+    team_owners = relationship("TeamOwner", back_populates="team")
 
     __table_args__ = (
-        UniqueConstraint('teamId', 'year', name='uix_team_year'),
+        UniqueConstraint('league_id', 'teamId', name='uix_team_league'),
         Index('idx_team_league_year', 'league_id', 'year'),
-        Index('idx_team_year', 'teamId', 'year')
+    )
+
+class Owner(Base):
+    __tablename__ = 'owners'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    espnId = Column(String(50), unique=True, nullable=False)  # ESPN member id, e.g. '{8C8B...}'
+    displayName = Column(String(255))
+    firstName = Column(String(255))
+    lastName = Column(String(255))
+
+    # Relationships
+    team_owners = relationship("TeamOwner", back_populates="owner")
+
+    __table_args__ = (
+        Index('idx_owner_name', 'lastName', 'firstName'),
+    )
+
+class TeamOwner(Base):
+    """Bridge between teams and owners; co-managed teams have one row per owner."""
+    __tablename__ = 'team_owners'
+    team_id = Column(Integer, ForeignKey('teams.id'), primary_key=True)
+    owner_id = Column(Integer, ForeignKey('owners.id'), primary_key=True)
+
+    # Relationships
+    team = relationship("Team", back_populates="team_owners")
+    owner = relationship("Owner", back_populates="team_owners")
+
+    __table_args__ = (
+        # The primary key serves team -> owners, this serves owner -> teams
+        Index('idx_team_owner_owner', 'owner_id', 'team_id'),
     )
 
 class Player(Base):
@@ -101,6 +137,8 @@ class Player(Base):
     rosters = relationship("Roster", back_populates="player")
     activities = relationship("Activity", back_populates="player")
     drafts = relationship("Draft", back_populates="player")
+    weekly_stats = relationship("PlayerWeeklyStat", back_populates="player")
+    roster_snapshots = relationship("RosterSnapshot", back_populates="player")
 
     __table_args__ = (
         Index('idx_player_name', 'name'),
@@ -110,6 +148,8 @@ class Player(Base):
 class Draft(Base):
     __tablename__ = 'drafts'
     id = Column(Integer, primary_key=True, autoincrement=True)
+    year = Column(Integer, nullable=False)  # Season, the partition key
+    league_id = Column(Integer, ForeignKey('leagues.id'), nullable=False)  # League season, as on the team
     team_id = Column(Integer, ForeignKey('teams.id'), nullable=False)
     player_id = Column(Integer, ForeignKey('players.id'), nullable=False)
     overallPick = roundNum = Column(Integer, nullable=False)
@@ -125,14 +165,18 @@ class Draft(Base):
     nominating_team = relationship("Team", back_populates="draft_nominations", foreign_keys=[nominating_team_id])
 
     __table_args__ = (
-        UniqueConstraint('team_id', 'player_id', name='uix_draft_pick'),
-        Index('idx_draft_team_player_year', 'team_id', 'player_id')
+        UniqueConstraint('team_id', 'player_id', 'year', name='uix_draft_pick'),
+        Index('idx_draft_team_player_year', 'team_id', 'player_id'),
+        Index('idx_draft_league_pick', 'league_id', 'overallPick'),
+        {'postgresql_partition_by': 'LIST (year)'}
     )
 
 class Matchup(Base):
     __tablename__ = 'matchups'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
+    year = Column(Integer, nullable=False)  # Season, the partition key
+    league_id = Column(Integer, ForeignKey('leagues.id'), nullable=False)  # League season, as on the teams
     week = Column(Integer, nullable=False)
     home_team_id = Column(Integer, ForeignKey('teams.id'), nullable=True)
     away_team_id = Column(Integer, ForeignKey('teams.id'), nullable=True)
@@ -146,14 +190,16 @@ class Matchup(Base):
     away_team = relationship("Team", foreign_keys=[away_team_id], back_populates="away_matchups")
     
     __table_args__ = (
-        UniqueConstraint('week', 'home_team_id', 'away_team_id', name='uix_matchup'),
+        UniqueConstraint('week', 'home_team_id', 'away_team_id', 'year', name='uix_matchup'),
         Index('idx_matchup_team_week', 'home_team_id', 'away_team_id', 'week'),
-        Index('idx_matchup_week', 'week')
+        Index('idx_matchup_league_week', 'league_id', 'week'),
+        {'postgresql_partition_by': 'LIST (year)'}
     )
 
 class Activity(Base):
     __tablename__ = 'activities'
     id = Column(Integer, primary_key=True, autoincrement=True)
+    year = Column(Integer, nullable=False)  # Season, the partition key
     date = Column(BigInteger)
     team_id = Column(Integer, ForeignKey('teams.id'))
     player_id = Column(Integer, ForeignKey('players.id'), nullable=False)
@@ -166,12 +212,14 @@ class Activity(Base):
 
     __table_args__ = (
         Index('idx_activity_team_player', 'team_id', 'player_id'),
-        Index('idx_activity_team', 'team_id')
+        {'postgresql_partition_by': 'LIST (year)'}
     )
 
 class Roster(Base):
     __tablename__ = 'rosters'
     id = Column(Integer, primary_key=True, autoincrement=True)
+    year = Column(Integer, nullable=False)  # Season, the partition key
+    league_id = Column(Integer, ForeignKey('leagues.id'), nullable=False)  # League season, as on the team
     team_id = Column(Integer, ForeignKey('teams.id'), nullable=False)
     player_id = Column(Integer, ForeignKey('players.id'), nullable=False)
     rosterSlot = Column(String(50))
@@ -181,7 +229,125 @@ class Roster(Base):
     player = relationship("Player", back_populates="rosters")
 
     __table_args__ = (
-        UniqueConstraint('team_id', 'player_id', name='uix_roster_team_player'),
+        UniqueConstraint('team_id', 'player_id', 'year', name='uix_roster_team_player'),
         Index('idx_roster_team_player', 'team_id', 'player_id'),
-        Index('idx_roster_team', 'team_id')
-    )
\ No newline at end of file
+        Index('idx_roster_team', 'team_id'),
+        Index('idx_roster_league_team', 'league_id', 'team_id'),
+        {'postgresql_partition_by': 'LIST (year)'}
+    )
+
+class PlayerWeeklyStat(Base):
+    __tablename__ = 'player_weekly_stats'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(Integer, ForeignKey('players.id'), nullable=False)
+    team_id = Column(Integer, ForeignKey('teams.id'), nullable=False)  # Fantasy team the player was rostered on that week
+    year = Column(Integer, nullable=False)
+    week = Column(Integer, nullable=False)  # Scoring period
+    points = Column(Float, nullable=False, default=0.0)
+    projectedPoints = Column(Float, nullable=False, default=0.0)
+    lineupSlot = Column(String(20))  # e.g. 'QB', 'FLEX', 'BE', 'IR'
+
+    # Relationships
+    player = relationship("Player", back_populates="weekly_stats")
+    team = relationship("Team", back_populates="weekly_stats")
+
+    __table_args__ = (
+        UniqueConstraint('player_id', 'year', 'week', name='uix_player_week'),
+        Index('idx_player_week_team', 'team_id', 'year', 'week')
+    )
+
+class LineupSlot(Base):
+    __tablename__ = 'lineup_slots'
+    # SQLite only autoincrements an INTEGER PRIMARY KEY
+    id = Column(SmallInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    name = Column(String(20), unique=True, nullable=False)  # e.g. 'QB', 'RB/WR/TE', 'BE'
+
+class RosterSnapshot(Base):
+    """
+    Weekly rosters stored as spans: one row per stretch of consecutive weeks a
+    player spent on a team in the same lineup slot. The roster for week w is
+    every row with weekFrom <= w <= weekTo. Partitioned by season in Postgres.
+    """
+    __tablename__ = 'roster_snapshots'
+    team_id = Column(Integer, ForeignKey('teams.id'), primary_key=True)
+    player_id = Column(Integer, ForeignKey('players.id'), primary_key=True)
+    year = Column(SmallInteger, primary_key=True)
+    weekFrom = Column(SmallInteger, primary_key=True, autoincrement=False)
+    weekTo = Column(SmallInteger, nullable=False)
+    slot_id = Column(SmallInteger, ForeignKey('lineup_slots.id'), nullable=False)
+
+    # Relationships
+    team = relationship("Team", back_populates="roster_snapshots")
+    player = relationship("Player", back_populates="roster_snapshots")
+    slot = relationship("LineupSlot")
+
+    __table_args__ = (
+        {'postgresql_partition_by': 'LIST (year)'},
+    )
+
+class SeasonStanding(Base):
+    """
+    Regular-season standings after every week, precomputed from matchups.
+    Rebuilt per season by app/db/summaries.py at the end of a pipeline run.
+    """
+    __tablename__ = 'season_standings'
+    year = Column(Integer, primary_key=True)
+    week = Column(Integer, primary_key=True)
+    team_id = Column(Integer, ForeignKey('teams.id'), primary_key=True)
+    wins = Column(Integer, nullable=False)
+    losses = Column(Integer, nullable=False)
+    ties = Column(Integer, nullable=False)
+    pointsFor = Column(Float, nullable=False)
+    pointsAgainst = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index('idx_season_standings_team', 'team_id'),
+    )
+
+class WorkUnit(Base):
+    """One (league, season, stage) unit of the shared work queue, see app/services/work_queue.py."""
+    __tablename__ = 'work_units'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    leagueId = Column(Integer, nullable=False)  # ESPN's league ID
+    year = Column(Integer, nullable=False)
+    stage = Column(String(50), nullable=False)  # Pipeline stage, e.g. 'teams'
+    position = Column(Integer, nullable=False)  # Order of the stage within a season
+    status = Column(String(20), nullable=False, default='pending')  # pending, claimed, done or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    workerId = Column(String(255))  # Worker holding the lease while claimed
+    leaseExpiresAt = Column(DateTime)
+    heartbeatAt = Column(DateTime)
+    enqueuedAt = Column(DateTime, nullable=False)
+    finishedAt = Column(DateTime)
+    error = Column(Text)
+
+    __table_args__ = (
+        UniqueConstraint('leagueId', 'year', 'stage', name='uix_work_unit'),
+        Index('idx_work_unit_claim', 'status', 'leaseExpiresAt'),
+    )
+
+class PipelineCheckpoint(Base):
+    __tablename__ = 'pipeline_checkpoints'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    leagueId = Column(Integer, nullable=False)  # ESPN's league ID
+    year = Column(Integer, nullable=False)
+    stage = Column(String(50), nullable=False)  # Pipeline stage, e.g. 'teams'
+    contentHash = Column(String(64), nullable=False)  # Fingerprint of the season data that was loaded
+    completedAt = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('leagueId', 'year', 'stage', name='uix_checkpoint_unit'),
+    )
+
+class TeamLogo(Base):
+    """A team logo archived from Team.logoUrl, stored by content hash, see app/services/logos.py."""
+    __tablename__ = 'team_logos'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String(255), nullable=False, unique=True)  # Team.logoUrl
+    sha256 = Column(String(64))  # Hash of the archived image, names its file; NULL if never downloaded
+    contentType = Column(String(100))
+    size = Column(Integer)  # Bytes
+    etag = Column(String(255))  # Validators of the download, sent back on the next check
+    lastModified = Column(String(100))
+    status = Column(Integer)  # HTTP status of the last check, e.g. 200, 304 or 404
+    checkedAt = Column(DateTime)
@@ -0,0 +1,95 @@
+"""
+Season partitions for tables declared with postgresql_partition_by='LIST (year)'.
+
+Postgres rejects rows for which no partition exists, so loaders call
+ensure_partitions with the seasons they are about to write. Each partition
+is named <table>_<year>. Targets without declarative partitioning (SQLite)
+store the table unpartitioned and this is a no-op.
+
+A season can be removed in one step with purge_season (TRUNCATE of each
+season partition, which also forgets the season's checkpoints) or taken
+out of the table with detach_season.
+"""
+from typing import Iterable, Set, Tuple
+
+from app.db.session import get_engine
+from app.db.targets import target_for
+
+_created: Set[Tuple[str, str, int]] = set()
+
+
+def is_partitioned(model) -> bool:
+    """Whether a model's table is partitioned by season in Postgres."""
+    return bool(model.__table__.dialect_options["postgresql"].get("partition_by"))
+
+
+def partition_name(table_name: str, year: int) -> str:
+    return f"{table_name}_{int(year)}"
+
+
+def ensure_partitions(model, years: Iterable[int]) -> None:
+    """Create the season partitions of a partitioned table that do not exist yet."""
+    if not is_partitioned(model):
+        return
+    engine = get_engine()
+    if not target_for(engine).supports_partitions:
+        return
+
+    table_name = model.__table__.name
+    url = str(engine.url)
+    missing = sorted(year for year in {int(year) for year in years} if (url, table_name, year) not in _created)
+    if not missing:
+        return
+    with engine.begin() as conn:
+        for year in missing:
+            conn.exec_driver_sql(
+                f'CREATE TABLE IF NOT EXISTS "{partition_name(table_name, year)}" '
+                f'PARTITION OF "{table_name}" FOR VALUES IN ({year})'
+            )
+    _created.update((url, table_name, year) for year in missing)
+
+
+def partitioned_models():
+    """Every model whose table is partitioned by season."""
+    from app.db.models import Base
+    return [mapper.class_ for mapper in Base.registry.mappers if is_partitioned(mapper.class_)]
+
+
+def detach_season(model, year: int) -> str:
+    """
+    Detach a season's partition from its table and return the partition's name.
+
+    The season disappears from the table instantly but is kept as a standalone
+    table, e.g. to archive it with pg_dump or to drop it later.
+    """
+    table_name = model.__table__.name
+    name = partition_name(table_name, year)
+    with get_engine().begin() as conn:
+        conn.exec_driver_sql(f'ALTER TABLE "{table_name}" DETACH PARTITION "{name}"')
+    _created.discard((str(get_engine().url), table_name, int(year)))
+    return name
+
+
+def purge_season(year: int) -> None:
+    """
+    Remove one season from every partitioned table, e.g. before reloading it from scratch.
+
+    In Postgres each season partition is truncated, which neither deletes row
+    by row nor touches the indexes of other seasons. Elsewhere the season's
+    rows are deleted. The season's pipeline checkpoints are deleted in the
+    same transaction, so --resume and the daemon load it again.
+    """
+    from app.db.models import PipelineCheckpoint
+
+    engine = get_engine()
+    partitioned = target_for(engine).supports_partitions
+    with engine.begin() as conn:
+        for model in partitioned_models():
+            table_name = model.__table__.name
+            if partitioned:
+                name = partition_name(table_name, year)
+                if conn.exec_driver_sql(f"SELECT to_regclass('\"{name}\"')").scalar() is not None:
+                    conn.exec_driver_sql(f'TRUNCATE "{name}"')
+            else:
+                conn.execute(model.__table__.delete().where(model.__table__.c.year == int(year)))
+        conn.execute(PipelineCheckpoint.__table__.delete().where(PipelineCheckpoint.year == int(year)))
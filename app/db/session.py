@@ -1,18 +1,50 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-import os
+from functools import lru_cache
+from typing import Optional
 
-# Load DB URL from .env file
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
+from app.config import get_env
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engines = {}
+
+def get_engine(database_url: Optional[str] = None):
+    """
+    Return the shared engine for a database URL, creating it on first use.
+
+    Defaults to DATABASE_URL from the environment. Engines are cached per URL
+    so every caller shares one connection pool. The URL's dialect picks the
+    storage target (see app/db/targets.py). Every statement is timed, see
+    app/db/statements.py.
+    """
+    from sqlalchemy import create_engine
+    from app.db.statements import instrument_engine
+    from app.db.targets import target_for
+
+    url = database_url or get_env("DATABASE_URL")
+    if url not in _engines:
+        engine = create_engine(url)
+        target = target_for(engine)
+        target.configure_engine(engine)
+        instrument_engine(engine, target.explain_prefix)
+        _engines[url] = engine
+    return _engines[url]
+
+@lru_cache(maxsize=None)
+def _session_factory():
+    from sqlalchemy.orm import sessionmaker
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+def SessionLocal():
+    """Create a new session bound to the default engine."""
+    return _session_factory()()
+
+def __getattr__(name):
+    # Keep `from app.db.session import engine` working without creating it at import
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
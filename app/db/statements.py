@@ -0,0 +1,193 @@
+"""
+SQL statement instrumentation.
+
+Engine event hooks time every statement the archive executes: KeyResolver
+lookups, upsert batches, COPY merges, summary refreshes and health checks.
+Statements are aggregated by pipeline stage and by shape. The shape is the
+statement with its bound parameters and literals replaced by ?, and with
+IN lists and multi-row VALUES collapsed to one element, so every batch of
+an upsert counts as the same statement. statement_stats() returns the
+aggregates and log_statement_stats() logs them at the end of a run.
+
+A statement slower than SLOW_QUERY_MS (default 1000, 0 disables) is logged
+with its plan. The plan comes from EXPLAIN (EXPLAIN QUERY PLAN on SQLite),
+taken once per shape on the same connection right after the statement, so
+it also sees the temporary COPY staging tables. Only SELECT, INSERT, UPDATE,
+DELETE and WITH statements are explained. EXPLAIN does not run the
+statement again.
+
+The COPY data transfer itself runs on the raw DBAPI cursor and is not
+timed here; its batches show up in log_batch_stats().
+"""
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config import get_env
+
+logger = logging.getLogger(__name__)
+
+# Stage label for statements run outside any pipeline stage, e.g. migrations and health checks
+NO_STAGE = "-"
+
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+_stage: ContextVar[str] = ContextVar("sql_stage", default=NO_STAGE)
+
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\?(?:\s*,\s*\?)+\)")
+_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class StatementStats:
+    stage: str
+    shape: str
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    slow: int = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.seconds / self.count * 1000 if self.count else 0.0
+
+
+_stats: Dict[Tuple[str, str], StatementStats] = {}
+_explained = set()
+_lock = threading.Lock()
+
+
+@contextmanager
+def sql_stage(name: str) -> Iterator[None]:
+    """Attribute statements executed in this context (and this thread) to a pipeline stage."""
+    token = _stage.set(name)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+@lru_cache(maxsize=4096)
+def statement_shape(statement: str) -> str:
+    """A statement with parameters and literals replaced by ?, and lists and VALUES rows collapsed."""
+    shape = _STRING.sub("?", statement)
+    shape = _PARAMETER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip()
+    shape = _LIST.sub("(?, ...)", shape)
+    return _ROWS.sub(r"\1, ...", shape)
+
+
+def instrument_engine(engine, explain_prefix: str) -> None:
+    """
+    Time every statement executed on an engine.
+
+    Args:
+        engine: Engine to instrument
+        explain_prefix: How the engine's database explains a statement, e.g. "EXPLAIN "
+    """
+    slow_seconds = float(get_env("SLOW_QUERY_MS", "1000")) / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+        slow = 0 < slow_seconds <= elapsed
+        shape = statement_shape(statement)
+        stage = _stage.get()
+        with _lock:
+            stats = _stats.get((stage, shape))
+            if stats is None:
+                stats = _stats[(stage, shape)] = StatementStats(stage, shape)
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            stats.slow += slow
+            first_slow = slow and shape not in _explained
+            if first_slow:
+                _explained.add(shape)
+        if slow:
+            plan = _explain(cursor, explain_prefix, statement, parameters, executemany) if first_slow else None
+            plan_info = f"\n{plan}" if plan else ""
+            logger.warning(f"Slow statement in {stage} ({elapsed * 1000:.0f} ms): {shape}{plan_info}")
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        started = exception_context.connection.info.get("statement_started") \
+            if exception_context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def _explain(cursor, prefix: str, statement: str, parameters, executemany: bool) -> Optional[str]:
+    """The plan of a statement that just ran, from the same DBAPI connection; None if it cannot be explained."""
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    if executemany:
+        parameters = parameters[0] if parameters else None
+    connection = cursor.connection
+    # On Postgres a failed EXPLAIN would abort the whole transaction, a savepoint contains it
+    savepoint = not getattr(connection, "autocommit", True)
+    explain = connection.cursor()
+    try:
+        if savepoint:
+            explain.execute("SAVEPOINT archive_explain")
+        try:
+            if parameters:
+                explain.execute(prefix + statement, parameters)
+            else:
+                explain.execute(prefix + statement)
+            plan = "\n".join(f"    {row[-1]}" for row in explain.fetchall())
+        except Exception as e:
+            if savepoint:
+                explain.execute("ROLLBACK TO SAVEPOINT archive_explain")
+            return f"    (no plan: {e})"
+        if savepoint:
+            explain.execute("RELEASE SAVEPOINT archive_explain")
+        return plan
+    except Exception as e:
+        logger.debug(f"Could not explain a slow statement: {e}")
+        return None
+    finally:
+        explain.close()
+
+
+def statement_stats(stage: Optional[str] = None) -> List[StatementStats]:
+    """Statement aggregates so far, optionally of one stage, by total time descending."""
+    with _lock:
+        stats = [s for s in _stats.values() if stage is None or s.stage == stage]
+    return sorted(stats, key=lambda s: s.seconds, reverse=True)
+
+
+def log_statement_stats(top: Optional[int] = None) -> None:
+    """Log time spent in SQL per stage, then the top statement shapes by total time (default: SQL_STATS_TOP)."""
+    stats = statement_stats()
+    if not stats:
+        return
+    top = top or int(get_env("SQL_STATS_TOP", "10"))
+
+    per_stage: Dict[str, List[StatementStats]] = {}
+    for s in stats:
+        per_stage.setdefault(s.stage, []).append(s)
+    for stage, entries in sorted(per_stage.items(), key=lambda item: -sum(s.seconds for s in item[1])):
+        logger.info(f"SQL in {stage}: {sum(s.count for s in entries)} statements, "
+                    f"{sum(s.seconds for s in entries):.2f}s, {len(entries)} shapes")
+    for s in stats[:top]:
+        slow_info = f", {s.slow} slow" if s.slow else ""
+        logger.info(f"  {s.seconds:8.2f}s {s.count:>7}x mean {s.mean_ms:7.1f} ms max {s.max_seconds * 1000:7.1f} ms"
+                    f"{slow_info} [{s.stage}] {s.shape[:200]}")
@@ -0,0 +1,87 @@
+"""
+Precomputed archive summaries for dashboard queries.
+
+    season_standings        regular-season standings after every week (table, all targets)
+    owner_career_records    all-time record per owner (materialized view, Postgres)
+    head_to_head_records    all-time record per pair of owners (materialized view, Postgres)
+
+Both views are created by migration and keyed by owner id. The joins of
+matchups to team_owners run once per refresh, so dashboards read the views
+with a unique-index lookup instead. season_standings is rebuilt only for the seasons
+a run changed. The views aggregate across seasons and are refreshed with
+REFRESH MATERIALIZED VIEW CONCURRENTLY, so readers are never blocked.
+"""
+import logging
+from typing import Iterable
+
+from sqlalchemy import bindparam, text
+
+from app.db.session import get_engine
+from app.db.targets import target_for
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZED_VIEWS = ("owner_career_records", "head_to_head_records")
+
+# One row per team per regular-season game; 0-0 games have not been played yet
+_TEAM_GAMES = """
+    SELECT m.year, m.week, m.home_team_id AS team_id, m."homeScore" AS points_for, m."awayScore" AS points_against
+    FROM matchups m
+    WHERE m.year IN :years AND m.home_team_id IS NOT NULL AND m.away_team_id IS NOT NULL
+      AND NOT m."isPlayoff" AND NOT (m."homeScore" = 0 AND m."awayScore" = 0)
+    UNION ALL
+    SELECT m.year, m.week, m.away_team_id, m."awayScore", m."homeScore"
+    FROM matchups m
+    WHERE m.year IN :years AND m.home_team_id IS NOT NULL AND m.away_team_id IS NOT NULL
+      AND NOT m."isPlayoff" AND NOT (m."homeScore" = 0 AND m."awayScore" = 0)
+"""
+
+_DELETE_SEASON_STANDINGS = text("DELETE FROM season_standings WHERE year IN :years").bindparams(
+    bindparam("years", expanding=True)
+)
+
+_INSERT_SEASON_STANDINGS = text(f"""
+    INSERT INTO season_standings (year, week, team_id, wins, losses, ties, "pointsFor", "pointsAgainst")
+    SELECT year, week, team_id,
+           SUM(CASE WHEN points_for > points_against THEN 1 ELSE 0 END) OVER season,
+           SUM(CASE WHEN points_for < points_against THEN 1 ELSE 0 END) OVER season,
+           SUM(CASE WHEN points_for = points_against THEN 1 ELSE 0 END) OVER season,
+           SUM(points_for) OVER season,
+           SUM(points_against) OVER season
+    FROM ({_TEAM_GAMES}) games
+    WINDOW season AS (PARTITION BY team_id ORDER BY week)
+""").bindparams(bindparam("years", expanding=True))
+
+
+def refresh_season_standings(years: Iterable[int]) -> None:
+    """Rebuild season_standings for the given seasons in one transaction."""
+    years = sorted(set(years))
+    with get_engine().begin() as conn:
+        conn.execute(_DELETE_SEASON_STANDINGS, {"years": years})
+        conn.execute(_INSERT_SEASON_STANDINGS, {"years": years})
+
+
+def refresh_materialized_views() -> None:
+    """Refresh the career views without locking out readers."""
+    engine = get_engine()
+    for view in MATERIALIZED_VIEWS:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+
+
+def refresh_summaries(years: Iterable[int]) -> None:
+    """
+    Bring every summary up to date after a run that changed the given seasons.
+
+    Does nothing when no season changed, e.g. a --resume run where every
+    unit was already complete.
+    """
+    years = sorted(set(years))
+    if not years:
+        logger.info("No seasons changed, summaries are up to date")
+        return
+    refresh_season_standings(years)
+    logger.info(f"Refreshed season standings for {years}")
+    if target_for(get_engine()).supports_materialized_views:
+        refresh_materialized_views()
+        logger.info(f"Refreshed {', '.join(MATERIALIZED_VIEWS)}")
@@ -0,0 +1,81 @@
+"""
+Storage targets the archive can be written to.
+
+The archive schema is defined once in app/db/models.py. A target describes
+how one database engine creates that schema and ingests rows into it: which
+INSERT ... ON CONFLICT construct to use, how many bind parameters a
+statement may carry, whether rows can be streamed in with COPY, whether
+tables can be partitioned by season, whether the career summaries exist as
+materialized views, whether several workers can share a work queue (row
+locks with SKIP LOCKED), whether overlapping runs can be kept apart with
+advisory locks, how a statement's plan is shown and how connections are
+tuned for bulk loading.
+
+    postgresql://...            server target, schema managed by Alembic
+    sqlite:///espn_archive.db   single-file embedded target, schema created from the models
+
+Pick the target with DATABASE_URL or --database-url.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+@dataclass(frozen=True)
+class StorageTarget:
+    """How the archive is stored in one kind of database."""
+    name: str
+    insert: Callable
+    max_bind_params: int
+    uses_alembic: bool
+    supports_copy: bool = False
+    supports_partitions: bool = False
+    supports_materialized_views: bool = False
+    supports_skip_locked: bool = False
+    supports_advisory_locks: bool = False
+    explain_prefix: str = "EXPLAIN "
+
+    def configure_engine(self, engine) -> None:
+        """Apply per-connection settings for bulk loading, if the target needs any."""
+        if self.name == "sqlite":
+            event.listen(engine, "connect", _sqlite_bulk_pragmas)
+
+    def create_schema(self, engine) -> None:
+        """Create every archive table that does not exist yet."""
+        from app.db.models import Base
+        Base.metadata.create_all(engine)
+
+
+def _sqlite_bulk_pragmas(dbapi_connection, connection_record) -> None:
+    # WAL lets readers keep querying the archive during a load, NORMAL sync
+    # is still crash-safe in WAL mode and foreign keys match Postgres behaviour
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    cursor.close()
+
+
+TARGETS = {
+    # Postgres caps a single statement at 65535 bind parameters
+    "postgresql": StorageTarget(
+        "postgresql", postgresql.insert, 65535, uses_alembic=True, supports_copy=True, supports_partitions=True,
+        supports_materialized_views=True, supports_skip_locked=True,
+        supports_advisory_locks=True,
+    ),
+    # SQLITE_MAX_VARIABLE_NUMBER defaults to 32766 since SQLite 3.32
+    "sqlite": StorageTarget("sqlite", sqlite.insert, 32766, uses_alembic=False,
+                            explain_prefix="EXPLAIN QUERY PLAN "),
+}
+
+
+def target_for(engine) -> StorageTarget:
+    """Return the StorageTarget for an engine's dialect."""
+    name = engine.dialect.name
+    if name not in TARGETS:
+        raise ValueError(f"Unsupported archive database '{name}', expected one of: {', '.join(TARGETS)}")
+    return TARGETS[name]
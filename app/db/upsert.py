@@ -0,0 +1,471 @@
+"""
+Declarative upsert engine.
+
+Each archived table gets a TableSpec derived from its model in
+app/db/models.py: the conflict target is the table's unique constraint and
+every other non-key column is updated on conflict. The INSERT ... ON
+CONFLICT statement for a spec is built once per row shape and reused for
+every batch, which SQLAlchemy executes as a single executemany.
+
+Batch sizes are not hard-coded per loader. Each table starts from a size
+bounded by the target database's bind-parameter limit for its column count
+and is then tuned from measured statement latency toward TARGET_BATCH_SECONDS.
+
+The INSERT construct and bind-parameter limit come from the engine's
+StorageTarget, so the same specs load Postgres and the embedded SQLite
+archive alike. High-volume tables can instead be loaded with copy_upsert,
+which streams rows with COPY where the target supports it.
+
+Both paths write rows in conflict-key order, so concurrent runs upserting
+the same rows cannot deadlock on each other's row locks.
+
+Rows are dicts or NamedTuple records whose field names are the column
+names. Records are written to COPY as they are. For upserts they are bound
+positionally (see positional_upsert): a batch becomes one multi-row VALUES
+statement whose parameters are the records' values laid end to end, so no
+row is turned into a dict on its way to the driver.
+"""
+import io
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import UniqueConstraint, column, select, table
+
+from app.db.models import (
+    FFleague, Settings, Team, Owner, TeamOwner, Player, Draft, Matchup, Roster, PlayerWeeklyStat, LineupSlot,
+    RosterSnapshot, PipelineCheckpoint, TeamLogo
+)
+from app.db.session import get_engine
+from app.db.targets import StorageTarget, target_for
+from app.logs import ProgressLogger
+
+logger = logging.getLogger(__name__)
+# One line per table every LOG_PROGRESS_SECONDS instead of one per batch
+progress = ProgressLogger(logger)
+
+# A dict or a NamedTuple record with column names as fields
+Row = Union[dict, tuple]
+
+TARGET_BATCH_SECONDS = 0.25
+INITIAL_BATCH_ROWS = 500
+MIN_BATCH_ROWS = 50
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """How rows for one table are upserted."""
+    model: type
+    conflict_columns: Tuple[str, ...]
+    update_columns: Tuple[str, ...]
+    label: str
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+
+def spec_for_model(model, label: str = None) -> TableSpec:
+    """
+    Derive a TableSpec from a model.
+
+    The conflict target is the first unique constraint on the table (named
+    constraints and column-level unique=True alike), or the primary key of
+    tables keyed by natural columns only. Primary key and conflict columns
+    are never updated.
+    """
+    table = model.__table__
+    unique = [c for c in table.constraints if isinstance(c, UniqueConstraint)]
+    if unique:
+        conflict = tuple(column.name for column in unique[0].columns)
+    elif len(table.primary_key.columns) > 1:
+        conflict = tuple(column.name for column in table.primary_key.columns)
+    else:
+        raise ValueError(f"Table {table.name} has no unique constraint to upsert on")
+    update = tuple(
+        column.name for column in table.columns
+        if not column.primary_key and column.name not in conflict
+    )
+    return TableSpec(model=model, conflict_columns=conflict, update_columns=update, label=label or table.name)
+
+
+TABLE_SPECS: Dict[type, TableSpec] = {
+    FFleague: spec_for_model(FFleague, "leagues"),
+    Settings: spec_for_model(Settings, "league settings"),
+    Team: spec_for_model(Team, "teams"),
+    Owner: spec_for_model(Owner, "owners"),
+    TeamOwner: spec_for_model(TeamOwner, "team owners"),
+    Player: spec_for_model(Player, "players"),
+    Draft: spec_for_model(Draft, "draft picks"),
+    Matchup: spec_for_model(Matchup, "matchups"),
+    Roster: spec_for_model(Roster, "roster entries"),
+    PlayerWeeklyStat: spec_for_model(PlayerWeeklyStat, "player weekly stats"),
+    LineupSlot: spec_for_model(LineupSlot, "lineup slots"),
+    RosterSnapshot: spec_for_model(RosterSnapshot, "roster snapshot spans"),
+    PipelineCheckpoint: spec_for_model(PipelineCheckpoint, "pipeline checkpoints"),
+    TeamLogo: spec_for_model(TeamLogo, "team logos"),
+}
+
+
+class BatchSizer:
+    """
+    Chooses the number of rows per upsert statement for one table.
+
+    The ceiling is the target's bind-parameter limit divided by the table's column count, so
+    a wide table never overflows the bind-parameter limit while narrow tables
+    may send many more rows per round-trip. After each batch the size is
+    scaled toward TARGET_BATCH_SECONDS, at most doubling or halving per step.
+    """
+
+    def __init__(self, label: str, column_count: int, max_bind_params: int,
+                 initial: int = INITIAL_BATCH_ROWS, target_seconds: float = TARGET_BATCH_SECONDS):
+        self.label = label
+        self.max_rows = max(1, max_bind_params // max(1, column_count))
+        self.batch_size = min(initial, self.max_rows)
+        self.initial_size = self.batch_size
+        self.target_seconds = target_seconds
+        self.total_rows = 0
+        self.total_seconds = 0.0
+        self.batches = 0
+
+    def record(self, rows: int, seconds: float) -> None:
+        """Record a finished batch and retune the batch size."""
+        self.total_rows += rows
+        self.total_seconds += seconds
+        self.batches += 1
+        if rows <= 0 or seconds <= 0:
+            return
+        # Project the latency of a full batch from the observed per-row cost
+        projected = seconds * self.batch_size / rows
+        scale = min(2.0, max(0.5, self.target_seconds / projected))
+        self.batch_size = max(min(MIN_BATCH_ROWS, self.max_rows), min(self.max_rows, int(self.batch_size * scale)))
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total_rows / self.total_seconds if self.total_seconds else 0.0
+
+
+_sizers: Dict[Tuple[type, str], BatchSizer] = {}
+
+
+def batch_sizer(model, target: StorageTarget = None) -> BatchSizer:
+    """Return the process-wide BatchSizer for a model, so tuning carries across stages."""
+    target = target or target_for(get_engine())
+    key = (model, target.name)
+    if key not in _sizers:
+        spec = TABLE_SPECS[model]
+        _sizers[key] = BatchSizer(spec.label, len(spec.table.columns), target.max_bind_params)
+    return _sizers[key]
+
+
+def log_batch_stats() -> None:
+    """Log the tuned batch size and throughput for every table written so far."""
+    for sizer in _sizers.values():
+        logger.info(
+            f"{sizer.label}: {sizer.total_rows} rows in {sizer.batches} batches, "
+            f"{sizer.rows_per_second:.0f} rows/s, batch size {sizer.initial_size} -> {sizer.batch_size} "
+            f"(limit {sizer.max_rows})"
+        )
+
+
+@lru_cache(maxsize=None)
+def upsert_statement(spec: TableSpec, row_keys: Tuple[str, ...], target: StorageTarget):
+    """
+    Build the upsert statement for a spec, row shape and target, once.
+
+    Only columns present in the rows are updated, so a loader that does not
+    supply a column (e.g. player position) never overwrites it with NULL.
+    """
+    return _on_conflict_update(spec, target.insert(spec.table), row_keys)
+
+
+def _on_conflict_update(spec: TableSpec, stmt, row_keys: Tuple[str, ...]):
+    update = {name: stmt.excluded[name] for name in spec.update_columns if name in row_keys}
+    if not update:
+        # Rows carry nothing but the key, e.g. dictionary entries
+        return stmt.on_conflict_do_nothing(index_elements=list(spec.conflict_columns))
+    return stmt.on_conflict_do_update(index_elements=list(spec.conflict_columns), set_=update)
+
+
+@dataclass(frozen=True)
+class PositionalUpsert:
+    """An upsert compiled to driver SQL that takes the values of records positionally."""
+    sql: str                                  # The statement for one row
+    values: str                               # Its VALUES group, e.g. (?, ?, ?)
+    order: Optional[Callable]                 # Reorders a record into statement column order; None if in order
+    processors: Tuple[Tuple[int, Callable], ...]  # (column, bind processor) of columns the driver can't take as-is
+
+    @property
+    def width(self) -> int:
+        return self.values.count(",") + 1
+
+    def statement(self, rows: int) -> str:
+        """The statement for a batch of rows, one VALUES group per row."""
+        return _multi_row_sql(self.sql, self.values, rows)
+
+    def parameters(self, records: List[tuple]) -> tuple:
+        """The batch's values in statement order, row after row."""
+        if self.order is not None:
+            records = map(self.order, records)
+        if not self.processors:
+            return tuple(chain.from_iterable(records))
+        values = list(chain.from_iterable(records))
+        width = self.width
+        for column, process in self.processors:
+            values[column::width] = map(process, values[column::width])
+        return tuple(values)
+
+
+# One entry per batch size; the BatchSizer settles on a few
+@lru_cache(maxsize=64)
+def _multi_row_sql(sql: str, values: str, rows: int) -> str:
+    return sql.replace(values, ", ".join([values] * rows), 1)
+
+
+@lru_cache(maxsize=None)
+def _positional_dialect(dialect_class, paramstyle: str):
+    return dialect_class(paramstyle=paramstyle)
+
+
+@lru_cache(maxsize=None)
+def positional_upsert(spec: TableSpec, row_keys: Tuple[str, ...], target: StorageTarget,
+                      dialect_class, paramstyle: str) -> PositionalUpsert:
+    """
+    Compile the upsert statement for a record type to positional driver SQL, once.
+
+    The statement's columns are the table's, in table order; records whose
+    fields are in another order are reordered (one tuple per row). The
+    bind processors SQLAlchemy would apply, e.g. datetimes as text on
+    SQLite, are applied to those columns' values only.
+    """
+    # Drivers with named parameters (psycopg2) take positional %s as well
+    dialect = _positional_dialect(dialect_class, paramstyle if paramstyle in ("qmark", "format") else "format")
+    compiled = upsert_statement(spec, row_keys, target).compile(
+        dialect=dialect, column_keys=list(row_keys), for_executemany=True)
+    columns = tuple(compiled.positiontup)
+    marker = "?" if dialect.paramstyle == "qmark" else "%s"
+    values = "(" + ", ".join([marker] * len(columns)) + ")"
+    if values not in compiled.string:
+        raise ValueError(f"Cannot bind {spec.label} positionally: {compiled.string}")
+    processors = []
+    for position, name in enumerate(columns):
+        process = spec.table.c[name].type.dialect_impl(dialect).bind_processor(dialect)
+        if process is not None:
+            processors.append((position, process))
+    positions = tuple(row_keys.index(name) for name in columns)
+    order = None if positions == tuple(range(len(row_keys))) else itemgetter(*positions)
+    return PositionalUpsert(compiled.string, values, order, tuple(processors))
+
+
+def _staging_name(spec: TableSpec) -> str:
+    return f"_copy_{spec.table.name}"
+
+
+@lru_cache(maxsize=None)
+def copy_merge_statement(spec: TableSpec, row_keys: Tuple[str, ...], target: StorageTarget):
+    """INSERT ... SELECT from the COPY staging table into the real table, upserting on conflict."""
+    staging = table(_staging_name(spec), *(column(name) for name in row_keys))
+    ordered = select(*staging.c).order_by(*(staging.c[name] for name in spec.conflict_columns if name in row_keys))
+    stmt = target.insert(spec.table).from_select(list(row_keys), ordered)
+    return _on_conflict_update(spec, stmt, row_keys)
+
+
+def row_columns(row: Row) -> Tuple[str, ...]:
+    """Column names of a row: a record's fields or a dict's keys."""
+    return row._fields if isinstance(row, tuple) else tuple(row.keys())
+
+
+def _conflict_key(spec: TableSpec, columns: Tuple[str, ...], records: bool) -> Callable[[Row], tuple]:
+    """Function returning a row's conflict key values, None for key columns the rows do not carry."""
+    if not records:
+        return lambda row: tuple(row.get(name) for name in spec.conflict_columns)
+    positions = [columns.index(name) if name in columns else None for name in spec.conflict_columns]
+    return lambda row: tuple(None if position is None else row[position] for position in positions)
+
+
+def _dedupe(spec: TableSpec, rows: List[Row]) -> List[Row]:
+    """
+    Keep the last row per conflict key.
+
+    Postgres rejects a multi-row ON CONFLICT DO UPDATE that touches the same
+    row twice, which happens when e.g. one players batch spans two seasons.
+    Rows with a NULL in the key never conflict and are kept as-is.
+    """
+    conflict_key = _conflict_key(spec, row_columns(rows[0]), isinstance(rows[0], tuple))
+    latest = {}
+    for position, row in enumerate(rows):
+        key = conflict_key(row)
+        latest[position if None in key else key] = row
+    return list(latest.values()) if len(latest) < len(rows) else rows
+
+
+def _key_sorted(spec: TableSpec, rows: List[Row]) -> List[Row]:
+    """
+    Order rows by conflict key so every writer locks a table's rows in the same order.
+
+    Two runs upserting overlapping rows in different orders can each hold a
+    row lock the other is waiting for, which Postgres resolves by aborting
+    one of them as a deadlock. In one global order they just queue.
+    """
+    conflict_key = _conflict_key(spec, row_columns(rows[0]), isinstance(rows[0], tuple))
+
+    def sort_key(row):
+        # NULLs sort last and are never compared with values
+        return tuple((True, 0) if value is None else (False, value) for value in conflict_key(row))
+    return sorted(rows, key=sort_key)
+
+
+def bulk_upsert(model, rows: List[Row]) -> None:
+    """
+    Upsert rows into the model's table using its TableSpec.
+
+    Rows are sent in batches sized by the table's BatchSizer, each batch as
+    one statement in its own transaction. All rows must share the same
+    columns: dicts with the same keys or records of the same type.
+    """
+    if not rows:
+        return
+    spec = TABLE_SPECS[model]
+    engine = get_engine()
+    target = target_for(engine)
+    sizer = batch_sizer(model, target)
+    rows = _key_sorted(spec, _dedupe(spec, rows))
+    columns = row_columns(rows[0])
+    records = isinstance(rows[0], tuple)
+    if records:
+        positional = positional_upsert(spec, columns, target, type(engine.dialect), engine.dialect.paramstyle)
+    else:
+        stmt = upsert_statement(spec, columns, target)
+
+    start = 0
+    while start < len(rows):
+        size = sizer.batch_size
+        batch = rows[start:start + size]
+        began = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                if records:
+                    conn.exec_driver_sql(positional.statement(len(batch)), positional.parameters(batch))
+                else:
+                    conn.execution_options(insertmanyvalues_page_size=size).execute(stmt, batch)
+        except Exception as e:
+            logger.error(f"Error during bulk upsert of {spec.label}: {e}")
+            raise
+        elapsed = time.perf_counter() - began
+        sizer.record(len(batch), elapsed)
+        progress.info(spec.label, "Upserted %d %s in %.0f ms (%d so far, next batch size %d)",
+                      len(batch), spec.label, elapsed * 1000, sizer.total_rows, sizer.batch_size)
+        start += len(batch)
+
+
+def _copy_value(value) -> str:
+    """Render a value in COPY's text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def copy_upsert(model, rows: List[Row]) -> None:
+    """
+    Upsert rows by streaming them with COPY, for high-volume tables.
+
+    The rows are copied into a temporary staging table with the same column
+    types, then merged with one INSERT ... SELECT ... ON CONFLICT, so COPY's
+    throughput is kept without giving up idempotent upserts. Targets without
+    COPY (SQLite) fall back to bulk_upsert. All rows must share the same columns.
+    """
+    if not rows:
+        return
+    engine = get_engine()
+    target = target_for(engine)
+    if not target.supports_copy:
+        bulk_upsert(model, rows)
+        return
+
+    spec = TABLE_SPECS[model]
+    sizer = batch_sizer(model, target)
+    rows = _key_sorted(spec, _dedupe(spec, rows))
+    row_keys = row_columns(rows[0])
+    quoted = ", ".join(f'"{name}"' for name in row_keys)
+    staging = _staging_name(spec)
+
+    records = isinstance(rows[0], tuple)
+    data = io.StringIO()
+    for row in rows:
+        values = row if records else (row[name] for name in row_keys)
+        data.write("\t".join(_copy_value(value) for value in values))
+        data.write("\n")
+    data.seek(0)
+
+    began = time.perf_counter()
+    try:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                f'CREATE TEMP TABLE "{staging}" ON COMMIT DROP AS '
+                f'SELECT {quoted} FROM "{spec.table.name}" WITH NO DATA'
+            )
+            cursor = conn.connection.cursor()
+            cursor.copy_expert(f'COPY "{staging}" ({quoted}) FROM STDIN', data)
+            cursor.close()
+            conn.execute(copy_merge_statement(spec, row_keys, target))
+    except Exception as e:
+        logger.error(f"Error during COPY upsert of {spec.label}: {e}")
+        raise
+    elapsed = time.perf_counter() - began
+    sizer.record(len(rows), elapsed)
+    progress.info(spec.label, "Copied %d %s in %.0f ms (%d so far)",
+                  len(rows), spec.label, elapsed * 1000, sizer.total_rows)
+
+
+class UpsertBuffer:
+    """
+    Accumulates rows for one model and flushes them whenever a full batch,
+    as chosen by the table's BatchSizer, is ready.
+
+        with UpsertBuffer(Team) as teams:
+            teams.add(team_data)
+
+    With copy=True each batch is loaded with copy_upsert instead of bulk_upsert.
+    """
+
+    def __init__(self, model, copy: bool = False):
+        self.model = model
+        self.sizer = batch_sizer(model)
+        self.load = copy_upsert if copy else bulk_upsert
+        self.rows: List[Row] = []
+
+    def add(self, row: Row) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.sizer.batch_size:
+            self.flush()
+
+    def extend(self, rows) -> None:
+        for row in rows:
+            self.add(row)
+
+    def flush(self) -> None:
+        if self.rows:
+            rows, self.rows = self.rows, []
+            self.load(self.model, rows)
+
+    def discard(self) -> None:
+        """Drop buffered rows without writing them, e.g. those of a season that failed to transform."""
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
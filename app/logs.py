@@ -0,0 +1,137 @@
+"""
+Logging setup for the pipeline.
+
+Every module logs through the standard logging module; configure_logging()
+puts a single QueueHandler on the root logger, and a background
+QueueListener thread formats the records and writes them to the log file
+and stdout. A log call only puts its record on an unbounded queue, so
+loops over thousands of rows never wait for a terminal or a disk.
+
+    LOG_LEVEL       root level (default INFO)
+    LOG_LEVELS      per-module levels, e.g. "app.db.upsert=WARNING,app.services.cache=DEBUG"
+    LOG_FORMAT      "text" (default) or "json", one object per line
+    LOG_FILE        log file (default espn_pipeline.log)
+
+Fields passed with extra={...} are structured: they become keys of the
+JSON object, or key=value pairs after the message in text format.
+
+Lines that would repeat for every batch or season in a loop go through a
+ProgressLogger, which writes at most one line per key every
+LOG_PROGRESS_SECONDS (default 10) and counts the lines in between.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Dict, Optional
+
+from app.config import get_env
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def record_fields(record: logging.LogRecord) -> Dict[str, object]:
+    """The structured fields a record was logged with."""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as text with key=value fields appended, or as one JSON object per line."""
+
+    def __init__(self, as_json: bool = False):
+        super().__init__(TEXT_FORMAT)
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = record_fields(record)
+        if not self.as_json:
+            text = super().format(record)
+            if fields:
+                text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+            return text
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **fields,
+        }
+        return json.dumps(entry, default=str)
+
+
+def parse_levels(value: str) -> Dict[str, str]:
+    """Per-module levels from LOG_LEVELS: "module=LEVEL,..." with levels such as DEBUG or WARNING."""
+    levels = {}
+    for entry in value.split(","):
+        name, _, level = entry.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging() -> None:
+    """Route every logger through a queue to the log file and stdout; safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = StructuredFormatter(as_json=get_env("LOG_FORMAT", "text").lower() == "json")
+    handlers = [logging.FileHandler(get_env("LOG_FILE", "espn_pipeline.log")), logging.StreamHandler(sys.stdout)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(get_env("LOG_LEVEL", "INFO").upper())
+    for name, level in parse_levels(get_env("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+
+
+class ProgressLogger:
+    """
+    Rate-limited progress lines for hot loops.
+
+        progress = ProgressLogger(logger)
+        for batch in batches:
+            progress.info(table, "Upserted %d %s", len(batch), table)
+
+    Logs at most one line per key every LOG_PROGRESS_SECONDS (default 10).
+    Lines in between are counted but never formatted, and the next line
+    that is written says how many were skipped. Pass the message as a
+    %-style format with arguments, so skipped lines cost no formatting.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: Optional[float] = None):
+        self.logger = logger
+        self.interval = interval if interval is not None else float(get_env("LOG_PROGRESS_SECONDS", "10"))
+        self._last: Dict[str, float] = {}
+        self._skipped: Dict[str, int] = {}
+
+    def info(self, key: str, message: str, *args, **fields) -> None:
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        now = time.monotonic()
+        if now - self._last.get(key, float("-inf")) < self.interval:
+            self._skipped[key] = self._skipped.get(key, 0) + 1
+            return
+        self._last[key] = now
+        skipped = self._skipped.pop(key, 0)
+        if skipped:
+            message += f" (+{skipped} similar)"
+        self.logger.info(message, *args, extra=fields or None)
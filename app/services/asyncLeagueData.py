@@ -1,6 +1,8 @@
 from datetime import datetime
-import asyncio, time
-from espn_api.football import League
+import asyncio, logging, time
+
+logger = logging.getLogger(__name__)
+
 async def fetch_league_data(years, LEAGUE_ID, ESPN_S2, SWID):
     try:
         years_to_fetch = normalize_years(years)
@@ -12,22 +14,23 @@ async def fetch_league_data(years, LEAGUE_ID, ESPN_S2, SWID):
         leagues = []
         for year, result in zip(years_to_fetch, results):
             if isinstance(result, Exception):
-                print(f"Failed to fetch data for year {year}: {result}")
+                logger.error(f"Failed to fetch data for year {year}: {result}", extra={"year": year})
             else:
                 leagues.append(result)
-                print(f"Successfully fetched data for year {year}")
+                logger.debug(f"Successfully fetched data for year {year}", extra={"year": year})
         return leagues
     except ValueError as ve:
-        print(f"Validation Error: {ve}")
+        logger.error(f"Validation Error: {ve}")
         raise
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        logger.error(f"An unexpected error occurred: {e}")
         raise
         
 
-async def fetch_league_year(year, LEAGUE_ID, ESPN_S2, SWID) -> League:
+async def fetch_league_year(year, LEAGUE_ID, ESPN_S2, SWID) -> "League":
     """Fetches leagues data from ESPN"""
     #use async to get one league data from ESPN"""
+    from espn_api.football import League
 
     return League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
 
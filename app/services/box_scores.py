@@ -0,0 +1,155 @@
+"""
+Weekly player box scores.
+
+Each scoring period needs its own ESPN request (league.box_scores(week)), so
+a season is fetched with a small, bounded pool of workers and streamed week
+by week instead of being collected into one list. Weeks that have already
+been played are cached per (season, week) in the shelf cache and are never
+fetched again.
+
+The same weekly lineups also feed the roster snapshot stage, which keeps
+only week-over-week changes.
+"""
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import groupby
+from operator import attrgetter
+from typing import Iterable, Iterator, List, NamedTuple
+
+from app.config import get_env
+from app.services.cache import load_box_score_weeks, save_box_score_week
+from app.services.scheduler import season_closed
+
+logger = logging.getLogger(__name__)
+
+# ESPN only serves box scores from the 2019 season on
+FIRST_BOX_SCORE_YEAR = 2019
+
+
+class PlayerWeekRow(NamedTuple):
+    year: int
+    week: int
+    teamId: int
+    playerId: int               # ESPN player id
+    points: float
+    projectedPoints: float
+    lineupSlot: str
+
+
+class RosterSpanRow(NamedTuple):
+    year: int
+    teamId: int
+    playerId: int               # ESPN player id
+    weekFrom: int
+    weekTo: int
+    lineupSlot: str
+
+
+def scoring_weeks(league) -> List[int]:
+    """Scoring periods of a season that have started."""
+    last_week = min(league.finalScoringPeriod, league.current_week)
+    return list(range(league.firstScoringPeriod, last_week + 1))
+
+
+def week_is_final(league, week: int) -> bool:
+    """Whether a scoring period's box scores can no longer change, so they can be cached."""
+    # nfl_week is the NFL's current scoring period, earlier weeks are final. It
+    # stops advancing after the last one, so every week of a closed season is final
+    return week < league.nfl_week or season_closed(league.year, datetime.now())
+
+
+def week_rows(league, week: int) -> List[PlayerWeekRow]:
+    """Fetch one scoring period and return a row per rostered player."""
+    rows = []
+    for box_score in league.box_scores(week):
+        for team, lineup in ((box_score.home_team, box_score.home_lineup),
+                             (box_score.away_team, box_score.away_lineup)):
+            # Team is 0 for the empty side of a bye
+            team_id = getattr(team, 'team_id', team)
+            if not team_id:
+                continue
+            for player in lineup:
+                rows.append(PlayerWeekRow(league.year, week, team_id, player.playerId, player.points,
+                                          player.projected_points, player.slot_position))
+    return rows
+
+
+def player_weekly_stat_rows(league, workers: int = None) -> Iterator[PlayerWeekRow]:
+    """
+    Yield a row per player per scoring period of a season.
+
+    Cached weeks are read from the shelf cache; the rest are fetched with at
+    most `workers` requests in flight (BOX_SCORE_WORKERS, default 4). Rows are
+    yielded in week order as each week arrives, so memory use is bounded by
+    the number of weeks in flight rather than by the season.
+    """
+    if league.year < FIRST_BOX_SCORE_YEAR:
+        logger.debug(f"Box scores are not available before {FIRST_BOX_SCORE_YEAR}, skipping year {league.year}")
+        return
+
+    workers = workers or int(get_env("BOX_SCORE_WORKERS", "4"))
+    weeks = scoring_weeks(league)
+    cached = load_box_score_weeks(league.league_id, league.year, weeks)
+    if cached:
+        logger.debug(f"Box score cache hit for {len(cached)}/{len(weeks)} weeks of {league.year}",
+                     extra={"year": league.year, "cached_weeks": len(cached), "weeks": len(weeks)})
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = iter(week for week in weeks if week not in cached)
+        in_flight = deque()
+
+        def submit_next():
+            week = next(pending, None)
+            if week is not None:
+                in_flight.append((week, executor.submit(week_rows, league, week)))
+
+        for _ in range(workers):
+            submit_next()
+
+        for week in weeks:
+            if week in cached:
+                rows = cached.pop(week)
+                if rows and isinstance(rows[0], dict):
+                    # Cached before rows were records
+                    rows = [PlayerWeekRow(**row) for row in rows]
+            else:
+                fetched_week, future = in_flight.popleft()
+                rows = future.result()
+                submit_next()
+                if week_is_final(league, fetched_week):
+                    save_box_score_week(league.league_id, league.year, fetched_week, rows)
+            yield from rows
+
+
+def roster_snapshot_rows(league) -> Iterator[RosterSpanRow]:
+    """Yield the season's weekly rosters as spans of unchanged weeks, see lineup_spans."""
+    return lineup_spans(league.year, player_weekly_stat_rows(league))
+
+
+def lineup_spans(year: int, weekly_rows: Iterable[PlayerWeekRow]) -> Iterator[RosterSpanRow]:
+    """
+    Collapse week-ordered player rows into spans of unchanged weeks.
+
+    A span is one player on one team in one lineup slot from weekFrom through
+    weekTo. A new span starts only when a player joins a team or changes slot,
+    so an unchanged 17-week roster is 16 rows rather than 272. Spans are
+    yielded as soon as they close; the spans still open at the last scored
+    week are yielded at the end.
+    """
+    # (team, player) -> [weekFrom, weekTo, slot] of the open span
+    spans = {}
+    for week, rows in groupby(weekly_rows, key=attrgetter('week')):
+        lineup = {(row.teamId, row.playerId): row.lineupSlot for row in rows}
+        for key in list(spans):
+            if lineup.get(key) != spans[key][2]:
+                yield RosterSpanRow(year, *key, *spans.pop(key))
+        for key, slot in lineup.items():
+            span = spans.get(key)
+            if span is not None:
+                span[1] = week
+            else:
+                spans[key] = [week, week, slot]
+    for key, span in spans.items():
+        yield RosterSpanRow(year, *key, *span)
@@ -1,12 +1,21 @@
+from __future__ import annotations
+
+import logging
 import os
 import shelve
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, TYPE_CHECKING
 from app.services.asyncLeagueData import normalize_years, fetch_league_data
-from espn_api.football import League
+from app.services.freshness import cache_is_current, probe_season
+from app.services.season import season_of
 import asyncio
 import glob
 
+if TYPE_CHECKING:
+    from espn_api.football import League
+
+logger = logging.getLogger(__name__)
+
 CACHE_DIR = "./shelf_cache"
 
 def get_shelf_file(year: int, league_id: str) -> str:
@@ -16,74 +25,175 @@ def get_shelf_file(year: int, league_id: str) -> str:
         os.makedirs(CACHE_DIR)
     return os.path.join(CACHE_DIR, f"league_cache")
 
-def save_league_to_shelf(league) -> None:
-    """Save a League object directly to a shelf file."""
+INDEX_KEY = "__key_index__"
+
+def _shelf_exists(shelf_file: str) -> bool:
+    """Check for a shelf on disk, whichever dbm backend wrote it."""
+    return bool(glob.glob(shelf_file + "*"))
+
+def _cache_key(year: int, league_id) -> str:
+    """Shelf key for a cached season. Format is "year_league_id"."""
+    return f"{year}_{league_id}"
+
+def _parse_cache_key(key: str) -> Optional[tuple]:
+    """Split a "year_league_id" key into (league_id, year), or None for non-season keys."""
+    year, sep, league_id = key.partition('_')
+    if not sep or not year.isdigit() or not league_id:
+        return None
+    return league_id, int(year)
+
+def _load_index(shelf) -> Dict[str, Dict[int, datetime]]:
+    """
+    Return the league -> {year: cached_at} index stored in the shelf.
+
+    Shelves written before the index existed are scanned once and the
+    rebuilt index is saved, so later lookups never iterate every key or
+    unpickle a League just to read its timestamp.
+    """
+    index = shelf.get(INDEX_KEY)
+    if isinstance(index, dict) and all(isinstance(years, dict) for years in index.values()):
+        return index
+    index = {}
+    for key in shelf.keys():
+        parsed = _parse_cache_key(key)
+        if parsed is not None:
+            index.setdefault(parsed[0], {})[parsed[1]] = shelf[key]['cached_at']
+    shelf[INDEX_KEY] = index
+    return index
+
+def _read_index() -> Dict[str, Dict[int, datetime]]:
+    shelf_file = get_shelf_file(0, "")
+    if not _shelf_exists(shelf_file):
+        return {}
+    with shelve.open(shelf_file) as shelf:
+        return _load_index(shelf)
+
+def save_league_to_shelf(league, probe_signature: Optional[str] = None) -> None:
+    """
+    Save a League object directly to a shelf file, with the freshness probe taken before fetching it.
+
+    The compact season model is built first so that it is cached with the
+    League and later runs do not request the season schedule again.
+    """
+    try:
+        season_of(league)
+    except Exception as e:
+        logger.warning(f"Could not build the season model for {league.year}, it will be built when loaded: {e}")
     shelf_file = get_shelf_file(league.year, league.league_id)
-    league_key = f"{league.year}_{league.league_id}"
+    league_key = _cache_key(league.year, league.league_id)
+    cached_at = datetime.now()
     with shelve.open(shelf_file) as shelf:
         shelf[league_key] = {
             'league': league,
-            'cached_at': datetime.now()
+            'cached_at': cached_at,
+            'probe': probe_signature,
         }
-    print(f"League for year {league.year} cached to {shelf_file}")
+        index = _load_index(shelf)
+        index.setdefault(str(league.league_id), {})[league.year] = cached_at
+        shelf[INDEX_KEY] = index
+    logger.debug(f"League for year {league.year} cached to {shelf_file}", extra={"year": league.year})
 
 def load_league_from_shelf(year: int, league_id: str, max_age_days: float = 600.0) -> Optional[object]:
     """Load a League object from the shelf file if it exists and isn't expired."""
     shelf_file = get_shelf_file(year, league_id)
-    league_key = f"{year}_{league_id}"
+    league_key = _cache_key(year, league_id)
     
-    if os.path.exists(shelf_file):
+    if _shelf_exists(shelf_file):
         with shelve.open(shelf_file) as shelf:
             if league_key in shelf:
                 cached_data = shelf[league_key]
                 age = datetime.now() - cached_data['cached_at']
                 if age.total_seconds() < max_age_days * 86400:  # 86400 seconds in a day
-                    print(f"Loading league from cache: {shelf_file}")
+                    logger.debug(f"Loading league from cache: {shelf_file}", extra={"year": year})
                     return cached_data['league']
                 else:
-                    print(f"Cache expired (age: {age.total_seconds()/3600:.1f} hours)")
+                    logger.debug(f"Cache expired (age: {age.total_seconds()/3600:.1f} hours)", extra={"year": year})
     return None
 
-def clear_cache_for_league(league_id: str, years: Optional[List[int]] = None) -> None:
+def load_cache_entry(year: int, league_id: str) -> Optional[dict]:
+    """Return the shelf entry of a cached season ({'league', 'cached_at', 'probe'}) whatever its age, or None."""
+    shelf_file = get_shelf_file(year, league_id)
+    if not _shelf_exists(shelf_file):
+        return None
+    with shelve.open(shelf_file) as shelf:
+        return shelf.get(_cache_key(year, league_id))
+
+BOX_SCORE_SHELF = "box_score_cache"
+
+def _box_score_key(league_id, year: int, week: int) -> str:
+    """Shelf key for one cached scoring period. Format is "league_id_year_week"."""
+    return f"{league_id}_{year}_{week}"
+
+def load_box_score_weeks(league_id, year: int, weeks: List[int]) -> Dict[int, list]:
+    """Return {week: rows} for the requested weeks of a season that are in the box score cache."""
+    shelf_file = os.path.join(CACHE_DIR, BOX_SCORE_SHELF)
+    if not _shelf_exists(shelf_file):
+        return {}
+    cached = {}
+    with shelve.open(shelf_file) as shelf:
+        for week in weeks:
+            key = _box_score_key(league_id, year, week)
+            if key in shelf:
+                cached[week] = shelf[key]
+    return cached
+
+def save_box_score_week(league_id, year: int, week: int, rows: list) -> None:
+    """
+    Cache the player rows of one finished scoring period.
+
+    Only call this for weeks that have been played: their box scores no
+    longer change, so cached weeks never expire.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with shelve.open(os.path.join(CACHE_DIR, BOX_SCORE_SHELF)) as shelf:
+        shelf[_box_score_key(league_id, year, week)] = rows
+
+def clear_cache_for_league(league_id: str, years: Optional[List[int]] = None) -> int:
     """
     Clear cached data for a specific league and optionally specific years.
+
+    Uses the key index so only the matching entries are touched, and league
+    ids are compared exactly (clearing league 123 leaves league 9123 alone).
     
     Args:
         league_id: League ID to clear cache for
         years: Optional list of specific years to clear. If None, clears all years.
+
+    Returns:
+        Number of cache entries removed
     """
+    league_id = str(league_id)
+    shelf_file = get_shelf_file(0, league_id)
+    if not _shelf_exists(shelf_file):
+        return 0
+
+    removed = 0
     try:
-        # Pattern to find cache files
-        cache_files = glob.glob(os.path.join(CACHE_DIR, "league_cache*"))
-        
-        for cache_file in cache_files:
-            try:
-                with shelve.open(cache_file) as shelf:
-                    keys_to_delete = []
-                    
-                    for key in shelf.keys():
-                        # Key format is "year_league_id"
-                        if f"_{league_id}" in key:
-                            if years is None:
-                                # Clear all years for this league
-                                keys_to_delete.append(key)
-                            else:
-                                # Only clear specific years
-                                key_year = int(key.split('_')[0])
-                                if key_year in years:
-                                    keys_to_delete.append(key)
-                    
-                    # Delete the keys
-                    for key in keys_to_delete:
-                        del shelf[key]
-                        year = key.split('_')[0]
-                        print(f"Cleared cache for league {league_id}, year {year}")
-                        
-            except Exception as e:
-                print(f"Error clearing cache file {cache_file}: {e}")
-                
+        with shelve.open(shelf_file) as shelf:
+            index = _load_index(shelf)
+            cached_years = index.get(league_id, {})
+            targets = list(cached_years) if years is None else [year for year in years if year in cached_years]
+
+            for year in sorted(targets):
+                key = _cache_key(year, league_id)
+                if key in shelf:
+                    del shelf[key]
+                    removed += 1
+                    logger.debug(f"Cleared cache for league {league_id}, year {year}")
+                cached_years.pop(year, None)
+
+            if not cached_years:
+                index.pop(league_id, None)
+            shelf[INDEX_KEY] = index
+
     except Exception as e:
-        print(f"Error during cache clearing: {e}")
+        logger.error(f"Error during cache clearing: {e}")
+
+    return removed
+
+def list_cached_seasons() -> Dict[str, Dict[int, datetime]]:
+    """Return every cached league with the cache time of each season, read from the key index."""
+    return {league: dict(sorted(years.items())) for league, years in _read_index().items()}
 
 def check_cache_exists(year: int, league_id: str, max_age_days: float = 600.0) -> bool:
     """
@@ -97,8 +207,8 @@ def check_cache_exists(year: int, league_id: str, max_age_days: float = 600.0) -
     Returns:
         True if valid cache exists, False otherwise
     """
-    cached_league = load_league_from_shelf(year, league_id, max_age_days)
-    return cached_league is not None
+    cached_at = _read_index().get(str(league_id), {}).get(year)
+    return cached_at is not None and (datetime.now() - cached_at).total_seconds() < max_age_days * 86400
 
 def get_cache_status(years: List[int], league_id: str, max_age_days: float = 600.0) -> dict:
     """
@@ -112,9 +222,12 @@ def get_cache_status(years: List[int], league_id: str, max_age_days: float = 600
     Returns:
         Dictionary with year as key and cache status (bool) as value
     """
+    cached = _read_index().get(str(league_id), {})
+    now = datetime.now()
     status = {}
     for year in years:
-        status[year] = check_cache_exists(year, league_id, max_age_days)
+        cached_at = cached.get(year)
+        status[year] = cached_at is not None and (now - cached_at).total_seconds() < max_age_days * 86400
     return status
 
 def fetch_league_with_cache(
@@ -124,10 +237,16 @@ def fetch_league_with_cache(
     SWID: str, 
     max_age_days: float = 10,
     use_cache: bool = True,
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    probe: bool = True
 ) -> List[League]:
     """
     Fetch a league with shelf-based caching and cache control options.
+
+    With probe=True each season is probed first (one small request, see
+    app/services/freshness.py) and a cached season is only refetched if the
+    probe shows it changed; max_age_days then only bounds seasons in
+    progress. The probe is saved with every season fetched.
     
     Args:
         years: Years to fetch data for
@@ -137,6 +256,7 @@ def fetch_league_with_cache(
         max_age_days: Maximum age of cached data in days
         use_cache: Whether to use cached data (default: True)
         force_refresh: Whether to force refresh cache (default: False)
+        probe: Whether to probe seasons instead of relying on max_age_days alone (default: True)
         
     Returns:
         List of League objects
@@ -146,13 +266,13 @@ def fetch_league_with_cache(
     
     # Handle force refresh - clear cache first
     if force_refresh:
-        print(f"Force refresh enabled - clearing cache for league {LEAGUE_ID}")
+        logger.info(f"Force refresh enabled - clearing cache for league {LEAGUE_ID}")
         clear_cache_for_league(LEAGUE_ID, years_to_fetch)
         # Continue with normal flow to fetch and cache
     
     # Handle no cache mode
     if not use_cache:
-        print(f"Cache disabled - fetching fresh data for years {years_to_fetch}")
+        logger.info(f"Cache disabled - fetching fresh data for years {years_to_fetch}")
         # Fetch directly from API without checking or saving to cache
         fetched_leagues = asyncio.run(fetch_league_data(years_to_fetch, LEAGUE_ID, ESPN_S2, SWID))
         return fetched_leagues
@@ -162,27 +282,35 @@ def fetch_league_with_cache(
     year_to_league_map = {}
     
     # Check cache for each year
+    probes = {}
     for year in years_to_fetch:
-        cached_league = load_league_from_shelf(year, LEAGUE_ID, max_age_days)
-        if cached_league is None:
-            non_cached_years.append(year)
+        entry = load_cache_entry(year, LEAGUE_ID)
+        probes[year] = probe_season(year, LEAGUE_ID, ESPN_S2, SWID) if probe else None
+        if entry is not None and cache_is_current(entry, probes[year], max_age_days):
+            logger.debug(f"Cache hit for league {LEAGUE_ID} in year {year}", extra={"year": year})
+            year_to_league_map[year] = entry['league']
         else:
-            print(f"Cache hit for league {LEAGUE_ID} in year {year}")
-            year_to_league_map[year] = cached_league
+            if entry is not None:
+                logger.debug(f"Cache for league {LEAGUE_ID} in year {year} is stale", extra={"year": year})
+            non_cached_years.append(year)
     
     # Fetch missing years from API
     if non_cached_years:
-        print(f"Cache miss for years: {non_cached_years}")
+        logger.info(f"Cache miss for years: {non_cached_years}")
         fetched_leagues = asyncio.run(fetch_league_data(non_cached_years, LEAGUE_ID, ESPN_S2, SWID))
         
         # Save to cache and map
-        for year, league in zip(non_cached_years, fetched_leagues):
-            print(f"Saving league {LEAGUE_ID} in year {year} to shelf")
-            save_league_to_shelf(league)
-            year_to_league_map[year] = league
+        for league in fetched_leagues:
+            logger.debug(f"Saving league {LEAGUE_ID} in year {league.year} to shelf", extra={"year": league.year})
+            probe_result = probes.get(league.year)
+            save_league_to_shelf(league, probe_result.signature if probe_result else None)
+            year_to_league_map[league.year] = league
     
     # Return leagues in the order of the requested years
-    print(f"Final year to league mapping: {list(year_to_league_map.keys())}")
+    hits = len(years_to_fetch) - len(non_cached_years)
+    logger.info(f"Loaded {len(year_to_league_map)} seasons of league {LEAGUE_ID}: {hits} from cache, "
+                f"{len(year_to_league_map) - hits} from ESPN",
+                extra={"league_id": LEAGUE_ID, "cache_hits": hits, "fetched": len(year_to_league_map) - hits})
     for year in years_to_fetch:
         leagues.append(year_to_league_map[year])
     
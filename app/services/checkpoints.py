@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.db.models import PipelineCheckpoint
+from app.db.session import get_engine
+from app.db.upsert import bulk_upsert
+from app.services.box_scores import week_is_final
+from app.services.season import Season, season_of
+from app.services.transform import LEAGUE_STAGES, STAGE_TRANSFORMS, transform_league
+
+
+def stage_fingerprint(league, stage: str) -> Optional[str]:
+    """
+    Hash what a stage loads for a fetched season; None if that is only known by loading it.
+
+    Stages loaded from the compact season model hash their transformed rows,
+    so any change to a value they write (a score, a transaction, a setting)
+    marks the stage stale. Box scores are not part of the season model: the
+    box score stages hash the whole model once every week of the season is
+    final, and are never skipped while weeks can still change. Other stages,
+    e.g. team_logos, hash the whole model. No extra ESPN requests are made.
+    """
+    season = season_of(league)
+    if stage in LEAGUE_STAGES:
+        if not week_is_final(league, season.final_scoring_period):
+            return None
+        content = _season_content(season)
+    elif stage in STAGE_TRANSFORMS:
+        content = [tuple(row) for row in transform_league(stage, league)]
+    else:
+        content = _season_content(season)
+    return hashlib.sha256(repr(content).encode()).hexdigest()
+
+
+def _season_content(season: Season) -> Season:
+    # Sorted, so the hash does not depend on the order ESPN listed the players in
+    return season._replace(players=tuple(sorted(season.players.items())))
+
+
+def load_checkpoints(league_id, years: Iterable[int]) -> Dict[Tuple[int, str], str]:
+    """Return {(year, stage): content hash} for the completed units of a league."""
+    stmt = select(PipelineCheckpoint.year, PipelineCheckpoint.stage, PipelineCheckpoint.contentHash).where(
+        PipelineCheckpoint.leagueId == int(league_id),
+        PipelineCheckpoint.year.in_(list(years)),
+    )
+    with get_engine().connect() as conn:
+        return {(year, stage): content_hash for year, stage, content_hash in conn.execute(stmt)}
+
+
+def last_loaded(league_id, years: Iterable[int], stages: Iterable[str]) -> Dict[int, datetime]:
+    """
+    Return {year: when the season was last loaded} from a league's checkpoints.
+
+    A season counts as loaded only if every one of the stages has a
+    checkpoint, and as of the oldest of them; seasons missing a stage are
+    left out.
+    """
+    stages = set(stages)
+    stmt = (
+        select(PipelineCheckpoint.year, func.count(), func.min(PipelineCheckpoint.completedAt))
+        .where(
+            PipelineCheckpoint.leagueId == int(league_id),
+            PipelineCheckpoint.year.in_(list(years)),
+            PipelineCheckpoint.stage.in_(stages),
+        )
+        .group_by(PipelineCheckpoint.year)
+    )
+    with get_engine().connect() as conn:
+        return {year: completed_at for year, count, completed_at in conn.execute(stmt) if count == len(stages)}
+
+
+def record_checkpoints(league_id, stage: str, hashes: Dict[int, str]) -> None:
+    """Mark a stage complete for each season in {year: content hash}."""
+    completed_at = datetime.now()
+    bulk_upsert(PipelineCheckpoint, [
+        {
+            'leagueId': int(league_id),
+            'year': year,
+            'stage': stage,
+            'contentHash': content_hash,
+            'completedAt': completed_at,
+        }
+        for year, content_hash in hashes.items()
+    ])
@@ -1,20 +1,27 @@
 from espn_api.football import League
-from app.db.models import FFleague, Team, Draft, Player, Settings, Matchup, Roster
+from app.db.models import (
+    FFleague, Team, Owner, TeamOwner, Draft, Player, Settings, Matchup, Roster, PlayerWeeklyStat, LineupSlot,
+    RosterSnapshot
+)
+from app.db.partitions import ensure_partitions
 from app.db.session import get_db
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import select
+from app.db.upsert import bulk_upsert, UpsertBuffer
+from app.services.logos import archive_team_logos
+from app.services.transform import STAGE_ROWS, SettingsRow, TeamRow, transform_league
 from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import deque
+from collections import deque, namedtuple
+from itertools import islice
+from sqlalchemy import bindparam, delete
 import asyncio
-from dotenv import load_dotenv
-import os
+import logging
+from app.config import get_env
 
-# Load environment variables from .env file
-load_dotenv()
-LEAGUE_ID = os.getenv("LEAGUE_ID")
-ESPN_S2 = os.getenv("ESPN_S2")
-SWID = os.getenv("SWID")
+logger = logging.getLogger(__name__)
+
+def _league_for_year(year):
+    """Fetch a League for the configured LEAGUE_ID (legacy year-range loaders)."""
+    return League(get_env("LEAGUE_ID"), year=year, swid=get_env("SWID"), espn_s2=get_env("ESPN_S2"))
 
 @contextmanager
 def get_db_session():
@@ -30,11 +37,12 @@ def fetch_and_populate_draft(start_year, end_year):
     batch_size = 1000
     picks_to_upsert = []
 
+    ensure_partitions(Draft, range(start_year, end_year + 1))
     try:
         with get_db_session() as db:
             for year in range(start_year, end_year + 1):
                 try:
-                    league = League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
+                    league = _league_for_year(year)
                     draft = league.draft
                     for pick_index, pick in enumerate(draft, 1):
 
@@ -43,10 +51,14 @@ def fetch_and_populate_draft(start_year, end_year):
                         #Get the playerId from players table
                         player_id = db.query(Player).filter(Player.espnId == pick.playerId).first().id
                         #Get the team id from teams table
-                        team_id = db.query(Team).filter(Team.teamId == pick.team.team_id, Team.year == year).first().id
+                        team = db.query(Team).join(FFleague, Team.league_id == FFleague.id).filter(
+                            FFleague.leagueId == int(league.league_id), Team.teamId == pick.team.team_id, Team.year == year
+                        ).first()
                         # Create a dictionary to store pick information
                         pick_info = {
-                                'team_id': team_id,
+                                'year': year,
+                                'league_id': team.league_id,
+                                'team_id': team.id,
                                 'overallPick': pick_index,
                                 'player_id': player_id,           # Integer ID of the player
                                 'roundNum': pick.round_num,          # Integer round number
@@ -59,587 +71,437 @@ def fetch_and_populate_draft(start_year, end_year):
 
                             # Process in batches
                         if len(picks_to_upsert) >= batch_size:
-                            bulk_upsert_picks(picks_to_upsert)
+                            bulk_upsert(Draft, picks_to_upsert)
                             picks_to_upsert = []
                             
                 except Exception as e:
-                    print(f"Error processing year {year}: {e}")
+                    logger.error(f"Error processing year {year}: {e}")
                     continue
                     
             # Process any remaining leagues
             if picks_to_upsert:
-                bulk_upsert_picks(picks_to_upsert)
+                bulk_upsert(Draft, picks_to_upsert)
                 
     except Exception as e:
-            print(f"A critical error occurred: {e}")
+            logger.error(f"A critical error occurred: {e}")
             raise
 
-def fetch_and_populate_draft_from_leagues(leagues: list[League]):
-    batch_size = 2000
-    picks_to_upsert = []
+class KeyResolver:
+    """
+    Resolves ESPN natural keys to surrogate ids.
+
+    Looks keys up in bulk (all teams of a season, players in chunks) and
+    caches them, instead of one query per row.
+    """
+
+    PLAYER_CHUNK = 5000
+
+    def __init__(self, db):
+        self.db = db
+        self._leagues = {}
+        self._teams = {}
+        self._players = {}
+        self._owners = {}
+        self._slots = {}
+
+    def league_id(self, league_id, year):
+        key = (int(league_id), year)
+        if key not in self._leagues:
+            league_record = self.db.query(FFleague.id).filter(
+                FFleague.leagueId == key[0],
+                FFleague.year == year
+            ).first()
+            if not league_record:
+                raise LookupError(f"League record not found for year {year}")
+            self._leagues[key] = league_record.id
+        return self._leagues[key]
+
+    def teams(self, league_id, year):
+        """Return {ESPN team id: teams.id} for a league's season."""
+        key = (int(league_id), year)
+        if key not in self._teams:
+            self._teams[key] = dict(self.db.query(Team.teamId, Team.id).filter(
+                Team.league_id == self.league_id(league_id, year),
+            ).all())
+        return self._teams[key]
+
+    def players(self, espn_ids):
+        """Return {ESPN player id: players.id}, loading any ids not seen yet."""
+        missing = [espn_id for espn_id in set(espn_ids) if espn_id not in self._players]
+        for start in range(0, len(missing), self.PLAYER_CHUNK):
+            chunk = missing[start:start + self.PLAYER_CHUNK]
+            self._players.update(self.db.query(Player.espnId, Player.id).filter(Player.espnId.in_(chunk)).all())
+        return self._players
+
+    def owners(self, espn_ids):
+        """Return {ESPN member id: owners.id}, loading any ids not seen yet."""
+        missing = [espn_id for espn_id in set(espn_ids) if espn_id not in self._owners]
+        if missing:
+            self._owners.update(self.db.query(Owner.espnId, Owner.id).filter(Owner.espnId.in_(missing)).all())
+        return self._owners
+
+    def slots(self, names):
+        """Return {slot name: lineup_slots.id}, adding any slot names not in the dictionary yet."""
+        missing = sorted({name for name in names if name not in self._slots})
+        if missing:
+            bulk_upsert(LineupSlot, [{'name': name} for name in missing])
+            self._slots.update(self.db.query(LineupSlot.name, LineupSlot.id).filter(LineupSlot.name.in_(missing)).all())
+        return self._slots
+
+
+# Resolved rows, one record type per model with the model's column names.
+# Transform rows become these without an intermediate dict per row.
+SettingsModelRow = namedtuple('SettingsModelRow', SettingsRow._fields[2:] + ('league_id',))
+TeamModelRow = namedtuple('TeamModelRow', TeamRow._fields[1:] + ('league_id',))
+TeamOwnerModelRow = namedtuple('TeamOwnerModelRow', ['team_id', 'owner_id'])
+DraftModelRow = namedtuple('DraftModelRow', [
+    'year', 'league_id', 'team_id', 'player_id', 'overallPick', 'roundNum', 'roundPick', 'bidAmount',
+    'keeperStatus', 'nominating_team_id',
+])
+MatchupModelRow = namedtuple('MatchupModelRow', [
+    'year', 'league_id', 'week', 'home_team_id', 'away_team_id', 'homeScore', 'awayScore', 'isPlayoff',
+    'matchupType',
+])
+RosterModelRow = namedtuple('RosterModelRow', ['year', 'league_id', 'team_id', 'player_id', 'rosterSlot'])
+PlayerWeeklyStatModelRow = namedtuple('PlayerWeeklyStatModelRow', [
+    'player_id', 'team_id', 'year', 'week', 'points', 'projectedPoints', 'lineupSlot',
+])
+RosterSnapshotModelRow = namedtuple('RosterSnapshotModelRow', [
+    'team_id', 'player_id', 'year', 'weekFrom', 'weekTo', 'slot_id',
+])
+
+# Resolvers take the ESPN league id of the rows, for stages whose rows do not carry it
+
+def _resolve_settings(rows, resolver, league_id):
+    # Everything after leagueId and year is copied as-is
+    return [SettingsModelRow(*row[2:], resolver.league_id(row.leagueId, row.year)) for row in rows]
+
+def _resolve_teams(rows, resolver, league_id):
+    return [TeamModelRow(*row[1:], resolver.league_id(row.leagueId, row.year)) for row in rows]
+
+def _resolve_team_owners(rows, resolver, league_id):
+    owners = resolver.owners(row.ownerId for row in rows)
+    return [TeamOwnerModelRow(resolver.teams(league_id, row.year)[row.teamId], owners[row.ownerId]) for row in rows]
+
+def _resolve_draft(rows, resolver, league_id):
+    players = resolver.players(row.playerId for row in rows)
+    resolved = []
+    for row in rows:
+        teams = resolver.teams(row.leagueId, row.year)
+        nominating_team_id = row.nominatingTeamId
+        resolved.append(DraftModelRow(
+            row.year,
+            resolver.league_id(row.leagueId, row.year),
+            teams[row.teamId],
+            players[row.playerId],
+            row.overallPick,
+            row.roundNum,
+            row.roundPick,
+            row.bidAmount,
+            row.keeperStatus,
+            teams.get(nominating_team_id) if nominating_team_id is not None else None,
+        ))
+    return resolved
+
+def _resolve_matchups(rows, resolver, league_id):
+    resolved = []
+    for row in rows:
+        teams = resolver.teams(row.leagueId, row.year)
+        resolved.append(MatchupModelRow(
+            row.year,
+            resolver.league_id(row.leagueId, row.year),
+            row.week,
+            teams.get(row.homeTeamId),
+            teams.get(row.awayTeamId),
+            row.homeScore,
+            row.awayScore,
+            row.isPlayoff,
+            row.matchupType,
+        ))
+    return resolved
+
+def _resolve_rosters(rows, resolver, league_id):
+    players = resolver.players(row.playerId for row in rows)
+    resolved = []
+    for row in rows:
+        teams = resolver.teams(row.leagueId, row.year)
+        resolved.append(RosterModelRow(
+            row.year,
+            resolver.league_id(row.leagueId, row.year),
+            teams[row.teamId],
+            players[row.playerId],
+            row.rosterSlot,
+        ))
+    return resolved
+
+def _resolve_player_weekly_stats(rows, resolver, league_id):
+    """Resolve streamed weekly stat rows a chunk at a time, so a season is never held in memory."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, resolver.PLAYER_CHUNK))
+        if not chunk:
+            return
+        players = resolver.players(row.playerId for row in chunk)
+        for row in chunk:
+            player_id = players.get(row.playerId)
+            if player_id is None:
+                # Not in the season's player pool, nothing to reference
+                continue
+            yield PlayerWeeklyStatModelRow(
+                player_id,
+                resolver.teams(league_id, row.year)[row.teamId],
+                row.year,
+                row.week,
+                row.points,
+                row.projectedPoints,
+                row.lineupSlot,
+            )
+
+def _resolve_roster_snapshots(rows, resolver, league_id):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, resolver.PLAYER_CHUNK))
+        if not chunk:
+            return
+        players = resolver.players(row.playerId for row in chunk)
+        slots = resolver.slots(row.lineupSlot for row in chunk)
+        for row in chunk:
+            player_id = players.get(row.playerId)
+            if player_id is None:
+                continue
+            yield RosterSnapshotModelRow(
+                resolver.teams(league_id, row.year)[row.teamId],
+                player_id,
+                row.year,
+                row.weekFrom,
+                row.weekTo,
+                slots[row.lineupSlot],
+            )
+
+# Stage name -> (model, function resolving natural-key rows into model rows)
+STAGE_LOADERS = {
+    "leagues": (FFleague, lambda rows, resolver, league_id: rows),
+    "players": (Player, lambda rows, resolver, league_id: rows),
+    "settings": (Settings, _resolve_settings),
+    "teams": (Team, _resolve_teams),
+    "owners": (Owner, lambda rows, resolver, league_id: rows),
+    "team_owners": (TeamOwner, _resolve_team_owners),
+    "draft": (Draft, _resolve_draft),
+    "matchups": (Matchup, _resolve_matchups),
+    "rosters": (Roster, _resolve_rosters),
+    "player_weekly_stats": (PlayerWeeklyStat, _resolve_player_weekly_stats),
+    "roster_snapshots": (RosterSnapshot, _resolve_roster_snapshots),
+}
+
+# High-volume stages, loaded with COPY where the target supports it
+COPY_STAGES = {"player_weekly_stats", "roster_snapshots"}
+
+_DELETE_TEAM_OWNER = delete(TeamOwner).where(
+    TeamOwner.team_id == bindparam('t'),
+    TeamOwner.owner_id == bindparam('o'),
+)
+
+_DELETE_SPAN = delete(RosterSnapshot).where(
+    RosterSnapshot.team_id == bindparam('t'),
+    RosterSnapshot.player_id == bindparam('p'),
+    RosterSnapshot.year == bindparam('y'),
+    RosterSnapshot.weekFrom == bindparam('w'),
+)
+
+
+def _prune_team_owners(db, resolver, league_id, year, links):
+    """
+    Delete the owner links of a season's teams that are not among the links just loaded.
+
+    ESPN drops or replaces a co-owner by listing the team's owners anew, so
+    the old owner's link would otherwise keep crediting them with the season.
+    """
+    team_ids = list(resolver.teams(league_id, year).values())
+    if not team_ids:
+        return
+    current = {(link.team_id, link.owner_id) for link in links}
+    existing = db.query(TeamOwner.team_id, TeamOwner.owner_id).filter(TeamOwner.team_id.in_(team_ids)).all()
+    stale = [{'t': t, 'o': o} for t, o in existing if (t, o) not in current]
+    if stale:
+        # On the connection: the ORM has no bulk DELETE for a table keyed by two columns
+        db.connection().execute(_DELETE_TEAM_OWNER, stale)
+        db.commit()
+        logger.debug(f"Deleted {len(stale)} outdated team owners of {year}", extra={"year": year})
+
+
+def _prune_roster_snapshots(db, resolver, league_id, year, spans):
+    """
+    Delete a season's spans that are not among the spans just loaded.
+
+    A changed lineup or a dropped player ends or splits a span, and the new
+    spans are keyed differently, so the old ones would otherwise stay next
+    to them. Run after the season's spans are written, so a failed load
+    keeps the previous roster history.
+    """
+    team_ids = list(resolver.teams(league_id, year).values())
+    if not team_ids:
+        return
+    current = {(span.team_id, span.player_id, span.weekFrom) for span in spans}
+    existing = db.query(RosterSnapshot.team_id, RosterSnapshot.player_id, RosterSnapshot.weekFrom).filter(
+        RosterSnapshot.year == year,
+        RosterSnapshot.team_id.in_(team_ids),
+    ).all()
+    stale = [{'t': t, 'p': p, 'y': year, 'w': w} for t, p, w in existing if (t, p, w) not in current]
+    if stale:
+        db.execute(_DELETE_SPAN, stale)
+        db.commit()
+        logger.debug(f"Deleted {len(stale)} outdated roster spans of {year}", extra={"year": year})
+
+
+# Stages that re-derive a whole season on every load, so rows the load no
+# longer produces are deleted: stage -> function pruning one season's rows
+# (a season's owner links and spans are few enough to hold)
+REPLACED_STAGES = {
+    "team_owners": _prune_team_owners,
+    "roster_snapshots": _prune_roster_snapshots,
+}
+
+
+def populate_stage(stage, leagues):
+    """
+    Transform each league for one stage and upsert the rows.
+
+    Each season's rows are flushed before the next season is transformed,
+    so a year only counts as loaded once all of its rows are written.
+    Returns the years that could not be loaded.
+    """
+    model, resolve = STAGE_LOADERS[stage]
+    failed_years = []
+    ensure_partitions(model, [league.year for league in leagues])
 
     try:
-        with get_db_session() as db:
+        with get_db_session() as db, UpsertBuffer(model, copy=stage in COPY_STAGES) as buffer:
+            resolver = KeyResolver(db)
             for league in leagues:
-                year=league.year
                 try:
-                    #league = League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
-                    draft = league.draft
-                    for pick_index, pick in enumerate(draft, 1):
-
-                        #Query the database to get the player ID from 'players' table and team id
-
-                        #Get the playerId from players table
-                        player_id = db.query(Player).filter(Player.espnId == pick.playerId).first().id
-                        #Get the team id from teams table
-                        team_id = db.query(Team).filter(Team.teamId == pick.team.team_id, Team.year == year).first().id
-                        # Create a dictionary to store pick information
-                        pick_info = {
-                                'team_id': team_id,
-                                'overallPick': pick_index,
-                                'player_id': player_id,           # Integer ID of the player
-                                'roundNum': pick.round_num,          # Integer round number
-                                'roundPick': pick.round_pick,        # Integer pick number within the round
-                                'bidAmount': pick.bid_amount,        # Integer bid amount (for auction drafts)
-                                'keeperStatus': pick.keeper_status,  # Boolean keeper status
-                                #'nominating_team_name': None
-                            }
-                        picks_to_upsert.append(pick_info)
-
-                            # Process in batches
-                        if len(picks_to_upsert) >= batch_size:
-                            bulk_upsert_picks(picks_to_upsert)
-                            picks_to_upsert = []
-                            
+                    rows = resolve(transform_league(stage, league), resolver, league.league_id)
+                    if stage in REPLACED_STAGES:
+                        rows = list(rows)
+                    buffer.extend(rows)
+                    buffer.flush()
+                    if stage in REPLACED_STAGES:
+                        REPLACED_STAGES[stage](db, resolver, league.league_id, league.year, rows)
                 except Exception as e:
-                    print(f"Error processing year {year}: {e}")
+                    logger.error(f"Error processing {stage} for league {league.league_id}, year {league.year}: {e}",
+                                 extra={"stage": stage, "year": league.year})
+                    buffer.discard()
+                    failed_years.append(league.year)
                     continue
-                    
-            # Process any remaining leagues
-            if picks_to_upsert:
-                bulk_upsert_picks(picks_to_upsert)
-                
-    except Exception as e:
-            print(f"A critical error occurred: {e}")
-            raise
 
-def fetch_and_populate_leagues_from_leagues(leagues: list[League]):
-    batch_size = 100
-    leagues_to_upsert = []
-    for league in leagues:
-        try:
-            league_data = {
-                        'leagueId': league.league_id,
-                        'teamCount': len(league.teams),
-                        'year': league.year,
-                        'currentWeek': league.current_week,
-                        'nflWeek': league.nfl_week
-                    }
-            leagues_to_upsert.append(league_data)
-
-            # Process in batches
-            if len(leagues_to_upsert) >= batch_size:
-                bulk_upsert_league(leagues_to_upsert)
-                leagues_to_upsert = []
-        except Exception as e:
-            print(f"A critical error occurred {league.year}: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"A critical error occurred: {e}")
+        raise
 
-    # Process any remaining leagues
-    if leagues_to_upsert:
-        bulk_upsert_leagues(leagues_to_upsert)
-                
+    return failed_years
 
-def fetch_and_populate_roster_from_leagues(leagues: list[League]):
-    batch_size = 100
-    roster_to_upsert = []
+def load_stage_rows(stage, rows, league_id=None):
+    """
+    Resolve and upsert natural-key rows previously produced by a stage transform.
 
-    try:
-        with get_db_session() as db:
-            for league in leagues:
-                year=league.year
-                try:
-                    for team in league.teams:
-                        team_id = db.query(Team).filter(Team.teamId == team.team_id, Team.year == year).first().id
+    Rows may also be dicts with the same keys, e.g. read back from the spool.
+    league_id is the ESPN league the rows belong to; it is needed for the
+    stages whose rows do not carry it (team owners, weekly stats, spans).
+    """
+    model, resolve = STAGE_LOADERS[stage]
+    record = STAGE_ROWS[stage]
+    rows = [record(**row) if isinstance(row, dict) else row for row in rows]
+    if 'year' in record._fields:
+        ensure_partitions(model, {row.year for row in rows})
+    with get_db_session() as db:
+        resolver = KeyResolver(db)
+        if stage not in REPLACED_STAGES:
+            with UpsertBuffer(model, copy=stage in COPY_STAGES) as buffer:
+                buffer.extend(resolve(rows, resolver, league_id))
+            return
+        # One season at a time, so each is pruned against its own rows
+        for year in sorted({row.year for row in rows}):
+            resolved = list(resolve([row for row in rows if row.year == year], resolver, league_id))
+            with UpsertBuffer(model, copy=stage in COPY_STAGES) as buffer:
+                buffer.extend(resolved)
+            REPLACED_STAGES[stage](db, resolver, league_id, year, resolved)
 
+def fetch_and_populate_leagues_from_leagues(leagues: list[League]):
+    return populate_stage("leagues", leagues)
 
-                        for player in team.roster:
+def fetch_and_populate_roster_from_leagues(leagues: list[League]):
+    return populate_stage("rosters", leagues)
 
-                        #Query the database to get the player ID from 'players' table and team id
+def fetch_and_populate_player_weekly_stats_from_leagues(leagues: list[League]):
+    """Fetch every scoring period's box scores and load per-player weekly points."""
+    return populate_stage("player_weekly_stats", leagues)
 
-                            #Get the playerId from players table
-                            player_id = db.query(Player).filter(Player.espnId == player.playerId).first().id
-                            # Create a dictionary to store pick information
-                            roster_info = {
-                                    'team_id': team_id,
-                                    'player_id': player_id,
-                                    'rosterSlot': player.lineupSlot,
-                                }
-                            roster_to_upsert.append(roster_info)
-
-                                # Process in batches
-                            if len(roster_to_upsert) >= batch_size:
-                                bulk_upsert_roster(roster_to_upsert)
-                                roster_to_upsert = []
-                            
-                except Exception as e:
-                    print(f"Error processing year {year}: {e}")
-                    continue
-                    
-            # Process any remaining leagues
-            if roster_to_upsert:
-                bulk_upsert_roster(roster_to_upsert)
-                
-    except Exception as e:
-            print(f"A critical error occurred: {e}")
-            raise
+def fetch_and_populate_roster_snapshots_from_leagues(leagues: list[League]):
+    """Load weekly rosters as spans of unchanged weeks, from the cached box scores."""
+    return populate_stage("roster_snapshots", leagues)
 
 def fetch_and_populate_matchups_from_leagues(leagues: list[League]):
-    batch_size = 1000
-    matchups_to_upsert = []
-    try:
-        with get_db_session() as db:
-            for league in leagues:
-                try:
-                    year = league.year
-                    # Retrieve all team IDs upfront - single query
-                    teams_lookup = {team.teamId: team.id for team in 
-                                    db.query(Team).filter(Team.year == year).all()}
-                    
-                    weeks = range(league.firstScoringPeriod, league.finalScoringPeriod+1)
-                    for week in weeks:
-                        scoreboard = league.scoreboard(week)
-                        for matchup in scoreboard:
-                            home_team_id = teams_lookup.get(matchup._home_team_id) if matchup._home_team_id != 0 else None
-                            away_team_id = teams_lookup.get(matchup._away_team_id) if matchup._away_team_id != 0 else None
-                            
-                            matchup_info = {
-                                'week': week,
-                                'home_team_id': home_team_id,
-                                'away_team_id': away_team_id,
-                                'homeScore': matchup.home_score,
-                                'awayScore': matchup.away_score,
-                                'isPlayoff': matchup.is_playoff,
-                                'matchupType': matchup.matchup_type
-                            }
-                            matchups_to_upsert.append(matchup_info)
-                            
-                            # Process in batches
-                            if len(matchups_to_upsert) >= batch_size:
-                                bulk_upsert_matchups(matchups_to_upsert)
-                                matchups_to_upsert = []
-                
-                except Exception as e:
-                    print(f"Error processing year {year}: {e}")
-                    continue
-            
-            # Process any remaining leagues
-            if matchups_to_upsert:
-                bulk_upsert_matchups(matchups_to_upsert)
-    
-    except Exception as e:
-        print(f"A critical error occurred: {e}")
-        raise
+    return populate_stage("matchups", leagues)
 
 def fetch_and_populate_settings_from_leagues(leagues: list[League]):
     """
     Fetch and populate league settings with upsert functionality.
     
     Uses batch processing for better performance.
+    Returns the years that could not be loaded.
     """
-    batch_size = 100
-    settings_to_upsert = []
-
-    try:
-        with get_db_session() as db:
-            for league in leagues:
-                try:
-                    # Access the league's year
-                    year = league.year
-                    league_id = league.league_id
-
-                    # Query the leagues table to get the league record for the current year
-                    league_record = db.query(FFleague).filter(
-                        FFleague.leagueId == league_id,
-                        FFleague.year == year
-                    ).first()
-
-                    if not league_record:
-                        print(f"League record not found for year {year}")
-                        continue
-
-                    # Fetch settings from the League object (assuming it's part of the League object)
-                    settings = league.settings
-
-                    # Prepare the dictionary for the league settings
-                    league_settings = {
-                        'league_id': league_record.id,
-                        'regularSeasonCount': settings.reg_season_count,
-                        'vetoVotesRequired': settings.veto_votes_required,
-                        'teamCount': settings.team_count,
-                        'playoffTeamCount': settings.playoff_team_count,
-                        'keeperCount': settings.keeper_count,
-                        'tradeDeadline': settings.trade_deadline,
-                        'name': settings.name,
-                        'tieRule': settings.tie_rule,
-                        'playoffTieRule': settings.playoff_tie_rule,
-                        'playoffSeedTieRule': settings.playoff_seed_tie_rule,
-                        'playoffMatchupPeriodLength': settings.playoff_matchup_period_length,
-                        'faab': settings.faab,
-                    }
-
-                    # Add the settings to the list of settings to upsert
-                    settings_to_upsert.append(league_settings)
-
-                    # Process in batches
-                    if len(settings_to_upsert) >= batch_size:
-                        bulk_upsert_settings(settings_to_upsert)
-                        settings_to_upsert = []
-
-                except Exception as e:
-                    print(f"Error processing league {league.leagueId} for year {year}: {e}")
-                    continue
-
-            # Process any remaining settings
-            if settings_to_upsert:
-                bulk_upsert_settings(settings_to_upsert)
-
-    except Exception as e:
-        print(f"A critical error occurred: {e}")
-        raise
+    return populate_stage("settings", leagues)
 
 def fetch_and_populate_players_from_leagues(leagues: list[League]):
     """
     Fetch and populate player data from a list of leagues.
     
     Uses batch processing for better performance.
+    Returns the years that could not be loaded.
     """
-    batch_size = 1000
-    players_to_upsert = []
-    
-    try:
-        for league in leagues:
-            try:
-                year = league.year
-                player_map = league.player_map  # Assuming player_map is a dict with ESPN ID and name
-                
-                for espnId, name in player_map.items():
-                    if not isinstance(espnId, int):
-                        continue
-                    
-                    player_data = {
-                        'espnId': espnId,
-                        'name': name,
-                    }
-                    players_to_upsert.append(player_data)
-                
-                # Process in batches
-                if len(players_to_upsert) >= batch_size:
-                    bulk_upsert_players(players_to_upsert)
-                    players_to_upsert = []
-                    
-            except Exception as e:
-                print(f"Error processing league {league.leagueId} for year {league.year}: {e}")
-                continue
-        
-        # Process any remaining players
-        if players_to_upsert:
-            bulk_upsert_players(players_to_upsert)
-            
-    except Exception as e:
-        print(f"A critical error occurred: {e}")
-        raise
+    return populate_stage("players", leagues)
 
 def fetch_and_populate_teams_from_leagues(leagues: list[League]):
     """
     Fetch and populate team data from a list of leagues with upsert functionality.
     
     Uses batch processing for better performance.
+    Returns the years that could not be loaded.
     """
-    batch_size = 100
-    teams_to_upsert = []
-    
-    try:
-        with get_db_session() as db:
-            for league in leagues:
-                try:
-                    year = league.year
-                    league_id = league.league_id
-                    
-                    # Query the leagues table to get the league record for the current year
-                    league_record = db.query(FFleague).filter(
-                        FFleague.leagueId == league_id,
-                        FFleague.year == year
-                    ).first()
-                    
-                    if not league_record:
-                        print(f"League record not found for year {year}")
-                        continue
-                    
-                    # Process each team in the league
-                    for team in league.teams:
-                        owners = []
-                        for owner in team.owners:
-                            first_name = owner.get('firstName', 'Unknown')
-                            last_name = owner.get('lastName', 'Unknown')
-                            owners.append(first_name + " " + last_name)
-                        
-                        # Prepare the data for upserting into the teams table
-                        team_data = {
-                            'teamId': team.team_id,
-                            'league_id': league_record.id,  # Use the actual league.id here
-                            'year': year,
-                            'teamAbbrv': team.team_id,
-                            'teamName': team.team_name,
-                            'owners': ', '.join(owners),
-                            'divisionId': team.division_id,
-                            'divisionName': team.division_name,
-                            'wins': team.wins,
-                            'losses': team.losses,
-                            'ties': team.ties,
-                            'pointsFor': team.points_for,
-                            'pointsAgainst': team.points_against,
-                            'waiverRank': team.waiver_rank,
-                            'acquisitions': team.acquisitions,
-                            'acquisitionBudgetSpent': team.acquisition_budget_spent,
-                            'drops': team.drops,
-                            'trades': team.trades,
-                            'streakType': team.streak_type,
-                            'streakLength': team.streak_length,
-                            'standing': team.standing,
-                            'finalStanding': team.final_standing,
-                            'draftProjRank': team.draft_projected_rank,
-                            'playoffPct': team.playoff_pct,
-                            'logoUrl': team.logo_url
-                        }
-                        teams_to_upsert.append(team_data)
-                        
-                        # Process in batches
-                        if len(teams_to_upsert) >= batch_size:
-                            bulk_upsert_teams(teams_to_upsert)
-                            teams_to_upsert = []
-                            
-                except Exception as e:
-                    print(f"Error processing league {league.leagueId} for year {league.year}: {e}")
-                    continue
-        
-            # Process any remaining teams
-            if teams_to_upsert:
-                bulk_upsert_teams(teams_to_upsert)
-                
-    except Exception as e:
-        print(f"A critical error occurred: {e}")
-        raise
+    return populate_stage("teams", leagues)
 
-def fetch_and_populate_draft_from_leagues(leagues: list[League]):
+def fetch_and_populate_owners_from_leagues(leagues: list[League]):
     """
-    Fetch and populate draft pick data from a list of leagues.
-    
-    Uses batch processing for better performance.
-    """
-    batch_size = 1000
-    picks_to_upsert = []
-
-    try:
-        with get_db_session() as db:
-            for league in leagues:
-                try:
-                    year = league.year
-                    draft = league.draft  # Assuming this gives the draft information for the league
-
-                    for pick_index, pick in enumerate(draft, 1):
-                        # Query the database to get the player ID from the 'players' table and the team ID
-
-                        # Get the player ID from the players table
-                        player_id = db.query(Player).filter(Player.espnId == pick.playerId).first().id
-                        # Get the team ID from the teams table
-                        team_id = db.query(Team).filter(Team.teamId == pick.team.team_id, Team.year == year).first().id
-                        if pick.nominatingTeam == None:
-                            nominating_team_id = None
-                        else:
-                            nominating_team = db.query(Team).filter(Team.teamId == pick.nominatingTeam.team_id, Team.year == year).first()
-                            nominating_team_id = nominating_team.id if nominating_team else None
+    Load every team owner (ESPN league member) of the given seasons.
 
-                        # Create a dictionary to store pick information
-                        pick_info = {
-                            'team_id': team_id,
-                            'overallPick': pick_index,
-                            'player_id': player_id,           # Integer ID of the player
-                            'roundNum': pick.round_num,       # Integer round number
-                            'roundPick': pick.round_pick,     # Integer pick number within the round
-                            'bidAmount': pick.bid_amount,     # Integer bid amount (for auction drafts)
-                            'keeperStatus': pick.keeper_status, # Boolean keeper status
-                            'nominating_team_id': nominating_team_id 
-                        }
-                        picks_to_upsert.append(pick_info)
-
-                        # Process in batches
-                        if len(picks_to_upsert) >= batch_size:
-                            bulk_upsert_picks(picks_to_upsert)
-                            picks_to_upsert = []
-
-                except Exception as e:
-                    print(f"Error processing league {league.league_id} for year {league.year}: {e}")
-                    continue
-
-            # Process any remaining draft picks
-            if picks_to_upsert:
-                bulk_upsert_picks(picks_to_upsert)
-
-    except Exception as e:
-        print(f"A critical error occurred: {e}")
-        raise
-
-
-
-def bulk_upsert_matchups(matchup_data):
+    Returns the years that could not be loaded.
     """
-    Perform bulk upsert operation for picks using the unique constraint.
-    """
-    with get_db_session() as db:
-        stmt = insert(Matchup).values(matchup_data)
-        stmt = stmt.on_conflict_do_update(
-            constraint='uix_matchup',  # Use the unique constraint instead
-            set_={
-                'homeScore': stmt.excluded.homeScore,
-                'awayScore': stmt.excluded.awayScore,
-                'isPlayoff': stmt.excluded.isPlayoff,
-                'matchupType': stmt.excluded.matchupType
-            }
-        )
-        try:
-            db.execute(stmt)
-            db.commit()
-            print(f"Successfully upserted {len(matchup_data)} matchups")
-        except Exception as e:
-            db.rollback()
-            print(f"Error during bulk upsert: {e}")
-            raise
-
+    return populate_stage("owners", leagues)
 
-def bulk_upsert_picks(pick_data):
+def fetch_and_populate_team_owners_from_leagues(leagues: list[League]):
     """
-    Perform bulk upsert operation for picks using the unique constraint.
-    """
-    with get_db_session() as db:
-        stmt = insert(Draft).values(pick_data)
-        stmt = stmt.on_conflict_do_update(
-            constraint='uix_draft_pick',  # Use the unique constraint instead
-            set_={
-                'overallPick': stmt.excluded.overallPick,
-                'roundNum': stmt.excluded.roundNum,          # Integer round number
-                'roundPick': stmt.excluded.roundPick,        # Integer pick number within the round
-                'bidAmount': stmt.excluded.bidAmount,        # Integer bid amount (for auction drafts)
-                'keeperStatus': stmt.excluded.keeperStatus,  # Boolean keeper status
-                'nominating_team_id': stmt.excluded.nominating_team_id
-            }
-        )
-        try:
-            db.execute(stmt)
-            db.commit()
-            print(f"Successfully upserted {len(pick_data)} draft picks")
-        except Exception as e:
-            db.rollback()
-            print(f"Error during bulk upsert: {e}")
-            raise
+    Link each team to its owners; run after the teams and owners stages.
 
-def bulk_upsert_roster(roster_data):
+    Returns the years that could not be loaded.
     """
-    Perform bulk upsert operation for picks using the unique constraint.
-    """
-    with get_db_session() as db:
-        stmt = insert(Roster).values(roster_data)
-        stmt = stmt.on_conflict_do_update(
-            constraint='uix_roster_team_player',  # Use the unique constraint instead
-            set_={
-                'rosterSlot': stmt.excluded.rosterSlot,
-            }
-        )
-        try:
-            db.execute(stmt)
-            db.commit()
-            print(f"Successfully upserted {len(roster_data)} roster entries")
-        except Exception as e:
-            db.rollback()
-            print(f"Error during bulk upsert: {e}")
-            raise
+    return populate_stage("team_owners", leagues)
 
-def bulk_upsert_leagues(leagues_data):
+def fetch_and_populate_draft_from_leagues(leagues: list[League]):
     """
-    Perform bulk upsert operation for leagues using the unique constraint.
+    Fetch and populate draft pick data from a list of leagues.
+    
+    Uses batch processing for better performance.
+    Returns the years that could not be loaded.
     """
-    with get_db_session() as db:
-        stmt = insert(FFleague).values(leagues_data)
-        stmt = stmt.on_conflict_do_update(
-            constraint='uix_league_year',  # Use the unique constraint instead
-            set_={
-                'teamCount': stmt.excluded.teamCount,
-                'currentWeek': stmt.excluded.currentWeek,
-                'nflWeek': stmt.excluded.nflWeek
-            }
-        )
-        try:
-            db.execute(stmt)
-            db.commit()
-            print(f"Successfully upserted {len(leagues_data)} leagues")
-        except Exception as e:
-            db.rollback()
-            print(f"Error during bulk upsert: {e}")
-            raise
+    return populate_stage("draft", leagues)
 
-def bulk_upsert_settings(setting_data):
-    """
-    Perform bulk upsert operation for leagues using the unique constraint.
+def fetch_and_populate_team_logos_from_leagues(leagues: list[League]):
     """
-    with get_db_session() as db:
-        stmt = insert(Settings).values(setting_data)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=['league_id'],  # Use the unique constraint instead
-            set_={
-                'regularSeasonCount': stmt.excluded.regularSeasonCount,
-                'vetoVotesRequired': stmt.excluded.vetoVotesRequired,
-                'teamCount': stmt.excluded.teamCount,
-                'playoffTeamCount': stmt.excluded.playoffTeamCount,
-                'keeperCount': stmt.excluded.keeperCount,
-                'tradeDeadline': stmt.excluded.tradeDeadline,
-                'name': stmt.excluded.name,
-                'tieRule': stmt.excluded.tieRule,
-                'playoffTieRule': stmt.excluded.playoffTieRule,
-                'playoffSeedTieRule': stmt.excluded.playoffSeedTieRule,
-                'playoffMatchupPeriodLength': stmt.excluded.playoffMatchupPeriodLength,
-                'faab': stmt.excluded.faab,
-            }
-        )
-        try:
-            db.execute(stmt)
-            db.commit()
-            print(f"Successfully upserted {len(setting_data)} league settings")
-        except Exception as e:
-            db.rollback()
-            print(f"Error during bulk upsert: {e}")
-            raise
+    Download every distinct team logo of the given seasons into the logo archive.
 
-def bulk_upsert_players(player_data):
+    Unchanged logos are skipped with conditional requests.
+    Returns the years with a logo that could not be fetched.
     """
-    Perform bulk upsert operation for players using the unique constraint.
-    """
-    with get_db_session() as db:
-        stmt = insert(Player).values(player_data)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=['espnId'],
-            set_={
-                'position': stmt.excluded.position,
-                'name': stmt.excluded.name,
-            }
-        )
-        try:
-            db.execute(stmt)
-            db.commit()
-            print(f"Successfully upserted {len(player_data)} players")
-        except Exception as e:
-            db.rollback()
-            print(f"Error during bulk upsert: {e}")
-            raise
+    return archive_team_logos(leagues)
 
 
 def fetch_and_populate_league(start_year, end_year):
@@ -653,11 +515,11 @@ def fetch_and_populate_league(start_year, end_year):
     try:
         for year in range(start_year, end_year + 1):
             try:
-                league = League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
+                league = _league_for_year(year)
                 scoreboard = league.scoreboard(1)  # Test to check scoreboard functionality
                 
                 league_data = {
-                    'leagueId': LEAGUE_ID,
+                    'leagueId': get_env("LEAGUE_ID"),
                     'teamCount': len(league.teams),
                     'year': league.year,
                     'currentWeek': league.current_week,
@@ -667,19 +529,19 @@ def fetch_and_populate_league(start_year, end_year):
                 
                 # Process in batches
                 if len(leagues_to_upsert) >= batch_size:
-                    bulk_upsert_leagues(leagues_to_upsert)
+                    bulk_upsert(FFleague, leagues_to_upsert)
                     leagues_to_upsert = []
                     
             except Exception as e:
-                print(f"Error processing year {year}: {e}")
+                logger.error(f"Error processing year {year}: {e}")
                 continue
                 
         # Process any remaining leagues
         if leagues_to_upsert:
-            bulk_upsert_leagues(leagues_to_upsert)
+            bulk_upsert(FFleague, leagues_to_upsert)
             
     except Exception as e:
-        print(f"A critical error occurred: {e}")
+        logger.error(f"A critical error occurred: {e}")
         raise
 
 def fetch_and_populate_settings(start_year, end_year):
@@ -696,14 +558,14 @@ def fetch_and_populate_settings(start_year, end_year):
                 try:
                 # First, get the league_id from the leagues table
                     league_record = db.query(FFleague).filter(
-                        FFleague.leagueId == LEAGUE_ID,
+                        FFleague.leagueId == get_env("LEAGUE_ID"),
                         FFleague.year == year
                     ).first()
                     
                     if not league_record:
-                        print(f"League record not found for year {year}")
+                        logger.warning(f"League record not found for year {year}")
                         continue
-                    league = League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
+                    league = _league_for_year(year)
                     settings = league.settings
                     
                     league_settings = {
@@ -725,19 +587,19 @@ def fetch_and_populate_settings(start_year, end_year):
                     
                     # Process in batches
                     if len(settings_to_upsert) >= batch_size:
-                        bulk_upsert_settings(settings_to_upsert)
+                        bulk_upsert(Settings, settings_to_upsert)
                         settings_to_upsert = []
                         
                 except Exception as e:
-                    print(f"Error processing year {year}: {e}")
+                    logger.error(f"Error processing year {year}: {e}")
                     continue
                     
             # Process any remaining leagues
             if settings_to_upsert:
-                bulk_upsert_settings(settings_to_upsert)
+                bulk_upsert(Settings, settings_to_upsert)
             
     except Exception as e:
-        print(f"A critical error occurred: {e}")
+        logger.error(f"A critical error occurred: {e}")
         raise
 
 def fetch_and_populate_players(start_year, end_year):
@@ -750,7 +612,7 @@ def fetch_and_populate_players(start_year, end_year):
     try:
         for year in range(start_year, end_year + 1):
             try:
-                league = League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
+                league = _league_for_year(year)
                 player_map = league.player_map
                 
                 for espnId, name in player_map.items():
@@ -765,19 +627,19 @@ def fetch_and_populate_players(start_year, end_year):
                 
                 # Process in batches
                 if len(players_to_upsert) >= batch_size:
-                    bulk_upsert_players(players_to_upsert)
+                    bulk_upsert(Player, players_to_upsert)
                     players_to_upsert = []
                     
             except Exception as e:
-                print(f"Error processing year {year}: {e}")
+                logger.error(f"Error processing year {year}: {e}")
                 continue
                 
         # Process any remaining leagues
         if players_to_upsert:
-            bulk_upsert_players(players_to_upsert)
+            bulk_upsert(Player, players_to_upsert)
             
     except Exception as e:
-        print(f"A critical error occurred: {e}")
+        logger.error(f"A critical error occurred: {e}")
         raise
 
 def fetch_and_populate_teams(start_year, end_year):
@@ -794,15 +656,15 @@ def fetch_and_populate_teams(start_year, end_year):
                 try:
                     # First, get the league_id from the leagues table
                     league_record = db.query(FFleague).filter(
-                        FFleague.leagueId == LEAGUE_ID,
+                        FFleague.leagueId == get_env("LEAGUE_ID"),
                         FFleague.year == year
                     ).first()
                     
                     if not league_record:
-                        print(f"League record not found for year {year}")
+                        logger.warning(f"League record not found for year {year}")
                         continue
                         
-                    league = League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
+                    league = _league_for_year(year)
                     scoreboard = league.scoreboard(1)
                     roster = league.teams[0].roster
                     
@@ -844,64 +706,21 @@ def fetch_and_populate_teams(start_year, end_year):
                         
                         # Process in batches
                         if len(teams_to_upsert) >= batch_size:
-                            bulk_upsert_teams(teams_to_upsert)
+                            bulk_upsert(Team, teams_to_upsert)
                             teams_to_upsert = []
                             
                 except Exception as e:
-                    print(f"Error processing year {year}: {e}")
+                    logger.error(f"Error processing year {year}: {e}")
                     continue
                     
             # Process any remaining teams
             if teams_to_upsert:
-                bulk_upsert_teams(teams_to_upsert)
+                bulk_upsert(Team, teams_to_upsert)
                 
     except Exception as e:
-        print(f"A critical error occurred: {e}")
+        logger.error(f"A critical error occurred: {e}")
         raise
 
-def bulk_upsert_teams(teams_data):
-    """
-    Perform bulk upsert operation for teams using the unique constraint.
-    """
-    with get_db_session() as db:
-        stmt = insert(Team).values(teams_data)
-        stmt = stmt.on_conflict_do_update(
-            constraint='uix_team_year',
-            set_={
-                'league_id': stmt.excluded.league_id,
-                'teamAbbrv': stmt.excluded.teamAbbrv,
-                'teamName': stmt.excluded.teamName,
-                'divisionId': stmt.excluded.divisionId,
-                'divisionName': stmt.excluded.divisionName,
-                'owners': stmt.excluded.owners,
-                'wins': stmt.excluded.wins,
-                'losses': stmt.excluded.losses,
-                'ties': stmt.excluded.ties,
-                'pointsFor': stmt.excluded.pointsFor,
-                'pointsAgainst': stmt.excluded.pointsAgainst,
-                'waiverRank': stmt.excluded.waiverRank,
-                'acquisitions': stmt.excluded.acquisitions,
-                'acquisitionBudgetSpent': stmt.excluded.acquisitionBudgetSpent,
-                'drops': stmt.excluded.drops,
-                'trades': stmt.excluded.trades,
-                'streakType': stmt.excluded.streakType,
-                'streakLength': stmt.excluded.streakLength,
-                'standing': stmt.excluded.standing,
-                'finalStanding': stmt.excluded.finalStanding,
-                'draftProjRank': stmt.excluded.draftProjRank,
-                'playoffPct': stmt.excluded.playoffPct,
-                'logoUrl': stmt.excluded.logoUrl
-            }
-        )
-        try:
-            db.execute(stmt)
-            db.commit()
-            print(f"Successfully upserted {len(teams_data)} teams")
-        except Exception as e:
-            db.rollback()
-            print(f"Error during bulk upsert: {e}")
-            raise
-
 def fetch_draft_for_year(year):
     """
     Fetch draft data for a single year and return it.
@@ -911,7 +730,7 @@ def fetch_draft_for_year(year):
 
     try:
         with get_db_session() as db:
-            league = League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
+            league = _league_for_year(year)
             draft = league.draft
             for pick_index, pick in enumerate(draft, 1):
 
@@ -920,10 +739,14 @@ def fetch_draft_for_year(year):
                 #Get the playerId from players table
                 player_id = db.query(Player).filter(Player.espnId == pick.playerId).first().id
                 #Get the team id from teams table
-                team_id = db.query(Team).filter(Team.teamId == pick.team.team_id, Team.year == year).first().id
+                team = db.query(Team).join(FFleague, Team.league_id == FFleague.id).filter(
+                    FFleague.leagueId == int(league.league_id), Team.teamId == pick.team.team_id, Team.year == year
+                ).first()
                 # Create a dictionary to store pick information
                 pick_info = {
-                        'team_id': team_id,
+                        'year': year,
+                        'league_id': team.league_id,
+                        'team_id': team.id,
                         'overallPick': pick_index,
                         'player_id': player_id,           # Integer ID of the player
                         'roundNum': pick.round_num,          # Integer round number
@@ -935,7 +758,7 @@ def fetch_draft_for_year(year):
                 picks_to_upsert.append(pick_info)
 
     except Exception as e:
-        print(f"Error processing year {year}: {e}")
+        logger.error(f"Error processing year {year}: {e}")
     
     return picks_to_upsert
 
@@ -946,7 +769,7 @@ def fetch_players_for_year(year):
     """
     players_to_upsert = []
     try:
-        league = League(LEAGUE_ID, year=year, swid=SWID, espn_s2=ESPN_S2)
+        league = _league_for_year(year)
         player_map = league.player_map
         
         for espnId, name in player_map.items():
@@ -959,7 +782,7 @@ def fetch_players_for_year(year):
             players_to_upsert.append(player_data)
         
     except Exception as e:
-        print(f"Error processing year {year}: {e}")
+        logger.error(f"Error processing year {year}: {e}")
     
     return players_to_upsert
 
@@ -985,15 +808,15 @@ def fetch_and_populate_players_concurrent(start_year, end_year):
                 # Process in batches
                 while len(players_to_upsert) >= batch_size:
                     batch = [players_to_upsert.popleft() for _ in range(batch_size)]
-                    bulk_upsert_players(batch)
+                    bulk_upsert(Player, batch)
 
             except Exception as e:
-                print(f"Error fetching players for year {year}: {e}")
+                logger.error(f"Error fetching players for year {year}: {e}")
         
         # Process any remaining players
         while players_to_upsert:
             batch = [players_to_upsert.popleft() for _ in range(min(batch_size, len(players_to_upsert)))]
-            bulk_upsert_players(batch)
+            bulk_upsert(Player, batch)
 
 def fetch_and_populate_draft_concurrent(start_year, end_year):
     """
@@ -1002,7 +825,8 @@ def fetch_and_populate_draft_concurrent(start_year, end_year):
     batch_size = 1000
     picks_to_upsert = deque()  # Use deque for thread-safe appending and popping
     results = []
-    
+
+    ensure_partitions(Draft, range(start_year, end_year + 1))
     # Initialize ThreadPoolExecutor with a suitable number of workers
     with ThreadPoolExecutor(max_workers=10) as executor:
         # Submit tasks for each year
@@ -1017,13 +841,13 @@ def fetch_and_populate_draft_concurrent(start_year, end_year):
                 # Process in batches
                 while len(picks_to_upsert) >= batch_size:
                     batch = [picks_to_upsert.popleft() for _ in range(batch_size)]
-                    bulk_upsert_picks(batch)
+                    bulk_upsert(Draft, batch)
 
             except Exception as e:
-                print(f"Error fetching players for year {year}: {e}")
+                logger.error(f"Error fetching players for year {year}: {e}")
         
         # Process any remaining players
         while picks_to_upsert:
             batch = [picks_to_upsert.popleft() for _ in range(min(batch_size, len(picks_to_upsert)))]
-            bulk_upsert_picks(batch)
+            bulk_upsert(Draft, batch)
             
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+Cheap freshness probe for cached seasons.
+
+Constructing a League costs several ESPN requests, one of them the full
+pro player list. The probe is a single request for the league's status and
+matchup scores (views mStatus and mMatchupScore), hashed into a signature
+that is saved with the cached season. A cached season is refetched only
+when the signature changes:
+
+    closed season       unchanged signature: cache hit, whatever its age
+    season in progress  unchanged signature: cache hit until CACHE_MAX_AGE_DAYS,
+                        as roster moves alone do not change the signature
+    probe failed        CACHE_MAX_AGE_DAYS decides, as before
+
+Cache entries saved before probes existed have no signature and also fall
+back to CACHE_MAX_AGE_DAYS until they are refetched.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROBE_VIEWS = ['mStatus', 'mMatchupScore']
+
+# Status fields that move whenever ESPN processes the season
+STATUS_FIELDS = ('currentMatchupPeriod', 'firstScoringPeriod', 'finalScoringPeriod',
+                 'latestScoringPeriod', 'isActive', 'isExpired', 'transactionScoringPeriod')
+
+
+@dataclass(frozen=True)
+class Probe:
+    signature: str
+    in_progress: bool
+
+
+def probe_signature(data: dict) -> Probe:
+    """Hash the status and matchup scores of a probe response."""
+    status = data.get('status', {})
+    scores = sorted(
+        (matchup.get('id'), matchup.get('home', {}).get('totalPoints'), matchup.get('away', {}).get('totalPoints'))
+        for matchup in data.get('schedule', [])
+    )
+    content = (data.get('scoringPeriodId'), tuple(status.get(field) for field in STATUS_FIELDS), tuple(scores))
+    # A season is closed once ESPN marks it inactive; treat a missing flag as in progress
+    return Probe(hashlib.sha256(repr(content).encode()).hexdigest(), status.get('isActive', True) is not False)
+
+
+def probe_season(year: int, league_id, espn_s2: str, swid: str) -> Optional[Probe]:
+    """
+    Request the minimal view of a season and return its probe, or None if the request failed.
+
+    Args:
+        year: Season to probe
+        league_id: ESPN League ID
+        espn_s2: ESPN S2 cookie
+        swid: ESPN SWID cookie
+    """
+    from espn_api.requests.espn_requests import EspnFantasyRequests
+
+    try:
+        requests = EspnFantasyRequests(sport='nfl', year=year, league_id=int(league_id),
+                                       cookies={'espn_s2': espn_s2, 'SWID': swid})
+        return probe_signature(requests.league_get(params={'view': PROBE_VIEWS}))
+    except Exception as e:
+        logger.warning(f"Freshness probe failed for {year}: {e}", extra={"year": year})
+        return None
+
+
+def cache_is_current(entry: dict, probe: Optional[Probe], max_age_days: float) -> bool:
+    """
+    Whether a cached season can be used instead of refetching it.
+
+    Args:
+        entry: Cached shelf entry, with 'cached_at' and the 'probe' signature saved with it
+        probe: Probe of the season taken now, None if probing failed or is disabled
+        max_age_days: CACHE_MAX_AGE_DAYS
+
+    Returns:
+        True if the cached season is current
+    """
+    young = (datetime.now() - entry['cached_at']).total_seconds() < max_age_days * 86400
+    if probe is None or entry.get('probe') is None:
+        return young
+    if probe.signature != entry['probe']:
+        return False
+    return young or not probe.in_progress
@@ -0,0 +1,261 @@
+"""
+Team logo archiving.
+
+Team.logoUrl only points at an image, and ESPN (or whoever hosts a custom
+logo) may delete it at any time. The team_logos stage downloads every
+distinct logo URL of the loaded seasons and keeps the image itself:
+
+    LOGO_DIR/ab/ab12...ef.png     one file per distinct content (SHA-256),
+                                  so a logo shared by many seasons or URLs
+                                  is stored once
+    team_logos table              per URL: content hash and type, the
+                                  response's ETag / Last-Modified and the
+                                  status of the last check
+
+Downloads run on an asyncio event loop, at most LOGO_WORKERS (default 8)
+at a time, each request in a worker thread with its own keep-alive
+session. On later runs every URL whose file is still on disk is requested
+conditionally (If-None-Match / If-Modified-Since), so an unchanged logo
+costs a 304 and no transfer. A logo that is gone (404 and other client
+errors) is recorded with its status and keeps the file archived before.
+Server errors, timeouts and throttling (408, 429) fail the season instead,
+so the stage is retried and the logo is not recorded as gone.
+
+Any http(s) URL works, so the stage can be exercised against a local HTTP
+server, see benchmarks/logo_archive.py.
+"""
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from app.config import get_env
+from app.db.models import TeamLogo
+from app.db.session import get_engine
+from app.db.upsert import bulk_upsert
+from app.services.season import season_of
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOGO_DIR = "./logos"
+REQUEST_TIMEOUT_SECONDS = 20
+# Client errors that say "not now" rather than "gone": request timeout, too many requests
+TRANSIENT_STATUSES = {408, 429}
+
+_sessions = threading.local()
+# Serializes the check and rename in store_logo, so one content is added once
+_store_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class KnownLogo:
+    """What an earlier run stored for a logo URL."""
+    sha256: Optional[str]
+    content_type: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+@dataclass(frozen=True)
+class LogoResult:
+    url: str
+    status: Optional[int] = None  # HTTP status; None if the request failed
+    sha256: Optional[str] = None
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    new_file: bool = False  # True if this download added a file to the logo directory
+    error: Optional[str] = None
+
+
+def logo_dir() -> str:
+    return get_env("LOGO_DIR", DEFAULT_LOGO_DIR)
+
+
+def logo_path(sha256: str, content_type: Optional[str], directory: Optional[str] = None) -> str:
+    """Where the logo with this content hash is stored, named after its hash and type."""
+    extension = (mimetypes.guess_extension(content_type) if content_type else None) or ""
+    return os.path.join(directory or logo_dir(), sha256[:2], sha256 + extension)
+
+
+def store_logo(content: bytes, sha256: str, content_type: Optional[str], directory: Optional[str] = None) -> bool:
+    """Write a logo under its content hash unless it is stored already; returns True if a file was added."""
+    path = logo_path(sha256, content_type, directory)
+    if os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write and rename, so concurrent workers never see a partial file
+    fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".partial")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    with _store_lock:
+        # Another worker may have stored the same content under another URL meanwhile
+        if os.path.exists(path):
+            os.remove(partial)
+            return False
+        os.replace(partial, path)
+    return True
+
+
+def _session():
+    """A requests session per worker thread, so connections to the same host are reused."""
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        import requests
+
+        session = _sessions.session = requests.Session()
+    return session
+
+
+def fetch_logo(url: str, known: Optional[KnownLogo] = None, directory: Optional[str] = None,
+               timeout: float = REQUEST_TIMEOUT_SECONDS) -> LogoResult:
+    """
+    Download one logo, conditionally if it is archived already, and store it under its content hash.
+
+    Args:
+        url: Logo URL
+        known: What an earlier run stored for the URL, if anything
+        directory: Logo directory (default: LOGO_DIR)
+        timeout: Request timeout in seconds
+
+    Returns:
+        The result; raises for server errors, throttling and failed requests
+    """
+    headers = {}
+    if known is not None and known.sha256 and os.path.exists(logo_path(known.sha256, known.content_type, directory)):
+        if known.etag:
+            headers["If-None-Match"] = known.etag
+        if known.last_modified:
+            headers["If-Modified-Since"] = known.last_modified
+
+    response = _session().get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and headers:
+        return LogoResult(url, 304, known.sha256, known.content_type)
+    if response.status_code >= 500 or response.status_code in TRANSIENT_STATUSES:
+        response.raise_for_status()
+    if response.status_code != 200:
+        # Gone or refused: record it, there is nothing to retry
+        return LogoResult(url, response.status_code)
+
+    content = response.content
+    sha256 = hashlib.sha256(content).hexdigest()
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip() or None
+    return LogoResult(
+        url, 200, sha256, content_type, len(content),
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        new_file=store_logo(content, sha256, content_type, directory),
+    )
+
+
+async def _fetch_all(urls: List[str], known: Dict[str, KnownLogo], workers: int,
+                     directory: Optional[str]) -> List[LogoResult]:
+    # Size the thread pool to the limit, the default executor may be smaller
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers))
+    limit = asyncio.Semaphore(workers)
+
+    async def fetch(url: str) -> LogoResult:
+        async with limit:
+            try:
+                return await asyncio.to_thread(fetch_logo, url, known.get(url), directory)
+            except Exception as e:
+                return LogoResult(url, error=str(e))
+
+    return await asyncio.gather(*(fetch(url) for url in urls))
+
+
+def archive_logos(urls: Iterable[str], known: Optional[Dict[str, KnownLogo]] = None,
+                  workers: Optional[int] = None, directory: Optional[str] = None) -> List[LogoResult]:
+    """
+    Download logos concurrently into the content-addressed logo directory.
+
+    Args:
+        urls: Logo URLs, each is requested once
+        known: {url: what an earlier run stored}, for conditional requests
+        workers: Requests in flight at most (default: LOGO_WORKERS, 8)
+        directory: Logo directory (default: LOGO_DIR)
+
+    Returns:
+        One result per distinct URL
+    """
+    urls = sorted(set(urls))
+    if not urls:
+        return []
+    workers = workers or int(get_env("LOGO_WORKERS", "8"))
+    return asyncio.run(_fetch_all(urls, known or {}, workers, directory))
+
+
+def _is_http(url: Optional[str]) -> bool:
+    return bool(url) and url.startswith(("http://", "https://"))
+
+
+def _known_logos(urls: List[str]) -> Dict[str, KnownLogo]:
+    """What earlier runs stored for these URLs, from the team_logos table."""
+    known = {}
+    with get_engine().connect() as conn:
+        # Chunked to stay far below any bind parameter limit
+        for start in range(0, len(urls), 500):
+            rows = conn.execute(
+                select(TeamLogo.url, TeamLogo.sha256, TeamLogo.contentType, TeamLogo.etag, TeamLogo.lastModified)
+                .where(TeamLogo.url.in_(urls[start:start + 500]))
+            )
+            for url, sha256, content_type, etag, last_modified in rows:
+                known[url] = KnownLogo(sha256, content_type, etag, last_modified)
+    return known
+
+
+def archive_team_logos(leagues) -> List[int]:
+    """
+    Archive the logo of every team in the given seasons and record them in team_logos.
+
+    Returns:
+        The years with a logo that could not be fetched, to be retried
+    """
+    urls_by_year = {
+        league.year: {team.logo_url for team in season_of(league).teams if _is_http(team.logo_url)}
+        for league in leagues
+    }
+    urls = sorted(set().union(*urls_by_year.values()))
+    if not urls:
+        return []
+
+    started = time.perf_counter()
+    results = archive_logos(urls, _known_logos(urls))
+    checked_at = datetime.now()
+
+    downloaded = [
+        {'url': r.url, 'sha256': r.sha256, 'contentType': r.content_type, 'size': r.size, 'etag': r.etag,
+         'lastModified': r.last_modified, 'status': r.status, 'checkedAt': checked_at}
+        for r in results if r.status == 200
+    ]
+    # Unchanged and gone logos keep the hash and validators of their last download
+    checked = [
+        {'url': r.url, 'status': r.status, 'checkedAt': checked_at}
+        for r in results if r.status is not None and r.status != 200
+    ]
+    bulk_upsert(TeamLogo, downloaded)
+    bulk_upsert(TeamLogo, checked)
+
+    failed = {r.url for r in results if r.error is not None}
+    for r in results:
+        if r.error is not None:
+            logger.warning(f"Could not fetch logo {r.url}: {r.error}")
+    logger.info(
+        f"Checked {len(results)} logos in {time.perf_counter() - started:.1f}s: "
+        f"{len(downloaded)} downloaded ({sum(r.new_file for r in results)} new files), "
+        f"{sum(r.status == 304 for r in results)} unchanged, "
+        f"{sum(r.status not in (None, 200, 304) for r in results)} gone, {len(failed)} failed",
+        extra={"stage": "team_logos", "logos": len(results), "failed": len(failed)},
+    )
+    return sorted(year for year, year_urls in urls_by_year.items() if year_urls & failed)
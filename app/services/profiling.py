@@ -0,0 +1,174 @@
+"""
+Per-stage profiling for --profile.
+
+Each selected stage is run under a profiler and tracemalloc, so a slow run
+shows where its time and memory go: ESPN requests and unpickling in
+"fetch", Python transforms and database writes in the load stages, SQL in
+"summaries". Everything is written to a run directory under PROFILE_DIR
+(default ./profiles):
+
+    <stage>.prof          cProfile stats (python -m pstats, snakeviz, ...)
+    <stage>.sampled.html  with --profile-sampler: pyinstrument's sampling
+                          profile of the stage's latest run, instead of cProfile
+    summary.txt           per stage: wall time, peak traced memory, the
+                          PROFILE_TOP (default 20) functions by own time (the
+                          sampled call tree with --profile-sampler) and the
+                          top allocation sites still held at the end
+                          (freed small tuples and dicts parked on the
+                          interpreter's free lists count as held)
+
+Files are rewritten every time a stage finishes, so a stage that runs more
+than once (daemon cycles, worker seasons) accumulates into the same files and
+an interrupted run still leaves them behind. cProfile only sees the thread
+that runs the stage: work in the box score and fetch thread pools shows up
+as time waiting on them. The sampler is an alternative rather than an
+addition, as both hook into the interpreter's profile function; it adds far
+less overhead per call than cProfile. Profiling slows a run down
+considerably, mostly because of tracemalloc; compare stages with each other,
+not with unprofiled runs.
+
+Stages that are not selected run unchanged: the pipeline only enters a
+nullcontext for them.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional
+
+from app.config import get_env
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = "./profiles"
+
+# Pipeline steps around the load stages that can be profiled as well
+FETCH_STAGE = "fetch"
+SUMMARIES_STAGE = "summaries"
+
+# Frames kept per allocation; one is enough to name the allocating line
+TRACEMALLOC_FRAMES = 1
+
+
+@dataclass
+class StageProfile:
+    """Everything recorded for one stage, over every time it ran."""
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+    sampler: Optional[object] = None
+    runs: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    allocations: List[str] = field(default_factory=list)
+
+
+def profile_stages(stage_names: Iterable[str]) -> List[str]:
+    """Every stage --profile accepts, in pipeline order."""
+    return [FETCH_STAGE, *stage_names, SUMMARIES_STAGE]
+
+
+class StageProfiler:
+    """
+    Profile selected pipeline stages into a run directory.
+
+    Args:
+        stages: Stages to profile
+        run_dir: Directory for the profile files (default: a new timestamped directory under PROFILE_DIR)
+        sampler: Profile with pyinstrument's sampling profiler instead of cProfile, if it is installed
+        top: Number of hotspots per stage in summary.txt (default: PROFILE_TOP)
+    """
+
+    def __init__(self, stages: Iterable[str], run_dir: Optional[str] = None, sampler: bool = False,
+                 top: Optional[int] = None):
+        self.stages = set(stages)
+        self.run_dir = run_dir or os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%dT%H%M%S}")
+        self.top = top or int(get_env("PROFILE_TOP", "20"))
+        self.sampler_class = _sampler_class() if sampler else None
+        self.results: Dict[str, StageProfile] = {}
+        os.makedirs(self.run_dir, exist_ok=True)
+        logger.info(f"Profiling {', '.join(sorted(self.stages))} into {self.run_dir}")
+
+    def stage(self, name: str) -> ContextManager[None]:
+        """Context for running one stage: profiled if selected, a no-op otherwise."""
+        return self._profiled(name) if name in self.stages else nullcontext()
+
+    @contextmanager
+    def _profiled(self, name: str) -> Iterator[None]:
+        result = self.results.setdefault(name, StageProfile())
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        sampler = self.sampler_class() if self.sampler_class else None
+
+        started = time.perf_counter()
+        if sampler is not None:
+            sampler.start()
+        else:
+            result.profile.enable()
+        try:
+            yield
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            else:
+                result.profile.disable()
+            result.seconds += time.perf_counter() - started
+            result.runs += 1
+            result.peak_bytes = max(result.peak_bytes, tracemalloc.get_traced_memory()[1] - baseline)
+            # Only the top sites are kept, a whole snapshot holds every traced block
+            result.allocations = [
+                f"{stat.size / 1024:10.1f} KiB {stat.count:>9} blocks  {stat.traceback}"
+                for stat in tracemalloc.take_snapshot().statistics("lineno")[:self.top]
+            ]
+            if not tracing:
+                tracemalloc.stop()
+            result.sampler = sampler or result.sampler
+            self._write(name, result)
+
+    def _write(self, name: str, result: StageProfile) -> None:
+        """Write a stage's profile files and rewrite the summary."""
+        try:
+            if result.sampler is not None:
+                with open(os.path.join(self.run_dir, f"{name}.sampled.html"), "w", encoding="utf-8") as f:
+                    f.write(result.sampler.output_html())
+            else:
+                result.profile.dump_stats(os.path.join(self.run_dir, f"{name}.prof"))
+            with open(os.path.join(self.run_dir, "summary.txt"), "w", encoding="utf-8") as f:
+                f.write(self.summary())
+        except Exception as e:
+            # Profiling must never fail the run it observes
+            logger.warning(f"Could not write the {name} profile to {self.run_dir}: {e}")
+
+    def summary(self) -> str:
+        """Hotspot summary of every stage profiled so far, in the order they first ran."""
+        out = io.StringIO()
+        for name, result in self.results.items():
+            out.write(f"=== {name}: {result.runs} run(s), {result.seconds:.2f}s, "
+                      f"peak {result.peak_bytes / 1024 / 1024:.1f} MiB traced\n\n")
+            if result.sampler is not None:
+                out.write(result.sampler.output_text(unicode=False, color=False))
+            else:
+                stats = pstats.Stats(result.profile, stream=out)
+                stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+            if result.allocations:
+                out.write("Top allocation sites held at the end of the stage's latest run:\n")
+                out.writelines(f"  {line}\n" for line in result.allocations)
+            out.write("\n")
+        return out.getvalue()
+
+
+def _sampler_class():
+    """pyinstrument's Profiler, or None with a warning if it is not installed."""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logger.warning("pyinstrument is not installed, profiling with cProfile instead (pip install pyinstrument)")
+        return None
+    return Profiler
@@ -0,0 +1,98 @@
+"""
+Freshness-prioritized refresh schedule for the resident --daemon mode.
+
+A season that is in progress changes every week and is refreshed every
+IN_SEASON_REFRESH_MINUTES (default 60); a closed season hardly ever changes
+and is refreshed every CLOSED_SEASON_REFRESH_DAYS (default 30). A season is
+due once its last refresh is older than its interval, and due seasons are
+ordered so that:
+
+    1. seasons in progress come first, so a backfill never delays them
+    2. the rest follow by staleness (age / interval), most stale first;
+       seasons never refreshed are infinitely stale
+
+The daemon stops starting new seasons once a cycle has used its time budget
+(DAEMON_CYCLE_BUDGET_MINUTES, default 15). Seasons left over are still the
+most stale next cycle, so a long backfill is worked off a budget at a time
+while the current season keeps its interval.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from app.config import get_env
+
+# Drafts happen in August and fantasy playoffs end in early January
+SEASON_OPENS_MONTH = 8
+SEASON_CLOSES_MONTH = 1
+
+
+@dataclass(frozen=True)
+class Schedule:
+    in_season: timedelta
+    closed_season: timedelta
+    cycle_budget: timedelta
+
+    @classmethod
+    def from_env(cls) -> "Schedule":
+        return cls(
+            in_season=timedelta(minutes=float(get_env("IN_SEASON_REFRESH_MINUTES", "60"))),
+            closed_season=timedelta(days=float(get_env("CLOSED_SEASON_REFRESH_DAYS", "30"))),
+            cycle_budget=timedelta(minutes=float(get_env("DAEMON_CYCLE_BUDGET_MINUTES", "15"))),
+        )
+
+    def interval(self, year: int, now: datetime) -> timedelta:
+        return self.in_season if season_in_progress(year, now) else self.closed_season
+
+
+def season_in_progress(year: int, now: datetime) -> bool:
+    """Whether a season runs at the given time: from its draft month through January of the next year."""
+    if now.year == year:
+        return now.month >= SEASON_OPENS_MONTH
+    return now.year == year + 1 and now.month <= SEASON_CLOSES_MONTH
+
+
+def season_closed(year: int, now: datetime) -> bool:
+    """Whether a season is over at the given time: from February of the next year on."""
+    return (now.year, now.month) > (year + 1, SEASON_CLOSES_MONTH)
+
+
+def staleness(year: int, last_refreshed: Dict[int, datetime], schedule: Schedule, now: datetime) -> float:
+    """A season's age as a multiple of its refresh interval; 1.0 or more means due."""
+    refreshed_at = last_refreshed.get(year)
+    if refreshed_at is None:
+        return float("inf")
+    return (now - refreshed_at) / schedule.interval(year, now)
+
+
+def due_seasons(years: Iterable[int], last_refreshed: Dict[int, datetime], schedule: Schedule,
+                now: Optional[datetime] = None) -> List[int]:
+    """
+    Seasons due for a refresh, in the order they should be refreshed.
+
+    Args:
+        years: Seasons to consider
+        last_refreshed: {year: time of the last refresh} for seasons refreshed before
+        schedule: Refresh intervals
+        now: Time to schedule for (default: now)
+
+    Returns:
+        Due seasons: in progress first, then most stale first
+    """
+    now = now or datetime.now()
+    due = [year for year in years if staleness(year, last_refreshed, schedule, now) >= 1.0]
+    # Newest first among equally stale seasons, e.g. in a backfill of never-refreshed seasons
+    return sorted(due, key=lambda year: (not season_in_progress(year, now),
+                                         -staleness(year, last_refreshed, schedule, now), -year))
+
+
+def seconds_until_due(years: Iterable[int], last_refreshed: Dict[int, datetime], schedule: Schedule,
+                      now: Optional[datetime] = None) -> float:
+    """Seconds until the next season becomes due: 0 if one already is, infinite for no seasons."""
+    now = now or datetime.now()
+    waits = [
+        (last_refreshed[year] + schedule.interval(year, now) - now).total_seconds()
+        if year in last_refreshed else 0.0
+        for year in years
+    ]
+    return max(0.0, min(waits, default=float("inf")))
@@ -0,0 +1,192 @@
+"""
+Compact season model, built once per fetched season.
+
+espn_api's League keeps Team, Player and Pick objects with everything ESPN
+returned, and some of its accessors go back to ESPN: league.scoreboard(week)
+requests the whole season schedule again on every call. season_of() reads
+what the stage transforms need into plain tuples once and keeps the result
+on the League, so it is pickled into the shelf cache with it and a cached
+season is never walked or requested again.
+
+The weekly box score stages still stream from the League itself, as every
+scoring period is a separate request (see app/services/box_scores.py).
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Attribute the model is kept under on the League it was built from
+_ATTRIBUTE = '_archive_season'
+
+
+class OwnerRecord(NamedTuple):
+    espn_id: str
+    display_name: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+
+
+class TeamRecord(NamedTuple):
+    team_id: int
+    name: str
+    owners: Tuple[OwnerRecord, ...]
+    division_id: str
+    division_name: str
+    wins: int
+    losses: int
+    ties: int
+    points_for: float
+    points_against: float
+    waiver_rank: int
+    acquisitions: int
+    acquisition_budget_spent: int
+    drops: int
+    trades: int
+    streak_type: str
+    streak_length: int
+    standing: int
+    final_standing: int
+    draft_projected_rank: int
+    playoff_pct: float
+    logo_url: str
+
+
+class PickRecord(NamedTuple):
+    team_id: int
+    player_id: int
+    round_num: int
+    round_pick: int
+    bid_amount: int
+    keeper_status: bool
+    nominating_team_id: Optional[int]
+
+
+class MatchupRecord(NamedTuple):
+    week: int
+    home_team_id: Optional[int]
+    away_team_id: Optional[int]
+    home_score: float
+    away_score: float
+    is_playoff: bool
+    matchup_type: str
+
+
+class RosterEntry(NamedTuple):
+    team_id: int
+    player_id: int
+    slot: str
+
+
+class SettingsRecord(NamedTuple):
+    reg_season_count: int
+    veto_votes_required: int
+    team_count: int
+    playoff_team_count: int
+    keeper_count: int
+    trade_deadline: int
+    name: str
+    tie_rule: str
+    playoff_tie_rule: str
+    playoff_seed_tie_rule: str
+    playoff_matchup_period_length: int
+    faab: bool
+
+
+class Season(NamedTuple):
+    league_id: int
+    year: int
+    current_week: int
+    nfl_week: int
+    first_scoring_period: int
+    final_scoring_period: int
+    settings: SettingsRecord
+    teams: Tuple[TeamRecord, ...]
+    players: Dict[int, str]             # ESPN player id -> name
+    picks: Tuple[PickRecord, ...]       # In draft order
+    matchups: Tuple[MatchupRecord, ...]
+    roster: Tuple[RosterEntry, ...]
+
+
+def season_of(league) -> Season:
+    """Return the compact model of a fetched League, building it on first use."""
+    season = getattr(league, _ATTRIBUTE, None)
+    if season is None:
+        season = build_season(league)
+        setattr(league, _ATTRIBUTE, season)
+    return season
+
+
+def build_season(league) -> Season:
+    """Read a fetched League into a Season; requests the season schedule from ESPN once."""
+    settings = league.settings
+    return Season(
+        league_id=league.league_id,
+        year=league.year,
+        current_week=league.current_week,
+        nfl_week=league.nfl_week,
+        first_scoring_period=league.firstScoringPeriod,
+        final_scoring_period=league.finalScoringPeriod,
+        settings=SettingsRecord(
+            settings.reg_season_count, settings.veto_votes_required, settings.team_count,
+            settings.playoff_team_count, settings.keeper_count, settings.trade_deadline, settings.name,
+            settings.tie_rule, settings.playoff_tie_rule, settings.playoff_seed_tie_rule,
+            settings.playoff_matchup_period_length, settings.faab,
+        ),
+        teams=tuple(_team_record(team) for team in league.teams),
+        # player_map also maps names back to ids, only keep the id -> name entries
+        players={espn_id: name for espn_id, name in league.player_map.items() if isinstance(espn_id, int)},
+        picks=tuple(
+            PickRecord(
+                pick.team.team_id, pick.playerId, pick.round_num, pick.round_pick, pick.bid_amount,
+                pick.keeper_status, pick.nominatingTeam.team_id if pick.nominatingTeam is not None else None,
+            )
+            for pick in league.draft
+        ),
+        matchups=_matchup_records(league),
+        roster=tuple(
+            RosterEntry(team.team_id, player.playerId, player.lineupSlot)
+            for team in league.teams for player in team.roster
+        ),
+    )
+
+
+def _team_record(team) -> TeamRecord:
+    return TeamRecord(
+        team.team_id, team.team_name,
+        tuple(
+            OwnerRecord(owner['id'], owner.get('displayName'), owner.get('firstName'), owner.get('lastName'))
+            for owner in team.owners
+        ),
+        team.division_id, team.division_name, team.wins, team.losses, team.ties, team.points_for,
+        team.points_against, team.waiver_rank, team.acquisitions, team.acquisition_budget_spent, team.drops,
+        team.trades, team.streak_type, team.streak_length, team.standing, team.final_standing,
+        team.draft_projected_rank, team.playoff_pct, team.logo_url,
+    )
+
+
+def _matchup_records(league) -> Tuple[MatchupRecord, ...]:
+    """
+    Every matchup of the season from a single schedule request.
+
+    Matches what league.scoreboard(week) returns for each scoring period
+    from the first to the final one, without one request per week.
+    """
+    from espn_api.football.matchup import Matchup
+
+    schedule = league.espn_request.league_get(params={'view': 'mMatchupScore'})['schedule']
+    by_period = {}
+    for data in schedule:
+        by_period.setdefault(data['matchupPeriodId'], []).append(Matchup(data))
+
+    records = []
+    for week in range(league.firstScoringPeriod, league.finalScoringPeriod + 1):
+        for matchup in by_period.get(week, []):
+            records.append(MatchupRecord(
+                week,
+                # Team id 0 marks a bye
+                matchup._home_team_id or None,
+                matchup._away_team_id or None,
+                matchup.home_score,
+                matchup.away_score,
+                matchup.is_playoff,
+                matchup.matchup_type,
+            ))
+    return tuple(records)
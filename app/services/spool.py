@@ -0,0 +1,120 @@
+"""
+Local write-ahead spool for when Postgres is unavailable.
+
+Each (stage, league, season) unit is written as one gzip-compressed segment
+of newline-delimited JSON: a header line naming the stage, season and column
+order, followed by one JSON array per row. Rows use ESPN natural keys (see
+app/services/transform.py), so no database is needed to produce them.
+Segments are written to a temporary name and renamed when complete, so a
+crash never leaves a half-written segment to replay.
+
+Replay loads segments in stage order (leagues before teams before rosters)
+through the normal idempotent upserts, then moves them to spool/replayed.
+"""
+import gzip
+import itertools
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, List, Set, Tuple
+
+from app.services.transform import STAGE_ROWS, STAGE_TRANSFORMS, transform_league
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = "./spool"
+REPLAYED_DIR = os.path.join(SPOOL_DIR, "replayed")
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+STAGE_ORDER = {stage: position for position, stage in enumerate(STAGE_TRANSFORMS)}
+
+
+def write_segment(stage: str, league_id, year: int, rows: Iterable[tuple]) -> str:
+    """Stream one unit's row records into a new segment file and return its path."""
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    rows = iter(rows)
+    first = next(rows, None)
+    columns = list(first._fields) if first is not None else []
+    created = datetime.now()
+    name = f"{STAGE_ORDER[stage]:02d}-{stage}-{league_id}-{year}-{created:%Y%m%dT%H%M%S%f}{SEGMENT_SUFFIX}"
+    path = os.path.join(SPOOL_DIR, name)
+    partial = path + ".part"
+
+    with gzip.open(partial, "wt", encoding="utf-8") as f:
+        header = {"stage": stage, "leagueId": league_id, "year": year, "columns": columns,
+                  "created": created.isoformat()}
+        f.write(json.dumps(header) + "\n")
+        for row in itertools.chain([first] if first is not None else [], rows):
+            f.write(json.dumps(row, separators=(",", ":")) + "\n")
+    os.replace(partial, path)
+    return path
+
+
+def read_segment(path: str) -> Tuple[dict, List[tuple]]:
+    """Read a segment back into its header and its stage's row records."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        columns = header["columns"]
+        record = STAGE_ROWS[header["stage"]]
+        if tuple(columns) == record._fields:
+            rows = [record._make(json.loads(line)) for line in f]
+        else:
+            # Columns in another order, e.g. spooled by an older version
+            rows = [record(**dict(zip(columns, json.loads(line)))) for line in f]
+    return header, rows
+
+
+def pending_segments() -> Iterator[str]:
+    """Complete segments awaiting replay, in stage then season then creation order."""
+    if not os.path.isdir(SPOOL_DIR):
+        return iter(())
+    names = [name for name in os.listdir(SPOOL_DIR) if name.endswith(SEGMENT_SUFFIX)]
+    # Names are "<stage order>-<stage>-<league>-<year>-<created>", sort on those fields
+    names.sort(key=lambda name: (name.split("-")[0], name.split("-")[3], name))
+    return (os.path.join(SPOOL_DIR, name) for name in names)
+
+
+def spool_leagues(leagues, stages=None) -> int:
+    """
+    Transform every league for each stage and spool the rows.
+
+    Returns the number of segments written. A season that fails to
+    transform for one stage is reported and skipped.
+    """
+    written = 0
+    for stage in stages or STAGE_TRANSFORMS:
+        for league in leagues:
+            try:
+                write_segment(stage, league.league_id, league.year, transform_league(stage, league))
+                written += 1
+            except Exception as e:
+                logger.error(f"Error spooling {stage} for league {league.league_id}, year {league.year}: {e}",
+                             extra={"stage": stage, "year": league.year})
+    return written
+
+
+def replay_spool() -> Tuple[int, int, Set[int]]:
+    """
+    Load every pending segment into the database.
+
+    Returns (segments replayed, segments failed, seasons loaded). Failed
+    segments stay in the spool for the next replay.
+    """
+    from app.services.espn_service import load_stage_rows
+
+    replayed = failed = 0
+    years = set()
+    for path in list(pending_segments()):
+        try:
+            header, rows = read_segment(path)
+            if rows:
+                load_stage_rows(header["stage"], rows, header["leagueId"])
+                years.add(header["year"])
+            os.makedirs(REPLAYED_DIR, exist_ok=True)
+            os.replace(path, os.path.join(REPLAYED_DIR, os.path.basename(path)))
+            replayed += 1
+        except Exception as e:
+            logger.error(f"Error replaying spool segment {path}: {e}")
+            failed += 1
+    return replayed, failed, years
@@ -0,0 +1,235 @@
+"""
+Transform fetched seasons into rows keyed by ESPN's natural keys.
+
+Nothing here touches the database: teams are identified by (year, teamId),
+players by their ESPN id and leagues by (leagueId, year). Surrogate keys are
+resolved when the rows are loaded, which lets the same rows be written
+straight to Postgres or to the local spool when the database is down.
+
+Transforms read the compact season model (app/services/season.py) and may
+return a list or yield rows. The weekly box score stages take the League
+itself, as they are fetched and streamed by app/services/box_scores.py; use
+transform_league to run any stage on a fetched League.
+
+Rows are NamedTuple records rather than dicts: a tuple holds its values in
+slots, with the field names kept once on the class, so buffered rows take a
+fraction of a dict's memory and are cheaper to build. The field names are
+the column names the spool and the loaders use.
+"""
+from typing import NamedTuple, Optional
+
+from app.services.box_scores import PlayerWeekRow, RosterSpanRow, player_weekly_stat_rows, roster_snapshot_rows
+from app.services.season import season_of
+
+class LeagueRow(NamedTuple):
+    leagueId: int
+    teamCount: int
+    year: int
+    currentWeek: int
+    nflWeek: int
+
+
+class PlayerRow(NamedTuple):
+    espnId: int
+    name: str
+
+
+class SettingsRow(NamedTuple):
+    leagueId: int
+    year: int
+    regularSeasonCount: int
+    vetoVotesRequired: int
+    teamCount: int
+    playoffTeamCount: int
+    keeperCount: int
+    tradeDeadline: int
+    name: str
+    tieRule: str
+    playoffTieRule: str
+    playoffSeedTieRule: str
+    playoffMatchupPeriodLength: int
+    faab: bool
+
+
+class TeamRow(NamedTuple):
+    leagueId: int
+    teamId: int
+    year: int
+    teamAbbrv: str
+    teamName: str
+    owners: str
+    divisionId: str
+    divisionName: str
+    wins: int
+    losses: int
+    ties: int
+    pointsFor: float
+    pointsAgainst: float
+    waiverRank: int
+    acquisitions: int
+    acquisitionBudgetSpent: int
+    drops: int
+    trades: int
+    streakType: str
+    streakLength: int
+    standing: int
+    finalStanding: int
+    draftProjRank: int
+    playoffPct: float
+    logoUrl: str
+
+
+class OwnerRow(NamedTuple):
+    espnId: str
+    displayName: Optional[str]
+    firstName: Optional[str]
+    lastName: Optional[str]
+
+
+class TeamOwnerRow(NamedTuple):
+    year: int
+    teamId: int
+    ownerId: str
+
+
+class DraftRow(NamedTuple):
+    leagueId: int
+    year: int
+    teamId: int
+    playerId: int               # ESPN player id
+    overallPick: int
+    roundNum: int               # Integer round number
+    roundPick: int              # Integer pick number within the round
+    bidAmount: int              # Integer bid amount (for auction drafts)
+    keeperStatus: bool
+    nominatingTeamId: Optional[int]
+
+
+class MatchupRow(NamedTuple):
+    leagueId: int
+    year: int
+    week: int
+    homeTeamId: Optional[int]   # None for a bye
+    awayTeamId: Optional[int]
+    homeScore: float
+    awayScore: float
+    isPlayoff: bool
+    matchupType: str
+
+
+class RosterRow(NamedTuple):
+    leagueId: int
+    year: int
+    teamId: int
+    playerId: int               # ESPN player id
+    rosterSlot: str
+
+
+def league_rows(season):
+    return [LeagueRow(season.league_id, len(season.teams), season.year, season.current_week, season.nfl_week)]
+
+
+def player_rows(season):
+    return [PlayerRow(*item) for item in season.players.items()]
+
+
+def settings_rows(season):
+    # SettingsRecord holds the settings in SettingsRow's column order
+    return [SettingsRow(season.league_id, season.year, *season.settings)]
+
+
+def team_rows(season):
+    rows = []
+    for team in season.teams:
+        owners = []
+        for owner in team.owners:
+            first_name = owner.first_name if owner.first_name is not None else 'Unknown'
+            last_name = owner.last_name if owner.last_name is not None else 'Unknown'
+            owners.append(first_name + " " + last_name)
+
+        rows.append(TeamRow(
+            season.league_id, team.team_id, season.year, team.team_id, team.name, ', '.join(owners),
+            team.division_id, team.division_name, team.wins, team.losses, team.ties, team.points_for,
+            team.points_against, team.waiver_rank, team.acquisitions, team.acquisition_budget_spent, team.drops,
+            team.trades, team.streak_type, team.streak_length, team.standing, team.final_standing,
+            team.draft_projected_rank, team.playoff_pct, team.logo_url,
+        ))
+    return rows
+
+
+def owner_rows(season):
+    rows = {}
+    for team in season.teams:
+        for owner in team.owners:
+            # Owners of several teams in a season are listed once; OwnerRecord matches OwnerRow
+            rows[owner.espn_id] = OwnerRow(*owner)
+    return list(rows.values())
+
+
+def team_owner_rows(season):
+    return [
+        TeamOwnerRow(season.year, team.team_id, owner.espn_id)
+        for team in season.teams for owner in team.owners
+    ]
+
+
+def draft_rows(season):
+    league_id, year = season.league_id, season.year
+    return [
+        DraftRow(league_id, year, pick.team_id, pick.player_id, pick_index, pick.round_num, pick.round_pick,
+                 pick.bid_amount, pick.keeper_status, pick.nominating_team_id)
+        for pick_index, pick in enumerate(season.picks, 1)
+    ]
+
+
+def matchup_rows(season):
+    # MatchupRecord holds week through matchup type in MatchupRow's column order
+    head = (season.league_id, season.year)
+    return [MatchupRow(*head, *matchup) for matchup in season.matchups]
+
+
+def roster_rows(season):
+    # RosterEntry holds team, player and slot in RosterRow's column order
+    head = (season.league_id, season.year)
+    return [RosterRow(*head, *entry) for entry in season.roster]
+
+
+# Stage name -> transform, in the order stages must be loaded
+STAGE_TRANSFORMS = {
+    "leagues": league_rows,
+    "players": player_rows,
+    "settings": settings_rows,
+    "teams": team_rows,
+    "draft": draft_rows,
+    "matchups": matchup_rows,
+    "rosters": roster_rows,
+    "player_weekly_stats": player_weekly_stat_rows,
+    "roster_snapshots": roster_snapshot_rows,
+    # Loaded right after teams by the pipeline; listed last to keep the
+    # stage numbers of segments already in the spool
+    "owners": owner_rows,
+    "team_owners": team_owner_rows,
+}
+
+# Stage name -> the row record its transform yields
+STAGE_ROWS = {
+    "leagues": LeagueRow,
+    "players": PlayerRow,
+    "settings": SettingsRow,
+    "teams": TeamRow,
+    "draft": DraftRow,
+    "matchups": MatchupRow,
+    "rosters": RosterRow,
+    "player_weekly_stats": PlayerWeekRow,
+    "roster_snapshots": RosterSpanRow,
+    "owners": OwnerRow,
+    "team_owners": TeamOwnerRow,
+}
+
+# Stages that stream from the live League instead of the compact season
+LEAGUE_STAGES = {"player_weekly_stats", "roster_snapshots"}
+
+
+def transform_league(stage, league):
+    """Rows of one stage for a fetched League."""
+    return STAGE_TRANSFORMS[stage](league if stage in LEAGUE_STAGES else season_of(league))
@@ -0,0 +1,233 @@
+"""
+Work queue for sharing one archive run between several workers.
+
+`espn_archive.py --enqueue` writes a (league, season, stage) unit for every
+season and stage to the work_units table; any number of `--worker`
+processes, e.g. replicas of the compose service, then drain it. A worker
+claims every ready unit of one season at once with FOR UPDATE SKIP LOCKED,
+so each season is fetched from ESPN by one worker only and workers never
+wait on each other's locks. Stages of the season run in order on that worker.
+
+Claims are leases: a heartbeat thread extends them while the worker is
+alive, and units whose lease expired (a crashed or stuck worker) become
+claimable again. A failed unit goes back to pending until it has been tried
+MAX_ATTEMPTS times. Timestamps come from the database clock, so workers on
+different hosts agree on lease expiry.
+
+Requires a target with row-level SKIP LOCKED (PostgreSQL).
+"""
+import logging
+import os
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+from sqlalchemy import func, select, text
+
+from app.db.models import WorkUnit
+from app.db.session import get_engine
+from app.db.targets import target_for
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+DEFAULT_LEASE_SECONDS = 300
+
+# Units whose lease ran out on their last attempt are not tried again
+_ABANDON = text("""
+    UPDATE work_units
+    SET status = 'failed', "workerId" = NULL, "finishedAt" = now(), error = 'lease expired'
+    WHERE status = 'claimed' AND "leaseExpiresAt" < now() AND attempts >= :max_attempts
+""")
+
+# Claim the league's next season: lock the first claimable unit (pending,
+# or claimed under an expired lease) of its first season, then every
+# claimable unit of that season. Only a season's first claimable unit can select it, so while
+# one worker holds that unit no other worker starts on the same season at a
+# later stage; they skip to the next season instead. Locks held by other
+# workers are skipped, never waited for, so the UPDATE never blocks.
+_CLAIM_SEASON = text("""
+    WITH season AS (
+        SELECT "leagueId", year FROM work_units u
+        WHERE u."leagueId" = :league_id
+          AND (u.status = 'pending' OR (u.status = 'claimed' AND u."leaseExpiresAt" < now()))
+          AND NOT EXISTS (
+              SELECT 1 FROM work_units e
+              WHERE e."leagueId" = u."leagueId" AND e.year = u.year AND e.position < u.position
+                AND (e.status = 'pending' OR (e.status = 'claimed' AND e."leaseExpiresAt" < now()))
+          )
+        ORDER BY year DESC, position
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    ),
+    units AS (
+        SELECT w.id FROM work_units w
+        JOIN season ON w."leagueId" = season."leagueId" AND w.year = season.year
+        WHERE w."leagueId" = :league_id
+          AND (w.status = 'pending' OR (w.status = 'claimed' AND w."leaseExpiresAt" < now()))
+        FOR UPDATE OF w SKIP LOCKED
+    )
+    UPDATE work_units w
+    SET status = 'claimed', "workerId" = :worker_id, attempts = w.attempts + 1,
+        "leaseExpiresAt" = now() + make_interval(secs => :lease_seconds), "heartbeatAt" = now()
+    FROM units
+    WHERE w.id = units.id
+    RETURNING w.id, w."leagueId", w.year, w.stage, w.position, w.attempts
+""")
+
+# Units that are still to do: pending, or claimed by a live worker
+_OPEN_UNITS = text("""
+    SELECT count(*) FROM work_units
+    WHERE "leagueId" = :league_id AND status IN ('pending', 'claimed')
+""")
+
+_HEARTBEAT = text("""
+    UPDATE work_units
+    SET "leaseExpiresAt" = now() + make_interval(secs => :lease_seconds), "heartbeatAt" = now()
+    WHERE "workerId" = :worker_id AND status = 'claimed'
+""")
+
+_COMPLETE = text("""
+    UPDATE work_units
+    SET status = 'done', "finishedAt" = now(), "leaseExpiresAt" = NULL, error = NULL
+    WHERE id = :id AND "workerId" = :worker_id AND status = 'claimed'
+""")
+
+_FAIL = text("""
+    UPDATE work_units
+    SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'pending' END,
+        "workerId" = NULL, "leaseExpiresAt" = NULL, "finishedAt" = now(), error = :error
+    WHERE id = :id AND "workerId" = :worker_id AND status = 'claimed'
+""")
+
+# Units given back untried do not use up an attempt
+_RELEASE = text("""
+    UPDATE work_units
+    SET status = 'pending', attempts = attempts - 1, "workerId" = NULL, "leaseExpiresAt" = NULL
+    WHERE id = :id AND "workerId" = :worker_id AND status = 'claimed'
+""")
+
+
+@dataclass(frozen=True)
+class ClaimedUnit:
+    id: int
+    league_id: int
+    year: int
+    stage: str
+    position: int
+    attempts: int
+
+
+def default_worker_id() -> str:
+    """Identify this worker process, e.g. in the workerId of its claimed units."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def check_queue_support(engine=None) -> None:
+    """Raise if the archive database cannot host the work queue."""
+    target = target_for(engine or get_engine())
+    if not target.supports_skip_locked:
+        raise RuntimeError(f"The work queue needs PostgreSQL, the {target.name} target has no SKIP LOCKED")
+
+
+def enqueue(league_id, years: Iterable[int], stages: List[str]) -> int:
+    """
+    Add a unit for every season and stage, returning the number of units made pending.
+
+    Units that are already done or failed are reset to pending so the season
+    is refreshed; units that are pending or claimed are left alone.
+    """
+    check_queue_support()
+    target = target_for(get_engine())
+    rows = [
+        {'leagueId': int(league_id), 'year': year, 'stage': stage, 'position': position,
+         'status': 'pending', 'attempts': 0, 'enqueuedAt': func.now()}
+        for year in years for position, stage in enumerate(stages)
+    ]
+    if not rows:
+        return 0
+    stmt = target.insert(WorkUnit).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['leagueId', 'year', 'stage'],
+        set_={'status': 'pending', 'attempts': 0, 'error': None, 'position': stmt.excluded.position,
+              'enqueuedAt': func.now(), 'finishedAt': None},
+        where=WorkUnit.status.in_(['done', 'failed']),
+    )
+    with get_engine().begin() as conn:
+        return conn.execute(stmt).rowcount
+
+
+def claim_season(league_id, worker_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> List[ClaimedUnit]:
+    """Claim every ready unit of a league's next season, in stage order; empty if none could be claimed."""
+    with get_engine().begin() as conn:
+        conn.execute(_ABANDON, {'max_attempts': MAX_ATTEMPTS})
+        rows = conn.execute(_CLAIM_SEASON, {'league_id': int(league_id), 'worker_id': worker_id,
+                                            'lease_seconds': lease_seconds}).all()
+    return sorted((ClaimedUnit(*row) for row in rows), key=lambda unit: unit.position)
+
+
+def complete_unit(unit: ClaimedUnit, worker_id: str) -> bool:
+    """Mark a unit done. Returns False if the worker had lost its lease on it."""
+    with get_engine().begin() as conn:
+        return conn.execute(_COMPLETE, {'id': unit.id, 'worker_id': worker_id}).rowcount == 1
+
+
+def fail_unit(unit: ClaimedUnit, worker_id: str, error: str) -> None:
+    """Return a failed unit to the queue, or mark it failed once MAX_ATTEMPTS are used up."""
+    with get_engine().begin() as conn:
+        conn.execute(_FAIL, {'id': unit.id, 'worker_id': worker_id, 'error': error[:2000],
+                             'max_attempts': MAX_ATTEMPTS})
+
+
+def release_units(units: Iterable[ClaimedUnit], worker_id: str) -> None:
+    """Give claimed units back untried, e.g. the later stages of a season whose earlier stage failed."""
+    params = [{'id': unit.id, 'worker_id': worker_id} for unit in units]
+    if params:
+        with get_engine().begin() as conn:
+            conn.execute(_RELEASE, params)
+
+
+def open_units(league_id) -> int:
+    """Number of a league's units that are pending or claimed."""
+    with get_engine().connect() as conn:
+        return conn.execute(_OPEN_UNITS, {'league_id': int(league_id)}).scalar()
+
+
+def queue_counts(league_id) -> Dict[str, int]:
+    """Return {status: number of units} for a league."""
+    stmt = select(WorkUnit.status, func.count()).where(WorkUnit.leagueId == int(league_id)).group_by(WorkUnit.status)
+    with get_engine().connect() as conn:
+        return dict(conn.execute(stmt).all())
+
+
+class Heartbeat:
+    """
+    Extend a worker's leases from a background thread while the block runs.
+
+    Beats every third of the lease, so two missed beats still leave the
+    claim valid.
+    """
+
+    def __init__(self, worker_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{worker_id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                with get_engine().begin() as conn:
+                    conn.execute(_HEARTBEAT, {'worker_id': self.worker_id, 'lease_seconds': self.lease_seconds})
+            except Exception as e:
+                logger.warning(f"Work queue heartbeat failed for {self.worker_id}: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
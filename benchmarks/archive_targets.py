@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Load a synthetic full archive into each storage target and compare throughput and footprint.
+
+Rows are generated in the natural-key form the stage transforms produce and
+go through the same resolve + bulk_upsert path as the pipeline and spool
+replay, so the numbers reflect a real load. Each URL should point to a
+scratch database: its archive schema is created (or migrated) if missing and filled.
+
+    python benchmarks/archive_targets.py [--seasons 25] [--url sqlite:///bench.db] [--url postgresql://...]
+
+Without --url the embedded SQLite target is benchmarked in a temporary file.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db.session import get_engine  # noqa: E402
+from app.db.targets import target_for  # noqa: E402
+
+LEAGUE_ID = 123456
+TEAMS = 12
+ROSTER_SIZE = 16
+WEEKS = 17
+
+
+def archive_rows(seasons, players):
+    """Natural-key rows for every stage of a league with the given number of seasons."""
+    rng = random.Random(0)
+    pool = list(range(1, players + 1))
+    stages = {stage: [] for stage in ("leagues", "players", "settings", "teams", "draft", "matchups", "rosters")}
+    stages["players"] = [{'espnId': espn_id, 'name': f'Player {espn_id}'} for espn_id in pool]
+
+    for year in range(2024 - seasons + 1, 2025):
+        stages["leagues"].append({'leagueId': LEAGUE_ID, 'teamCount': TEAMS, 'year': year,
+                                  'currentWeek': WEEKS, 'nflWeek': WEEKS + 1})
+        stages["settings"].append({
+            'leagueId': LEAGUE_ID, 'year': year, 'regularSeasonCount': 14, 'vetoVotesRequired': 4,
+            'teamCount': TEAMS, 'playoffTeamCount': 6, 'keeperCount': 0, 'tradeDeadline': 0,
+            'name': 'Benchmark League', 'tieRule': 'NONE', 'playoffTieRule': 'NONE',
+            'playoffSeedTieRule': 'NONE', 'playoffMatchupPeriodLength': 1, 'faab': True,
+        })
+        for team_id in range(1, TEAMS + 1):
+            stages["teams"].append({
+                'leagueId': LEAGUE_ID, 'teamId': team_id, 'year': year, 'teamAbbrv': f'T{team_id}',
+                'teamName': f'Team {team_id}', 'owners': 'First Last', 'divisionId': '0',
+                'divisionName': 'East', 'wins': 7, 'losses': 6, 'ties': 0, 'pointsFor': 1500.5,
+                'pointsAgainst': 1400.5, 'waiverRank': team_id, 'acquisitions': 10,
+                'acquisitionBudgetSpent': 0, 'drops': 9, 'trades': 1, 'streakType': 'WIN',
+                'streakLength': 2, 'standing': team_id, 'finalStanding': team_id,
+                'draftProjRank': team_id, 'playoffPct': 50, 'logoUrl': 'https://example.com/logo.png',
+            })
+        drafted = rng.sample(pool, TEAMS * ROSTER_SIZE)
+        for pick, espn_id in enumerate(drafted):
+            team_id = pick % TEAMS + 1
+            stages["draft"].append({
+                'leagueId': LEAGUE_ID, 'year': year, 'teamId': team_id, 'playerId': espn_id, 'overallPick': pick + 1,
+                'roundNum': pick // TEAMS + 1, 'roundPick': pick % TEAMS + 1, 'bidAmount': 0,
+                'keeperStatus': False, 'nominatingTeamId': None,
+            })
+            stages["rosters"].append({'leagueId': LEAGUE_ID, 'year': year, 'teamId': team_id, 'playerId': espn_id,
+                                      'rosterSlot': 'BE'})
+        for week in range(1, WEEKS + 1):
+            for game in range(TEAMS // 2):
+                stages["matchups"].append({
+                    'leagueId': LEAGUE_ID, 'year': year, 'week': week, 'homeTeamId': game * 2 + 1, 'awayTeamId': game * 2 + 2,
+                    'homeScore': rng.uniform(60, 160), 'awayScore': rng.uniform(60, 160),
+                    'isPlayoff': week > 14, 'matchupType': 'NONE',
+                })
+    return stages
+
+
+def footprint_bytes(engine):
+    """On-disk size of the archive: the database file(s) for SQLite, pg_database_size for Postgres."""
+    if engine.dialect.name == "sqlite":
+        path = engine.url.database
+        return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT pg_database_size(current_database())")).scalar()
+
+
+def prepare_schema(engine, url):
+    """Create (or migrate) the archive schema in a scratch database."""
+    target = target_for(engine)
+    if target.uses_alembic:
+        # Partitioned tables need the migrated schema, not create_all
+        from alembic import command
+        from alembic.config import Config
+
+        config = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+        config.set_main_option("sqlalchemy.url", url)
+        command.upgrade(config, "head")
+    else:
+        target.create_schema(engine)
+
+
+def benchmark(url, stages):
+    from app.services.espn_service import load_stage_rows
+
+    # The loaders use the default engine, which follows DATABASE_URL
+    os.environ["DATABASE_URL"] = url
+    engine = get_engine(url)
+    target = target_for(engine)
+    prepare_schema(engine, url)
+
+    total_rows = 0
+    started = time.perf_counter()
+    for stage, rows in stages.items():
+        stage_started = time.perf_counter()
+        load_stage_rows(stage, rows)
+        print(f"  {stage:<9} {len(rows):>7} rows {time.perf_counter() - stage_started:8.2f}s")
+        total_rows += len(rows)
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        if target.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = footprint_bytes(engine)
+    print(f"{target.name:<10} {total_rows} rows in {elapsed:.2f}s = {total_rows / elapsed:,.0f} rows/s, "
+          f"footprint {size / 1024 / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=25)
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--url", action="append", help="Target database URL, repeatable")
+    args = parser.parse_args()
+
+    stages = archive_rows(args.seasons, args.players)
+    urls = args.url or [f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'archive.db')}"]
+    for url in urls:
+        print(f"Loading {args.seasons} seasons into {get_engine(url).url.render_as_string(hide_password=True)}")
+        benchmark(url, stages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Measure team logo archiving against a local HTTP server.
+
+Serves synthetic logos from a stub server on localhost that answers every
+request after --latency milliseconds, like a remote CDN would, with ETag
+and Last-Modified headers and 304 for conditional requests that match.
+Every --duplicates-th URL serves the same image as another one, as when a
+team keeps its logo across seasons under a new URL. Archives them three
+ways into a temporary logo directory:
+
+    sequential    one request at a time
+    concurrent    LOGO_WORKERS requests in flight (--workers)
+    re-run        concurrent again with what the first run stored, so
+                  every logo is requested conditionally and skipped
+
+    python benchmarks/logo_archive.py [--logos 240] [--latency 50] [--workers 8]
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.logos import KnownLogo, archive_logos  # noqa: E402
+
+LAST_MODIFIED = formatdate(0, usegmt=True)
+
+
+def serve_logos(count, latency, duplicates):
+    """Start the stub server; returns it and the logo URLs it serves."""
+    images = {}
+    for i in range(count):
+        content = i - i % duplicates if duplicates else i
+        images[f"/logos/{i}.png"] = b"\x89PNG\r\n\x1a\n" + f"logo {content}".encode() * 200
+
+    class LogoHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            image = images.get(self.path)
+            if image is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = '"' + hashlib.md5(image).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(image)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+            self.end_headers()
+            self.wfile.write(image)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LogoHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, [base + path for path in images]
+
+
+def run(name, urls, known, workers, directory):
+    started = time.perf_counter()
+    results = archive_logos(urls, known, workers=workers, directory=directory)
+    seconds = time.perf_counter() - started
+    statuses = {}
+    for r in results:
+        statuses[r.status or "failed"] = statuses.get(r.status or "failed", 0) + 1
+    files = sum(len(filenames) for _, _, filenames in os.walk(directory))
+    print(f"{name:<11} {seconds:7.2f}s  {len(results) / seconds:8.1f} logos/s  "
+          f"{sum(r.new_file for r in results):>4} new files ({files} stored)  statuses {statuses}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logos", type=int, default=240, help="Distinct logo URLs, e.g. 20 seasons of 12 teams")
+    parser.add_argument("--latency", type=float, default=50, help="Server latency per request in milliseconds")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duplicates", type=int, default=4, help="URLs sharing one image (0: all distinct)")
+    args = parser.parse_args()
+
+    server, urls = serve_logos(args.logos, args.latency / 1000, args.duplicates)
+    try:
+        with tempfile.TemporaryDirectory() as sequential_dir, tempfile.TemporaryDirectory() as directory:
+            run("sequential", urls, None, 1, sequential_dir)
+            results = run("concurrent", urls, None, args.workers, directory)
+            known = {r.url: KnownLogo(r.sha256, r.content_type, r.etag, r.last_modified) for r in results}
+            run("re-run", urls, known, args.workers, directory)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Measure what the redundant drafts/rosters indexes cost the upsert path.
+
+Loads a synthetic archive (see archive_targets.py), then times loading the
+draft and roster stages with the indexes that revision d2e8b5c1f047
+dropped and c6f2a9e4b857 restored ("before"), without each one of them in
+turn ("-<index>") and without any ("after"). Each stage is loaded twice per
+round: into empty tables (inserts) and again over the same rows (conflict
+updates). Rounds alternate and the best time is kept.
+
+    python benchmarks/redundant_indexes.py [--seasons 25] [--rounds 3] [--url postgresql://...]
+
+Without --url a temporary SQLite file is used. The URL should point to a
+scratch database; its drafts and rosters are emptied.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import Index  # noqa: E402
+
+from app.db.models import Draft, Roster  # noqa: E402
+from app.db.session import get_engine  # noqa: E402
+from archive_targets import archive_rows, prepare_schema  # noqa: E402
+
+STAGES = {"draft": Draft, "rosters": Roster}
+REDUNDANT_INDEXES = {
+    "draft": [("idx_draft_team_player_year", ["team_id", "player_id"])],
+    "rosters": [("idx_roster_team_player", ["team_id", "player_id"]), ("idx_roster_team", ["team_id"])],
+}
+
+
+def redundant_indexes(stage):
+    table = STAGES[stage].__table__
+    return [Index(name, *(table.c[column] for column in columns)) for name, columns in REDUNDANT_INDEXES[stage]]
+
+
+def variants(stage):
+    """{variant: names of the stage's redundant indexes it drops}"""
+    names = [name for name, _ in REDUNDANT_INDEXES[stage]]
+    dropped = {"before": set()}
+    if len(names) > 1:
+        dropped.update((f"-{name}", {name}) for name in names)
+    dropped["after"] = set(names)
+    return dropped
+
+
+def empty(engine, model):
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql(f'TRUNCATE "{model.__tablename__}"')
+        else:
+            conn.execute(model.__table__.delete())
+
+
+def timed_load(stage, rows):
+    from app.services.espn_service import load_stage_rows
+
+    started = time.perf_counter()
+    load_stage_rows(stage, rows)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=25)
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--url", help="Scratch database URL")
+    args = parser.parse_args()
+
+    from app.services.espn_service import load_stage_rows
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'indexes.db')}"
+    os.environ["DATABASE_URL"] = url
+    engine = get_engine(url)
+    prepare_schema(engine, url)
+
+    stages = archive_rows(args.seasons, args.players)
+    for stage in ("leagues", "players", "settings", "teams"):
+        load_stage_rows(stage, stages[stage])
+
+    # {(variant, stage, phase): best seconds}
+    best = {}
+    for _ in range(args.rounds):
+        for stage, model in STAGES.items():
+            for variant, dropped in variants(stage).items():
+                with engine.begin() as conn:
+                    for index in redundant_indexes(stage):
+                        if index.name in dropped:
+                            index.drop(conn, checkfirst=True)
+                        else:
+                            index.create(conn, checkfirst=True)
+                empty(engine, model)
+                for phase in ("insert", "update"):
+                    seconds = timed_load(stage, stages[stage])
+                    key = (variant, stage, phase)
+                    best[key] = min(best.get(key, seconds), seconds)
+
+    print(f"{engine.dialect.name}, {args.seasons} seasons, best of {args.rounds}")
+    for stage in STAGES:
+        rows = len(stages[stage])
+        for phase in ("insert", "update"):
+            before = best[("before", stage, phase)]
+            print(f"  {stage:<7} {phase:<6} {rows:>7} rows  before {rows / before:>9,.0f} rows/s")
+            for variant in list(variants(stage))[1:]:
+                seconds = best[(variant, stage, phase)]
+                print(f"    {variant:<31} {rows / seconds:>9,.0f} rows/s  ({before / seconds - 1:+.0%} throughput)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Compare weekly roster storage: full rosters every week vs spans of unchanged weeks.
+
+Generates 17-week seasons with typical churn (a waiver add/drop and two
+start/bench swaps per team per week) and loads them into SQLite twice:
+
+    naive     one row per player per week, slot stored as a string
+    spans     the roster_snapshots layout: week-over-week changes only,
+              slot dictionary-encoded as a small integer
+
+    python benchmarks/roster_snapshots.py [--seasons 1] [--teams 12]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import Column, Integer, MetaData, SmallInteger, String, Table, create_engine  # noqa: E402
+
+from app.services.box_scores import PlayerWeekRow, lineup_spans  # noqa: E402
+
+WEEKS = 17
+STARTERS = ['QB', 'RB', 'RB', 'WR', 'WR', 'TE', 'RB/WR/TE', 'D/ST', 'K']
+BENCH = 7
+
+metadata = MetaData()
+naive = Table(
+    'naive_weekly_rosters', metadata,
+    Column('team_id', Integer, primary_key=True),
+    Column('player_id', Integer, primary_key=True),
+    Column('year', Integer, primary_key=True),
+    Column('week', Integer, primary_key=True),
+    Column('rosterSlot', String(50)),
+)
+spans = Table(
+    'roster_snapshots', metadata,
+    Column('team_id', Integer, primary_key=True),
+    Column('player_id', Integer, primary_key=True),
+    Column('year', SmallInteger, primary_key=True),
+    Column('weekFrom', SmallInteger, primary_key=True),
+    Column('weekTo', SmallInteger, nullable=False),
+    Column('slot_id', SmallInteger, nullable=False),
+)
+
+
+def weekly_rows(year, teams, rng, next_player):
+    """Week-ordered rows like player_weekly_stat_rows yields, with realistic churn."""
+    rosters = {}
+    for team_id in range(1, teams + 1):
+        rosters[team_id] = [[next(next_player), slot] for slot in STARTERS + ['BE'] * BENCH]
+    for week in range(1, WEEKS + 1):
+        for team_id, roster in rosters.items():
+            if week > 1:
+                # Waiver add/drop replaces a bench player
+                bench = [entry for entry in roster if entry[1] == 'BE']
+                rng.choice(bench)[0] = next(next_player)
+                # Two start/bench swaps
+                for _ in range(2):
+                    starter = rng.choice([entry for entry in roster if entry[1] != 'BE'])
+                    sub = rng.choice([entry for entry in roster if entry[1] == 'BE'])
+                    starter[1], sub[1] = sub[1], starter[1]
+            for player_id, slot in roster:
+                yield PlayerWeekRow(year, week, team_id, player_id, 0.0, 0.0, slot)
+
+
+def load(table, rows):
+    path = os.path.join(tempfile.mkdtemp(), f"{table.name}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine, tables=[table])
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(table.insert(), rows)
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--teams", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    player_ids = iter(range(1, 10_000_000))
+    weekly = [row for year in range(2024 - args.seasons + 1, 2025)
+              for row in weekly_rows(year, args.teams, rng, player_ids)]
+
+    slot_ids = {}
+    started = time.perf_counter()
+    span_rows = []
+    years = sorted({row.year for row in weekly})
+    for span in (span for year in years for span in lineup_spans(year, (r for r in weekly if r.year == year))):
+        span_rows.append({
+            'team_id': span.teamId, 'player_id': span.playerId, 'year': span.year,
+            'weekFrom': span.weekFrom, 'weekTo': span.weekTo,
+            'slot_id': slot_ids.setdefault(span.lineupSlot, len(slot_ids) + 1),
+        })
+    encode_seconds = time.perf_counter() - started
+    naive_rows = [{'team_id': row.teamId, 'player_id': row.playerId, 'year': row.year,
+                   'week': row.week, 'rosterSlot': row.lineupSlot} for row in weekly]
+
+    naive_seconds, naive_bytes = load(naive, naive_rows)
+    span_seconds, span_bytes = load(spans, span_rows)
+    span_seconds += encode_seconds
+
+    print(f"{args.seasons} season(s), {args.teams} teams, {WEEKS} weeks")
+    print(f"naive  {len(naive_rows):>8} rows  {naive_bytes / 1024:8.0f} KiB  {naive_seconds * 1000:7.1f} ms")
+    print(f"spans  {len(span_rows):>8} rows  {span_bytes / 1024:8.0f} KiB  {span_seconds * 1000:7.1f} ms (incl. encoding)")
+    print(f"spans/naive: rows {len(span_rows) / len(naive_rows):.0%}, size {span_bytes / naive_bytes:.0%}, "
+          f"load time {span_seconds / naive_seconds:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Compare NamedTuple row records with per-row dicts, built and loaded.
+
+Builds synthetic seasons in the compact season model and runs the team,
+draft, roster and matchup transforms, plus weekly box score rows, two ways:
+
+    dicts     one dict per row, as the transforms produced before
+    records   the NamedTuple records of app/services/transform.py
+
+Then upserts the weekly stat rows, resolved, into a scratch SQLite archive
+with bulk_upsert, again as dicts (bound by name through SQLAlchemy) and as
+records (bound positionally, see positional_upsert in app/db/upsert.py).
+
+Throughput is the best of several runs; bytes per row is what the built
+rows keep allocated (tracemalloc), i.e. what a buffer of them costs.
+
+    python benchmarks/row_records.py [--seasons 20] [--teams 12]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, text  # noqa: E402
+
+from app.db.models import PlayerWeeklyStat  # noqa: E402
+from app.db.session import get_engine  # noqa: E402
+from app.db.targets import target_for  # noqa: E402
+from app.db.upsert import bulk_upsert  # noqa: E402
+from app.services.box_scores import PlayerWeekRow  # noqa: E402
+from app.services.espn_service import PlayerWeeklyStatModelRow  # noqa: E402
+from app.services.season import (  # noqa: E402
+    MatchupRecord, OwnerRecord, PickRecord, RosterEntry, Season, SettingsRecord, TeamRecord,
+)
+from app.services.transform import draft_rows, matchup_rows, roster_rows, team_rows  # noqa: E402
+
+LEAGUE_ID = 123456
+ROSTER_SIZE = 16
+WEEKS = 17
+
+
+def synthetic_season(year, teams, rng):
+    team_records = tuple(
+        TeamRecord(team_id, f'Team {team_id}', (OwnerRecord(f'{{OWNER-{team_id}}}', 'owner', 'First', 'Last'),),
+                   '0', 'East', 7, 6, 0, 1500.5, 1400.5, team_id, 10, 0, 9, 1, 'WIN', 2, team_id, team_id,
+                   team_id, 50.0, 'https://example.com/logo.png')
+        for team_id in range(1, teams + 1)
+    )
+    players = rng.sample(range(1, 100000), teams * ROSTER_SIZE)
+    return Season(
+        LEAGUE_ID, year, WEEKS, WEEKS + 1, 1, WEEKS,
+        SettingsRecord(14, 4, teams, 6, 0, 0, 'League', 'NONE', 'NONE', 'NONE', 1, True),
+        team_records,
+        {player: f'Player {player}' for player in players},
+        tuple(PickRecord(pick % teams + 1, player, pick // teams + 1, pick % teams + 1, 0, False, None)
+              for pick, player in enumerate(players)),
+        tuple(MatchupRecord(week, game * 2 + 1, game * 2 + 2, rng.uniform(60, 160), rng.uniform(60, 160),
+                            week > 14, 'NONE')
+              for week in range(1, WEEKS + 1) for game in range(teams // 2)),
+        tuple(RosterEntry(pick % teams + 1, player, 'BE') for pick, player in enumerate(players)),
+    )
+
+
+def dict_transforms(season):
+    """The same rows as per-row dicts, built the way the transforms used to."""
+    rows = []
+    for team in season.teams:
+        rows.append({
+            'leagueId': season.league_id, 'teamId': team.team_id, 'year': season.year, 'teamAbbrv': team.team_id,
+            'teamName': team.name, 'owners': ', '.join(f'{o.first_name} {o.last_name}' for o in team.owners),
+            'divisionId': team.division_id, 'divisionName': team.division_name, 'wins': team.wins,
+            'losses': team.losses, 'ties': team.ties, 'pointsFor': team.points_for,
+            'pointsAgainst': team.points_against, 'waiverRank': team.waiver_rank,
+            'acquisitions': team.acquisitions, 'acquisitionBudgetSpent': team.acquisition_budget_spent,
+            'drops': team.drops, 'trades': team.trades, 'streakType': team.streak_type,
+            'streakLength': team.streak_length, 'standing': team.standing, 'finalStanding': team.final_standing,
+            'draftProjRank': team.draft_projected_rank, 'playoffPct': team.playoff_pct, 'logoUrl': team.logo_url,
+        })
+    for index, pick in enumerate(season.picks, 1):
+        rows.append({
+            'leagueId': season.league_id, 'year': season.year, 'teamId': pick.team_id, 'playerId': pick.player_id,
+            'overallPick': index, 'roundNum': pick.round_num, 'roundPick': pick.round_pick,
+            'bidAmount': pick.bid_amount, 'keeperStatus': pick.keeper_status,
+            'nominatingTeamId': pick.nominating_team_id,
+        })
+    for entry in season.roster:
+        rows.append({'leagueId': season.league_id, 'year': season.year, 'teamId': entry.team_id,
+                     'playerId': entry.player_id, 'rosterSlot': entry.slot})
+    for matchup in season.matchups:
+        rows.append({
+            'leagueId': season.league_id, 'year': season.year, 'week': matchup.week,
+            'homeTeamId': matchup.home_team_id, 'awayTeamId': matchup.away_team_id,
+            'homeScore': matchup.home_score, 'awayScore': matchup.away_score,
+            'isPlayoff': matchup.is_playoff, 'matchupType': matchup.matchup_type,
+        })
+    for week in range(1, WEEKS + 1):
+        for entry in season.roster:
+            rows.append({'year': season.year, 'week': week, 'teamId': entry.team_id, 'playerId': entry.player_id,
+                         'points': 10.5, 'projectedPoints': 11.0, 'lineupSlot': entry.slot})
+    return rows
+
+
+def record_transforms(season):
+    rows = team_rows(season) + draft_rows(season) + roster_rows(season) + matchup_rows(season)
+    for week in range(1, WEEKS + 1):
+        for entry in season.roster:
+            # As app/services/box_scores.py builds them
+            rows.append(PlayerWeekRow(season.year, week, entry.team_id, entry.player_id, 10.5, 11.0, entry.slot))
+    return rows
+
+
+def measure(transform, seasons, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        rows = [row for season in seasons for row in transform(season)]
+        best = min(best, time.perf_counter() - started)
+        del rows
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rows = [row for season in seasons for row in transform(season)]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return len(rows), best, retained
+
+
+def weekly_stat_rows(seasons, records):
+    """Resolved weekly stat rows, with espn ids and team numbers standing in for surrogate keys."""
+    rows = []
+    for season in seasons:
+        for week in range(1, WEEKS + 1):
+            for entry in season.roster:
+                if records:
+                    rows.append(PlayerWeeklyStatModelRow(entry.player_id, entry.team_id, season.year, week,
+                                                         10.5, 11.0, entry.slot))
+                else:
+                    rows.append({'player_id': entry.player_id, 'team_id': entry.team_id, 'year': season.year,
+                                 'week': week, 'points': 10.5, 'projectedPoints': 11.0, 'lineupSlot': entry.slot})
+    return rows
+
+
+def measure_load(rows, repeats=3):
+    engine = get_engine()
+    best = float("inf")
+    for _ in range(repeats):
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM player_weekly_stats"))
+        started = time.perf_counter()
+        bulk_upsert(PlayerWeeklyStat, rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def load(seasons):
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATABASE_URL"] = f"sqlite:///{directory}/rows.db"
+        engine = get_engine()
+        # Only weekly stats are loaded, without the players and teams they reference
+        event.listen(engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=OFF"))
+        target_for(engine).create_schema(engine)
+
+        results = {}
+        for name in ("dicts", "records"):
+            rows = weekly_stat_rows(seasons, name == "records")
+            seconds = measure_load(rows)
+            results[name] = seconds
+            print(f"load {name:<8} {len(rows):>8} rows  {len(rows) / seconds:>12,.0f} rows/s")
+        print(f"records/dicts: load time {results['records'] / results['dicts']:.0%}")
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--teams", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    seasons = [synthetic_season(year, args.teams, rng) for year in range(2024 - args.seasons + 1, 2025)]
+
+    results = {}
+    for name, transform in (("dicts", dict_transforms), ("records", record_transforms)):
+        rows, seconds, retained = measure(transform, seasons)
+        results[name] = (seconds, retained / rows)
+        print(f"{name:<8} {rows:>8} rows  {rows / seconds:>12,.0f} rows/s  {retained / rows:6.0f} bytes/row")
+    print(f"records/dicts: time {results['records'][0] / results['dicts'][0]:.0%}, "
+          f"memory {results['records'][1] / results['dicts'][1]:.0%}")
+    load(seasons)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Compare statement build/compile cost of the old per-batch upsert statements
+with the cached TableSpec statements from app/db/upsert.py.
+
+Runs offline against the PostgreSQL dialect (no database needed). For each
+batch it does what a live engine does before touching the driver: build the
+statement, generate its cache key and compile it on a cache miss.
+
+    python benchmarks/upsert_compile.py [--rows 20000] [--batch-size 1000]
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from sqlalchemy.dialects.postgresql import insert  # noqa: E402
+
+from app.db.models import Matchup, Team  # noqa: E402
+from app.db.targets import TARGETS  # noqa: E402
+from app.db.upsert import TABLE_SPECS, upsert_statement  # noqa: E402
+
+DIALECT = postgresql.psycopg2.dialect()
+
+
+def team_rows(count):
+    return [
+        {
+            'teamId': i % 12 + 1, 'league_id': i // 12 + 1, 'year': 2000 + i // 12, 'teamAbbrv': 'ABC',
+            'teamName': f'Team {i}', 'owners': 'First Last', 'divisionId': '0', 'divisionName': 'East',
+            'wins': 7, 'losses': 6, 'ties': 0, 'pointsFor': 1500, 'pointsAgainst': 1400, 'waiverRank': 3,
+            'acquisitions': 10, 'acquisitionBudgetSpent': 0, 'drops': 9, 'trades': 1, 'streakType': 'WIN',
+            'streakLength': 2, 'standing': 4, 'finalStanding': 4, 'draftProjRank': 5, 'playoffPct': 50,
+            'logoUrl': 'https://example.com/logo.png',
+        }
+        for i in range(count)
+    ]
+
+
+def matchup_rows(count):
+    return [
+        {
+            'week': i % 17 + 1, 'home_team_id': i, 'away_team_id': i + 1, 'homeScore': 100.5,
+            'awayScore': 99.5, 'isPlayoff': False, 'matchupType': 'NONE',
+        }
+        for i in range(count)
+    ]
+
+
+def old_statement(model, rows):
+    """The statement the removed bulk_upsert_* functions built for every batch."""
+    stmt = insert(model).values(rows)
+    spec = TABLE_SPECS[model]
+    return stmt.on_conflict_do_update(
+        index_elements=list(spec.conflict_columns),
+        set_={name: stmt.excluded[name] for name in spec.update_columns if name in rows[0]},
+    )
+
+
+def new_statement(model, rows):
+    return upsert_statement(TABLE_SPECS[model], tuple(rows[0].keys()), TARGETS["postgresql"])
+
+
+def run(build, model, rows, batch_size):
+    compiled_cache = {}
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        stmt = build(model, batch)
+        key = stmt._generate_cache_key()
+        if key not in compiled_cache:
+            compiled_cache[key] = stmt.compile(dialect=DIALECT)
+
+
+def compile_seconds(stats):
+    """Seconds spent inside SQLAlchemy's SQL compiler, from a cProfile run."""
+    total = 0.0
+    for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+        if filename.endswith(os.path.join("sql", "compiler.py")):
+            total += tottime
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    for model, make_rows in ((Team, team_rows), (Matchup, matchup_rows)):
+        rows = make_rows(args.rows)
+        for label, build in (("per-batch statement", old_statement), ("cached TableSpec", new_statement)):
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            run(build, model, rows, args.batch_size)
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            stats = pstats.Stats(profiler)
+            print(f"{model.__tablename__:<9} {label:<20} total {elapsed * 1000:8.1f} ms"
+                  f"   in compiler {compile_seconds(stats) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
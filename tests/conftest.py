@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Run against the checkout, like the scripts in benchmarks/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
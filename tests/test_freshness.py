@@ -0,0 +1,140 @@
+"""
+The freshness probe against a local stand-in for ESPN's API.
+
+espn_api requests everything from FANTASY_BASE_ENDPOINT; pointing it at a
+local server that answers the league, player, pro schedule and draft
+views lets fetch_league_with_cache run unchanged while every request is
+counted.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from espn_api.requests import espn_requests
+
+from app.services import cache
+
+LEAGUE_ID = 123456
+YEAR = 2023
+WEEKS = 2
+
+
+class ESPNStub:
+    """A two-team league season served over HTTP; `requests` lists (path, views) of every request."""
+
+    def __init__(self):
+        self.requests = []
+        self.home_score = 100.0
+        self._lock = threading.Lock()
+
+    def league(self):
+        schedule = [
+            {'id': week, 'matchupPeriodId': week, 'winner': 'HOME', 'playoffTierType': 'NONE',
+             'home': {'teamId': 1, 'totalPoints': self.home_score + week},
+             'away': {'teamId': 2, 'totalPoints': 90.0 + week}}
+            for week in range(1, WEEKS + 1)
+        ]
+        return {
+            'seasonId': YEAR,
+            'scoringPeriodId': WEEKS + 1,
+            'status': {'currentMatchupPeriod': WEEKS + 1, 'firstScoringPeriod': 1, 'finalScoringPeriod': WEEKS,
+                       'latestScoringPeriod': WEEKS + 1, 'previousSeasons': [], 'isActive': False},
+            'settings': {
+                'name': 'Stub League', 'size': 2,
+                'scheduleSettings': {'matchupPeriodCount': WEEKS, 'matchupPeriods': {}, 'playoffTeamCount': 2,
+                                     'playoffSeedingRule': 'TOTAL_POINTS_SCORED'},
+                'tradeSettings': {'vetoVotesRequired': 0},
+                'draftSettings': {'keeperCount': 0},
+                'scoringSettings': {'matchupTieRule': 'NONE', 'playoffMatchupTieRule': 'NONE'},
+                'acquisitionSettings': {'isUsingAcquisitionBudget': False},
+                'rosterSettings': {},
+            },
+            'members': [{'id': f'{{OWNER-{team_id}}}', 'firstName': 'First', 'lastName': f'Last{team_id}'}
+                        for team_id in (1, 2)],
+            'teams': [
+                {'id': team_id, 'abbrev': f'T{team_id}', 'name': f'Team {team_id}', 'divisionId': 0,
+                 'owners': [f'{{OWNER-{team_id}}}'], 'playoffSeed': team_id, 'rankCalculatedFinal': team_id,
+                 'record': {'overall': {'wins': 2 - team_id, 'losses': team_id - 1, 'ties': 0, 'pointsFor': 200.0,
+                                        'pointsAgainst': 190.0, 'streakLength': 1, 'streakType': 'WIN'}}}
+                for team_id in (1, 2)
+            ],
+            'schedule': schedule,
+            'draftDetail': {'drafted': False},
+        }
+
+    def respond(self, path, query):
+        views = tuple(parse_qs(query).get('view', []))
+        with self._lock:
+            self.requests.append((path, views))
+        if path.endswith('/players'):
+            return []
+        if '/leagues/' not in path:
+            return {'settings': {'proTeams': []}}  # Pro team schedules
+        return self.league()
+
+    def probes(self):
+        return [request for request in self.requests if 'mStatus' in request[1]]
+
+
+@pytest.fixture
+def espn(monkeypatch, tmp_path):
+    stub = ESPNStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            body = json.dumps(stub.respond(url.path, url.query)).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(espn_requests, 'FANTASY_BASE_ENDPOINT',
+                        f'http://127.0.0.1:{server.server_address[1]}/apis/v3/games/')
+    monkeypatch.setattr(cache, 'CACHE_DIR', str(tmp_path))
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+def fetch():
+    return cache.fetch_league_with_cache([YEAR], str(LEAGUE_ID), 's2', '{SWID}', max_age_days=365)
+
+
+def test_unchanged_season_costs_only_the_probe(espn):
+    fetch()
+    full_fetch = len(espn.requests) - 1
+    assert len(espn.probes()) == 1 and full_fetch > 0
+
+    espn.requests.clear()
+    leagues = fetch()
+
+    assert espn.requests == espn.probes()
+    assert len(espn.requests) == 1
+    assert leagues[0].year == YEAR
+
+
+def test_changed_season_is_fetched_once(espn):
+    fetch()
+    full_fetch = len(espn.requests) - 1
+
+    espn.requests.clear()
+    espn.home_score += 7
+    leagues = fetch()
+
+    assert len(espn.probes()) == 1
+    assert len(espn.requests) == 1 + full_fetch
+    assert leagues[0].teams[0].scores[0] == espn.home_score + 1
+
+    # The refetched season is cached with the new probe
+    espn.requests.clear()
+    fetch()
+    assert len(espn.requests) == 1
@@ -0,0 +1,105 @@
+"""
+Logo archiving against a local logo server that validates conditional requests.
+"""
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.logos import KnownLogo, archive_logos, logo_path
+
+IMAGES = {
+    "/logos/1.png": b"\x89PNG\r\n\x1a\n logo one",
+    "/logos/2.png": b"\x89PNG\r\n\x1a\n logo two",
+    # The same image under a second URL, as when a team keeps its logo across seasons
+    "/logos/2-again.png": b"\x89PNG\r\n\x1a\n logo two",
+}
+STATUSES = {"/logos/gone.png": 404, "/logos/throttled.png": 429, "/logos/broken.png": 503}
+
+
+@pytest.fixture
+def logo_server():
+    """Serves IMAGES with ETags and STATUSES; yields the base URL and the (path, If-None-Match) of every request."""
+    requests = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with lock:
+                requests.append((self.path, self.headers.get("If-None-Match")))
+            image = IMAGES.get(self.path)
+            if image is None:
+                self.send_response(STATUSES.get(self.path, 404))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = '"' + hashlib.md5(image).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(image)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(image)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests
+    server.shutdown()
+    server.server_close()
+
+
+def stored_files(directory):
+    return sorted(filename for _, _, filenames in os.walk(directory) for filename in filenames)
+
+
+def test_identical_logos_are_stored_once(logo_server, tmp_path):
+    base, _ = logo_server
+    results = {r.url: r for r in archive_logos([base + path for path in IMAGES], directory=str(tmp_path))}
+
+    assert {r.status for r in results.values()} == {200}
+    assert results[base + "/logos/2.png"].sha256 == results[base + "/logos/2-again.png"].sha256
+    assert sum(r.new_file for r in results.values()) == 2
+    assert len(stored_files(tmp_path)) == 2
+    for r in results.values():
+        with open(logo_path(r.sha256, r.content_type, str(tmp_path)), "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == r.sha256
+
+
+def test_archived_logos_are_requested_conditionally(logo_server, tmp_path):
+    base, requests = logo_server
+    urls = [base + path for path in IMAGES]
+    first = archive_logos(urls, directory=str(tmp_path))
+    known = {r.url: KnownLogo(r.sha256, r.content_type, r.etag, r.last_modified) for r in first}
+    files = stored_files(tmp_path)
+
+    requests.clear()
+    results = archive_logos(urls, known, directory=str(tmp_path))
+
+    assert sorted(requests) == sorted((path, known[base + path].etag) for path in IMAGES)
+    assert {r.status for r in results} == {304}
+    assert [r.sha256 for r in results] == [r.sha256 for r in first]
+    assert not any(r.new_file for r in results)
+    assert stored_files(tmp_path) == files
+
+
+def test_throttled_and_failed_logos_are_errors_gone_ones_are_recorded(logo_server, tmp_path):
+    base, _ = logo_server
+    results = {r.url[len(base):]: r for r in archive_logos([base + path for path in STATUSES], directory=str(tmp_path))}
+
+    assert results["/logos/gone.png"].status == 404 and results["/logos/gone.png"].error is None
+    for path in ("/logos/throttled.png", "/logos/broken.png"):
+        assert results[path].status is None and results[path].error is not None
+    assert stored_files(tmp_path) == []